@@ -0,0 +1,126 @@
+"""Before/after benchmark: Streamlit cold start, rerun latency and the cost of entering handles.
+
+Runs the app headlessly with streamlit's AppTest, each measurement in a
+fresh interpreter:
+
+- cold start: the first script run, which pays for every import the page makes
+- rerun: a later run with nothing changed, the least any widget interaction costs
+- entering handles: filling in N handles across the platforms, in script runs and seconds
+
+The app's data goes to a temporary directory. Point --app at an older
+app.py (e.g. from `git show`) to get the "before" numbers; handle entry is
+driven through whichever UI the app has, per-field inputs with Add
+buttons or the handles form.
+
+Run from the repository root:
+
+    python benchmarks/bench_app.py [--app app.py] [--handles 50]
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "fpdf", "requests"]
+
+PLATFORMS = ["instagram", "twitter", "tiktok", "snapchat", "youtube", "linkedin", "facebook"]
+
+
+def count_runs():
+    """Count script runs, including the extra ones st.rerun() asks for"""
+    import builtins
+
+    from streamlit.runtime.scriptrunner import script_runner
+
+    runs = [0]
+
+    def counted_exec(code, *args, **kwargs):
+        runs[0] += 1
+        return builtins.exec(code, *args, **kwargs)
+
+    # The runner re-executes the script in a loop on st.rerun(); a module global shadows the builtin it calls
+    script_runner.exec = counted_exec
+    return runs
+
+
+def enter_with_buttons(at, handles):
+    # One text input per handle; every extra handle is an Add click, which reruns twice
+    for platform, names in handles.items():
+        for i, name in enumerate(names):
+            if i:
+                at.button(key=f"add_{platform}").click().run()
+            at.text_input(key=f"{platform}_handles_{i}").input(name).run()
+
+
+def enter_with_form(at, handles):
+    # Typing into a form costs no runs; saving it costs one
+    for platform, names in handles.items():
+        at.text_area(key=f"{platform}_text").input("\n".join(names))
+    next(button for button in at.button if button.label.startswith("💾")).click().run()
+
+
+def measure(app, count):
+    """Run inside a fresh interpreter and print the measurements as JSON"""
+    runs = count_runs()
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(app, default_timeout=120)
+    start = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - start
+    loaded = [name for name in HEAVY_MODULES if name in sys.modules]
+
+    reruns = []
+    for _ in range(10):
+        start = time.perf_counter()
+        at.run()
+        reruns.append(time.perf_counter() - start)
+    rerun = sorted(reruns)[len(reruns) // 2]
+
+    handles = {platform: [] for platform in PLATFORMS}
+    for i in range(count):
+        handles[PLATFORMS[i % len(PLATFORMS)]].append(f"athlete_{i:03d}")
+    runs[0] = 0
+    start = time.perf_counter()
+    if any(widget.key == "instagram_text" for widget in at.text_area):
+        enter_with_form(at, handles)
+    else:
+        enter_with_buttons(at, handles)
+    entry = time.perf_counter() - start
+    entry_runs = runs[0]
+    start = time.perf_counter()
+    at.run()
+    rerun_filled = time.perf_counter() - start
+    print(json.dumps({"cold": cold, "loaded": loaded, "rerun": rerun, "entry": entry, "entry_runs": entry_runs,
+                      "rerun_filled": rerun_filled}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app", default="app.py")
+    parser.add_argument("--handles", type=int, default=50)
+    parser.add_argument("--measure", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.measure:
+        measure(args.app, args.handles)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, SOCIALMEDIAAUDIT_DATA_DIR=tmp, SOCIALMEDIAAUDIT_CACHE_DIR=os.path.join(tmp, "cache"),
+                   PYTHONPATH=os.pathsep.join(filter(None, [os.getcwd(), os.environ.get("PYTHONPATH")])))
+        output = subprocess.run([sys.executable, __file__, "--measure", "--app", args.app, "--handles", str(args.handles)],
+                                env=env, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    print(f"{args.app}")
+    print(f"  cold start (first run):     {result['cold'] * 1000:8.0f} ms, loaded {', '.join(result['loaded']) or 'none of'} "
+          f"{'' if result['loaded'] else ', '.join(HEAVY_MODULES)}")
+    print(f"  rerun, no handles (median): {result['rerun'] * 1000:8.0f} ms")
+    print(f"  entering {args.handles} handles:        {result['entry']:8.2f} s in {result['entry_runs']} script runs")
+    print(f"  rerun with {args.handles} handles:      {result['rerun_filled'] * 1000:8.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
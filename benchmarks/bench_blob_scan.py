@@ -0,0 +1,108 @@
+"""Before/after benchmark: full json.loads of inline JSON blobs vs the streaming BlobScanner.
+
+The naive way to read a channel's counts is to find the whole
+ytInitialData (or Instagram shared data) object in the page, json.loads
+it and walk the result. BlobScanner is fed the page in network-sized
+chunks and decodes only the values it needs.
+
+Run from the repository root:
+
+    python benchmarks/bench_blob_scan.py
+"""
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+
+from socialmediaaudit.extract import BlobScanner, count_from_text, text_of
+from socialmediaaudit.scraper import INSTAGRAM_FIELDS, INSTAGRAM_SHARED_DATA, YOUTUBE_FIELDS, YOUTUBE_INITIAL_DATA
+
+
+def full_blob(page, marker):
+    text = page.decode("utf-8")
+    start = text.index(marker) + len(marker)
+    return json.loads(text[start:text.index(";</script>", start)])
+
+
+def naive_youtube(page):
+    data = full_blob(page, YOUTUBE_INITIAL_DATA)
+    header = data["header"]["c4TabbedHeaderRenderer"]
+    about = None
+    for tab in data["contents"]["twoColumnBrowseResultsRenderer"]["tabs"]:
+        about = tab["tabRenderer"]["content"].get("channelAboutFullMetadataRenderer", about)
+    return {
+        "subscribers": count_from_text(text_of(header["subscriberCountText"])),
+        "videos": count_from_text(text_of(header["videosCountText"])),
+        "views": count_from_text(text_of(about["viewCountText"])),
+    }
+
+
+def naive_instagram(page):
+    user = full_blob(page, INSTAGRAM_SHARED_DATA)["entry_data"]["ProfilePage"][0]["graphql"]["user"]
+    return {
+        "followers": user["edge_followed_by"]["count"],
+        "following": user["edge_follow"]["count"],
+        "posts": user["edge_owner_to_timeline_media"]["count"],
+        "bio": user["biography"],
+        "is_private": user["is_private"],
+    }
+
+
+def scanned(page, marker, fields, chunk_size=16384):
+    scanner = BlobScanner(marker, fields)
+    received = 0
+    for start in range(0, len(page), chunk_size):
+        chunk = page[start:start + chunk_size]
+        received += len(chunk)
+        scanner.feed(chunk)
+        if scanner.done:
+            break
+    return scanner.values, received
+
+
+def scanned_youtube(page):
+    values, received = scanned(page, YOUTUBE_INITIAL_DATA, YOUTUBE_FIELDS)
+    values["views"] = values.pop("about")["viewCountText"]
+    return {field: count_from_text(text_of(value)) for field, value in values.items()}, received
+
+
+def scanned_instagram(page):
+    return scanned(page, INSTAGRAM_SHARED_DATA, INSTAGRAM_FIELDS)
+
+
+def measure(fn, page, repeat=10):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(page)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    cases = [
+        ("YouTube", fixtures.youtube_page("hoopschannel"), naive_youtube, scanned_youtube),
+        ("Instagram", fixtures.instagram_page("jdoe"), naive_instagram, scanned_instagram),
+    ]
+    print(f"{'':32}{'time (ms)':>12}{'peak mem (KB)':>16}{'bytes read (KB)':>18}")
+    for name, page, naive, scan in cases:
+        expected, naive_time, naive_peak = measure(naive, page)
+        (values, received), scan_time, scan_peak = measure(scan, page)
+        assert values == expected, (values, expected)
+        print(f"{name + ' json.loads (full blob)':32}{naive_time * 1000:12.2f}{naive_peak / 1024:16.0f}"
+              f"{len(page) / 1024:18.0f}")
+        print(f"{name + ' BlobScanner':32}{scan_time * 1000:12.2f}{scan_peak / 1024:16.0f}{received / 1024:18.0f}")
+        print(f"  {naive_time / scan_time:.1f}x CPU, {naive_peak / scan_peak:.0f}x memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Before/after benchmark: comparing every pair of accounts vs the MinHash/LSH SimilarityIndex.
+
+Builds a synthetic roster in which most athletes use variants of one
+handle across platforms and a few name an account that imitates a
+teammate's ("realjdoe23", "jd0e_23"). Look-alikes across the roster are
+found with roster_brand(); the all-pairs comparison is timed on a sample
+and extrapolated, and run in full on a smaller roster to check that the
+index finds the same pairs.
+
+Run from the repository root:
+
+    python benchmarks/bench_brand.py [--athletes 10000] [--check 600]
+"""
+import argparse
+import random
+import sys
+import time
+
+sys.path.insert(0, ".")
+
+from socialmediaaudit.brand import (LOOKALIKE_CONTAINMENT, LOOKALIKE_HANDLE, MIN_HANDLE_TRIGRAMS, NEAR_COPY_TEXT,
+                                    MIN_TEXT_TRIGRAMS, athlete_accounts, containment, jaccard,
+                                    lookalikes, roster_brand)
+
+SYLLABLES = "ja da ri ley mor gan tay lor av er quin ca sey row an par ker bla ke lo smi th mar ti nez wil son".split()
+WORDS = ("point guard class of 2026 state champs team captain honor roll film in bio dm for highlights grind "
+         "every day faith family hoops lacrosse track field varsity commit uncommitted gpa").split()
+VARIANTS = [lambda h: h, lambda h: h.replace("_", ""), lambda h: h.replace("_", "."), lambda h: h + "_"]
+IMPOSTORS = [lambda h: "real" + h, lambda h: h.replace("a", "4") + "_", lambda h: h + "official"]
+
+
+def make_name(rng, parts):
+    return "".join(rng.choice(SYLLABLES) for _ in range(parts))
+
+
+def make_bio(rng):
+    # Shared phrases plus words of the athlete's own, as real bios mix boilerplate with specifics
+    words = rng.sample(WORDS, rng.randint(3, 6)) + [make_name(rng, rng.randint(2, 3)) for _ in range(rng.randint(3, 6))]
+    rng.shuffle(words)
+    return " ".join(words)
+
+
+def make_roster(count, rng, impostor_rate=0.02):
+    handles = [f"{make_name(rng, 2)}_{make_name(rng, 3)}{rng.randint(0, 99)}" for _ in range(count)]
+    bios = [make_bio(rng) for _ in range(count)]
+    roster = {}
+    for i, handle in enumerate(handles):
+        athlete = {platform: [rng.choice(VARIANTS)(handle)] for platform in ("instagram", "tiktok", "twitter")}
+        athlete["youtube"] = ["@" + handle.replace("_", "")]
+        results = {
+            "instagram": [{"username": athlete["instagram"][0], "bio": bios[i], "is_private": False}],
+            "tiktok": [{"username": athlete["tiktok"][0], "bio": bios[i]}],
+        }
+        if rng.random() < impostor_rate:
+            # An account imitating a teammate's handle and copying their bio
+            victim = rng.randrange(count)
+            athlete["twitter"] = [rng.choice(IMPOSTORS)(handles[victim])]
+            results["twitter"] = [{"username": athlete["twitter"][0], "bio": bios[victim]}]
+        roster[f"athlete-{i:06d}"] = (athlete, results)
+    return roster
+
+
+def all_pairs(accounts):
+    """The quadratic baseline: exact trigram similarity of every pair of accounts of different athletes"""
+    owners = {}
+    for account in accounts:
+        owners.setdefault((account.platform, account.key), set()).add(account.athlete)
+    found = set()
+    for i, first in enumerate(accounts):
+        for second in accounts[i + 1:]:
+            # As in lookalikes(), an account both athletes name is shared, not imitated
+            if (first.athlete in owners[(second.platform, second.key)]
+                    or second.athlete in owners[(first.platform, first.key)]):
+                continue
+            if (len(first.handle_grams) >= MIN_HANDLE_TRIGRAMS and len(second.handle_grams) >= MIN_HANDLE_TRIGRAMS
+                    and (jaccard(first.handle_grams, second.handle_grams) >= LOOKALIKE_HANDLE
+                         or containment(first.handle_grams, second.handle_grams) >= LOOKALIKE_CONTAINMENT)):
+                found.add(_pair(first, second, "handle"))
+            if (len(first.text_grams) >= MIN_TEXT_TRIGRAMS and len(second.text_grams) >= MIN_TEXT_TRIGRAMS
+                    and jaccard(first.text_grams, second.text_grams) >= NEAR_COPY_TEXT):
+                found.add(_pair(first, second, "bio"))
+    return found
+
+
+def _pair(first, second, kind):
+    return tuple(sorted([(first.athlete, first.platform, first.key), (second.athlete, second.platform, second.key)])) + (kind,)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--athletes", type=int, default=10000)
+    parser.add_argument("--check", type=int, default=600, help="Athletes in the roster compared against all pairs")
+    parser.add_argument("--sample", type=int, default=300, help="Accounts the all-pairs loop is timed on")
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    roster = make_roster(args.athletes, rng)
+    stats = {}
+    start = time.perf_counter()
+    report = roster_brand(roster, stats=stats)
+    seconds = time.perf_counter() - start
+    flagged = sum(1 for brand in report.values() if brand["lookalikes"])
+    accounts = [account for athlete, (handles, results) in roster.items()
+                for account in athlete_accounts(athlete, handles, results)]
+
+    sample = accounts[:args.sample]
+    start = time.perf_counter()
+    all_pairs(sample)
+    per_pair = (time.perf_counter() - start) / (len(sample) * (len(sample) - 1) / 2)
+    naive_seconds = per_pair * len(accounts) * (len(accounts) - 1) / 2
+
+    print(f"{args.athletes:,} athletes, {len(accounts):,} accounts")
+    print(f"SimilarityIndex: {seconds:.2f}s for scores and look-alikes; {stats['candidates']:,} candidate pairs, "
+          f"{stats['estimated']:,} compared exactly, {stats['pairs']:,} similar; {flagged:,} athletes flagged")
+    print(f"All pairs: {naive_seconds:.0f}s ({len(accounts) * (len(accounts) - 1) // 2:,} pairs, extrapolated "
+          f"from {len(sample):,} accounts)")
+    print(f"Speedup: {naive_seconds / seconds:.0f}x")
+
+    small = make_roster(args.check, random.Random(5), impostor_rate=0.1)
+    small_accounts = [account for athlete, (handles, results) in small.items()
+                      for account in athlete_accounts(athlete, handles, results)]
+    expected = all_pairs(small_accounts)
+    found = {_pair(account, other, kind) for account, other, kind, _ in lookalikes(small_accounts)}
+    recall = len(found & expected) / max(1, len(expected))
+    print(f"Recall on {args.check:,} athletes: {len(found & expected)}/{len(expected)} ({recall:.1%}) "
+          f"of the all-pairs look-alikes, {len(found - expected)} extra")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark: bulk roster export time and parent memory as the roster grows.
+
+Builds a batch output file of N synthetic athletes from a sample batch
+run (copies of its lines under new athlete keys), then exports it to a
+ZIP with and without the render cache. Peak RSS of the exporting
+process should stay flat as N grows, since PDFs go into the ZIP as
+they are rendered.
+
+Run from the repository root with the output of a batch run:
+
+    python benchmarks/bench_export.py audit_results.jsonl [--athletes 200 800] [--workers 4]
+"""
+import argparse
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, ".")
+
+from socialmediaaudit.export import export_roster
+
+
+def synthetic_results(sample_path, athletes, path):
+    with open(sample_path, encoding="utf-8") as f:
+        sample = [json.loads(line) for line in f if line.strip()]
+    with open(path, "w", encoding="utf-8") as out:
+        for i in range(athletes):
+            record = dict(sample[i % len(sample)])
+            record["athlete"] = record["name"] = f"Athlete {i:06d}"
+            out.write(json.dumps(record) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("sample", help="JSONL output of a batch run to copy athletes from")
+    parser.add_argument("--athletes", type=int, nargs="+", default=[200, 800])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # A private data dir, so the first export of each size starts with an empty render cache
+        os.environ["SOCIALMEDIAAUDIT_DATA_DIR"] = tmp
+        print(f"{'athletes':>9}{'render (s)':>12}{'per pdf (ms)':>14}{'cached (s)':>12}{'zip MB':>9}{'peak rss MB':>13}")
+        for athletes in args.athletes:
+            results = os.path.join(tmp, f"results-{athletes}.jsonl")
+            synthetic_results(args.sample, athletes, results)
+            output = os.path.join(tmp, f"export-{athletes}.zip")
+            start = time.perf_counter()
+            summary = export_roster(results, output, workers=args.workers, log=lambda message: None)
+            first = time.perf_counter() - start
+            start = time.perf_counter()
+            export_roster(results, output, workers=args.workers, log=lambda message: None)
+            cached = time.perf_counter() - start
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+            print(f"{athletes:9,}{first:12.2f}{first / athletes * 1000:14.1f}{cached:12.2f}"
+                  f"{summary['bytes'] / 2**20:9.1f}{peak:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""Before/after benchmark: full BeautifulSoup parse vs streamed HeadExtractor.
+
+The app itself no longer uses BeautifulSoup, so install beautifulsoup4
+separately to run this. From the repository root:
+
+    python benchmarks/bench_head_parse.py
+"""
+import json
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from bs4 import BeautifulSoup
+
+from socialmediaaudit.extract import HEAD_BYTE_CAP, HeadExtractor
+
+
+def make_profile_page(body_kb=600):
+    """Build a page shaped like an Instagram/YouTube profile: small head, huge body"""
+    ld = json.dumps({"author": {"description": "Point guard. Class of 2026.",
+                                "interactionStatistic": {"userInteractionCount": 15234}}})
+    head = (
+        "<!DOCTYPE html><html><head><title>jdoe</title>"
+        + "".join(f'<link rel="preload" href="/static/{i}.js">' for i in range(40))
+        + '<meta name="description" content="15,234 Followers, 321 Following, 87 Posts">'
+        + f'<script type="application/ld+json">{ld}</script>'
+        + "</head>"
+    )
+    row = '<div class="post"><a href="/p/abc/"><img src="/img.jpg" alt="post"></a><span>caption text</span></div>'
+    script = "<script>window.__data = " + json.dumps({"k": ["v" * 50] * 20}) + ";</script>"
+    body_parts = []
+    size = 0
+    while size < body_kb * 1024:
+        body_parts.append(row * 20 + script)
+        size += len(body_parts[-1])
+    return (head + "<body>" + "".join(body_parts) + "</body></html>").encode()
+
+
+def soup_parse(page):
+    soup = BeautifulSoup(page.decode(), "html.parser")
+    scripts = [s.string for s in soup.find_all("script", type="application/ld+json")]
+    meta = soup.find("meta", attrs={"name": "description"})
+    return scripts, meta.get("content", "")
+
+
+def streamed_parse(page, chunk_size=16384):
+    head = HeadExtractor()
+    received = 0
+    for start in range(0, len(page), chunk_size):
+        chunk = page[start:start + chunk_size]
+        received += len(chunk)
+        head.feed(chunk)
+        if head.done or received >= HEAD_BYTE_CAP:
+            break
+    return head.ld_json, head.meta.get("description", ""), received
+
+
+def measure(fn, page, repeat=5):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(page)
+    elapsed = (time.perf_counter() - start) / repeat
+    tracemalloc.start()
+    fn(page)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    page = make_profile_page()
+    (scripts, desc), soup_time, soup_peak = measure(soup_parse, page)
+    (ld_json, meta_desc, received), head_time, head_peak = measure(streamed_parse, page)
+    assert scripts == ld_json and desc == meta_desc
+
+    print(f"Page size: {len(page) / 1024:.0f} KB (streamed fetch reads {received / 1024:.0f} KB)")
+    print(f"{'':22}{'time (ms)':>12}{'peak mem (KB)':>16}")
+    print(f"{'BeautifulSoup (full)':22}{soup_time * 1000:12.2f}{soup_peak / 1024:16.0f}")
+    print(f"{'HeadExtractor':22}{head_time * 1000:12.2f}{head_peak / 1024:16.0f}")
+    print(f"Speedup: {soup_time / head_time:.0f}x CPU, {soup_peak / head_peak:.0f}x memory")
+
+
+if __name__ == "__main__":
+    main()
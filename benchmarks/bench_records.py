@@ -0,0 +1,108 @@
+"""Before/after benchmark: memory held by scrape results as dicts vs slotted records.
+
+Builds a roster's worth of results the way the scrapers used to (fresh
+dicts with placeholder strings) and the way they do now (records with a
+Status enum and parsed counts), then compares memory and the cost of
+converting records back to dicts.
+
+Run from the repository root:
+
+    python benchmarks/bench_records.py [--accounts 100000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from socialmediaaudit.capabilities import not_fetched
+from socialmediaaudit.records import InstagramProfile, TikTokProfile, TwitterProfile, YouTubeChannel
+
+
+def legacy_result(i):
+    """One result shaped like the old scrapers' dicts"""
+    kind = i % 4
+    if kind == 0:
+        return {
+            "username": f"athlete{i}",
+            "followers": f"{1000 + i:,}",
+            "following": "Private/Unable to access",
+            "posts": "Private/Unable to access",
+            "bio": "Point guard. Class of 2026.",
+            "is_private": False,
+            "profile_pic_url": None,
+            "external_url": None,
+        }
+    if kind == 1:
+        return {
+            "username": f"athlete{i}",
+            "followers": not_fetched("requires API access"),
+            "following": not_fetched("requires API access"),
+            "tweets": not_fetched("requires API access"),
+            "bio": not_fetched("requires API access"),
+            "verified": False,
+            "location": None,
+        }
+    if kind == 2:
+        return {
+            "username": f"athlete{i}",
+            "followers": not_fetched("TikTok restricts scraping"),
+            "likes": not_fetched("TikTok restricts scraping"),
+            "videos": not_fetched("TikTok restricts scraping"),
+            "bio": not_fetched("TikTok restricts scraping"),
+        }
+    return {
+        "channel_name": f"@athlete{i}",
+        "subscribers": "Unable to access",
+        "views": "Unable to access",
+        "videos": "Unable to access",
+        "description": "Highlights and game film",
+    }
+
+
+def record_result(i):
+    """The same result as the scrapers build it now"""
+    kind = i % 4
+    if kind == 0:
+        return InstagramProfile(username=f"athlete{i}", followers=1000 + i, bio="Point guard. Class of 2026.",
+                                is_private=False)
+    if kind == 1:
+        return TwitterProfile(username=f"athlete{i}")
+    if kind == 2:
+        return TikTokProfile(username=f"athlete{i}")
+    return YouTubeChannel(channel_name=f"@athlete{i}", description="Highlights and game film")
+
+
+def held_memory(build, count):
+    tracemalloc.start()
+    results = [build(i) for i in range(count)]
+    held = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return results, held
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=100000)
+    args = parser.parse_args()
+
+    dicts, dict_bytes = held_memory(legacy_result, args.accounts)
+    records, record_bytes = held_memory(record_result, args.accounts)
+    assert [r.to_dict() for r in records[:8]] == dicts[:8]
+
+    start = time.perf_counter()
+    for record in records:
+        record.to_dict()
+    to_dict_seconds = time.perf_counter() - start
+
+    print(f"{args.accounts:,} results held in memory")
+    print(f"{'':18}{'total (MB)':>12}{'per result (B)':>16}")
+    print(f"{'dicts':18}{dict_bytes / 2**20:12.1f}{dict_bytes / args.accounts:16.0f}")
+    print(f"{'slotted records':18}{record_bytes / 2**20:12.1f}{record_bytes / args.accounts:16.0f}")
+    print(f"Records use {dict_bytes / record_bytes:.1f}x less memory")
+    print(f"to_dict(): {to_dict_seconds / args.accounts * 1e6:.2f} us per result")
+
+
+if __name__ == "__main__":
+    main()
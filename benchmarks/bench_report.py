@@ -0,0 +1,114 @@
+"""Before/after benchmark: report rendering time as the number of accounts grows.
+
+Builds one athlete's report document with N accounts and times each
+renderer. The "legacy pdf" column renders the same lines the way reports
+used to be written: stock FPDF with Latin-1 Arial, whose output buffer
+is one string that grows by concatenation. Rendering should scale
+linearly, so the per-account cost stays flat as N doubles.
+
+Run from the repository root:
+
+    python benchmarks/bench_report.py [--sizes 2500 5000 10000]
+"""
+import argparse
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, ".")
+
+from fpdf import FPDF
+
+from socialmediaaudit.records import InstagramProfile, ScrapeError, TwitterProfile, YouTubeChannel
+from socialmediaaudit.report import (RenderCache, build_document, iter_json, iter_lines, render_json, render_pdf,
+                                     render_text)
+
+
+def scraped_results(count):
+    results = {"instagram": [], "twitter": [], "youtube": []}
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            results["instagram"].append(InstagramProfile(username=f"zoë.hoops{i}", followers=1000 + i,
+                                                         bio="Point guard ⚡ Class of 2026", is_private=False))
+        elif kind == 1:
+            results["twitter"].append(TwitterProfile(username=f"athlete{i}"))
+        elif kind == 2:
+            results["youtube"].append(YouTubeChannel(channel_name=f"@athlete{i}",
+                                                     description="Highlights and game film " * 4))
+        else:
+            results["youtube"].append(ScrapeError(error=f"Error scraping youtube @athlete{i}: timed out"))
+    return results
+
+
+def document_for(count):
+    analysis = {
+        "total_platforms": count,
+        "accessible_platforms": count - count // 4,
+        "private_accounts": 0,
+        "public_accounts": count - count // 4,
+        "platform_insights": ["Instagram @zoë.hoops0: Low follower count - consider growing audience"],
+        "risk_factors": [f"youtube: Error scraping youtube @athlete{i}: timed out" for i in range(3, count, 4)],
+        "recommendations": [],
+    }
+    return build_document(scraped_results(count), analysis, "Zoë Example", count, ["instagram", "twitter", "youtube"])
+
+
+def legacy_pdf(document):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Arial", size=10)
+    for _, line in iter_lines(document):
+        if line.strip():
+            text = line.encode('latin1', 'ignore').decode('latin1')
+            if len(text) > 80:
+                pdf.multi_cell(0, 5, text)
+            else:
+                pdf.cell(0, 5, text, ln=True)
+        else:
+            pdf.ln(2)
+    return pdf.output(dest='S').encode('latin1')
+
+
+def timed(render, document):
+    start = time.perf_counter()
+    render(document)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2500, 5000, 10000])
+    parser.add_argument("--skip-legacy", action="store_true", help="Don't time the old PDF path")
+    args = parser.parse_args()
+
+    print(f"{'accounts':>9}{'build':>9}{'text':>9}{'json':>9}{'pdf':>9}{'legacy pdf':>12}"
+          f"{'pdf us/acct':>13}{'stream peak KB':>16}")
+    for size in args.sizes:
+        start = time.perf_counter()
+        document = document_for(size)
+        build = time.perf_counter() - start
+        text = timed(render_text, document)
+        json_seconds = timed(render_json, document)
+        pdf = timed(render_pdf, document)
+        legacy = float("nan") if args.skip_legacy else timed(legacy_pdf, document)
+
+        # Streaming JSON to a file holds one item at a time, however large the report
+        tracemalloc.start()
+        for _ in iter_json(document):
+            pass
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"{size:9,}{build:9.2f}{text:9.2f}{json_seconds:9.2f}{pdf:9.2f}{legacy:12.2f}"
+              f"{pdf / size * 1e6:13.0f}{peak / 1024:16.1f}")
+
+    cache = RenderCache()
+    document = document_for(args.sizes[0])
+    miss = timed(lambda d: cache.render(d, "pdf"), document)
+    hit = timed(lambda d: cache.render(d, "pdf"), document)
+    print(f"Cached pdf for {args.sizes[0]:,} accounts: {miss:.2f}s to render, {hit * 1000:.1f}ms to reuse")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Scaling benchmark: one coordinator and 1, 2, 4... worker processes against the stand-in servers.
+
+Each worker stands in for a separate egress point: it spaces its own
+requests to each platform by --delay, as a worker on its own host or
+proxy would to stay inside that address's rate limit. A single process
+is therefore capped by the delay, not by CPU, and throughput should grow
+with the number of workers until the coordinator or the machine runs out
+of headroom.
+
+Workers are real `python -m socialmediaaudit worker` processes sharing a
+queue file. The last run kills one worker in the middle of a shard to
+check that the shard is re-leased and every athlete still gets written.
+
+Run from the repository root:
+
+    python benchmarks/bench_shards.py [--accounts 1000] [--workers 1 2 4] [--delay 0.1]
+"""
+import argparse
+import csv
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import standin_server
+from run_pipeline import make_roster
+
+from socialmediaaudit.canonical import PLATFORMS
+from socialmediaaudit.shards import run_coordinator
+
+
+def write_roster(path, athletes):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["athlete"] + PLATFORMS)
+        for athlete in athletes:
+            writer.writerow([athlete["athlete"]] + [";".join(athlete["handles"].get(p, [])) for p in PLATFORMS])
+
+
+def start_workers(count, queue_path, base_urls, delay, lease, env):
+    base_args = [arg for platform, url in base_urls.items() for arg in ("--base-url", f"{platform}={url}")]
+    return [subprocess.Popen([sys.executable, "-m", "socialmediaaudit", "worker", queue_path, "--name", f"worker{i}",
+                              "-d", str(delay), "--lease", str(lease), "--no-cache"] + base_args,
+                             env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            for i in range(count)]
+
+
+def kill_mid_shard(process, queue_path, name):
+    """SIGKILL a worker as soon as it holds a lease, leaving its shard half done"""
+    while process.poll() is None:
+        try:
+            conn = sqlite3.connect(queue_path, timeout=5)
+            leased = conn.execute("SELECT COUNT(*) FROM shards WHERE worker = ? AND status = 'leased'",
+                                  (name,)).fetchone()[0]
+            conn.close()
+        except sqlite3.OperationalError:
+            leased = 0
+        if leased:
+            process.kill()
+            return
+        time.sleep(0.05)
+
+
+def run(tmp, roster_path, workers, base_urls, args, env, kill_one=False):
+    """Audit the roster with `workers` worker processes; returns (summary, lines written)"""
+    queue_path = os.path.join(tmp, f"queue-{workers}-{kill_one}.sqlite3")
+    output_path = os.path.join(tmp, f"results-{workers}-{kill_one}.jsonl")
+    processes = start_workers(workers, queue_path, base_urls, args.delay, args.lease, env)
+    if kill_one:
+        threading.Thread(target=kill_mid_shard, args=(processes[0], queue_path, "worker0"), daemon=True).start()
+    try:
+        summary = run_coordinator(roster_path, output_path, queue_path, shard_size=args.shard_size,
+                                  use_history=False, poll=0.1, log=lambda message: None)
+    finally:
+        for process in processes:
+            process.wait(timeout=60)
+    with open(output_path, encoding="utf-8") as f:
+        lines = [json.loads(line) for line in f if line.strip()]
+    return summary, lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--accounts", type=int, default=1000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--delay", type=float, default=0.1, help="Each worker's seconds between requests to a platform")
+    parser.add_argument("--shard-size", type=int, default=20)
+    parser.add_argument("--lease", type=float, default=3, help="Short, so the killed worker's shard comes back quickly")
+    args = parser.parse_args()
+
+    server, base_urls = standin_server.start_in_subprocess()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            env = dict(os.environ, SOCIALMEDIAAUDIT_DATA_DIR=tmp,
+                       PYTHONPATH=os.pathsep.join(filter(None, [os.path.dirname(BENCH_DIR),
+                                                                os.environ.get("PYTHONPATH")])))
+            # The coordinator runs in this process; keep whatever it opens out of the real data directory
+            os.environ["SOCIALMEDIAAUDIT_DATA_DIR"] = tmp
+            athletes = make_roster(args.accounts)
+            roster_path = os.path.join(tmp, "roster.csv")
+            write_roster(roster_path, athletes)
+            print(f"{len(athletes)} athletes, {args.accounts} accounts, {args.delay}s per platform per worker, "
+                  f"shards of {args.shard_size}")
+
+            baseline = None
+            for workers in args.workers:
+                summary, lines = run(tmp, roster_path, workers, base_urls, args, env)
+                rate = summary["accounts"] / summary["elapsed"]
+                baseline = baseline or rate / workers
+                print(f"{workers:>3} workers: {summary['elapsed']:6.1f}s  {rate:7.1f} accounts/s  "
+                      f"{rate / baseline:4.2f}x  ({rate / (baseline * workers):.0%} of linear)  "
+                      f"{len(lines)}/{len(athletes)} athletes")
+
+            workers = max(2, args.workers[-1])
+            summary, lines = run(tmp, roster_path, workers, base_urls, args, env, kill_one=True)
+            print(f"{workers} workers, one killed mid-shard: {len(lines)}/{len(athletes)} athletes written, "
+                  f"{summary['re_leased_shards']} shards re-leased, {summary['failed_shards']} failed, "
+                  f"{summary['elapsed']:.1f}s")
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main()
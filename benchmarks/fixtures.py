@@ -0,0 +1,109 @@
+"""Stand-in profile pages shaped like the ones the platforms serve.
+
+Pages are generated deterministically from the username so every run
+serves identical bytes. Sizes and the position of the elements the
+scrapers read match what the live sites return: a small <head> with the
+meta description and ld+json, followed by a large body of markup and
+inline script data, including the JSON blobs (Instagram's shared data,
+YouTube's ytInitialData) that hold the full profile counts.
+"""
+import hashlib
+import json
+
+INSTAGRAM_BODY_KB = 250
+YOUTUBE_BODY_KB = 600
+
+
+def _numbers(username):
+    digest = hashlib.sha256(username.encode()).digest()
+    followers = int.from_bytes(digest[:3], "big") % 50000
+    following = int.from_bytes(digest[3:5], "big") % 2000
+    posts = int.from_bytes(digest[5:7], "big") % 900
+    return followers, following, posts
+
+
+def _filler(size_kb, seed):
+    row = (f'<div class="item" data-id="{seed}"><a href="/p/{seed}/"><img src="/media/{seed}.jpg" '
+           f'alt="photo"></a><span class="caption">Game day with the team #{seed}</span></div>')
+    script = "<script>window.__cfg = " + json.dumps({"seed": seed, "flags": ["x" * 40] * 12}) + ";</script>"
+    block = row * 25 + script
+    return block * max(1, (size_kb * 1024) // len(block))
+
+
+def instagram_page(username, private=False):
+    followers, following, posts = _numbers(username)
+    if private:
+        description = f"This account is private. See photos and videos from @{username}"
+        ld = ""
+    else:
+        description = (f"{followers:,} Followers, {following:,} Following, {posts:,} Posts - "
+                       f"See Instagram photos and videos from @{username}")
+        ld = json.dumps({
+            "@type": "ProfilePage",
+            "author": {"@type": "Person", "alternateName": f"@{username}",
+                       "description": f"Student-athlete. Class of 2026. @{username}",
+                       "interactionStatistic": {"userInteractionCount": followers}},
+        })
+    head = (
+        f"<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>@{username}</title>"
+        + "".join(f'<link rel="preload" href="/static/bundle-{i}.js" as="script">' for i in range(30))
+        + f'<meta name="description" content="{description}">'
+        + f'<meta property="og:title" content="@{username}">'
+        + (f'<script type="application/ld+json">{ld}</script>' if ld else "")
+        + "</head>"
+    )
+    shared_data = {"entry_data": {"ProfilePage": [{"graphql": {"user": {
+        "biography": f"Student-athlete. Class of 2026. @{username}",
+        "edge_followed_by": {"count": followers},
+        "edge_follow": {"count": following},
+        "full_name": username,
+        "is_private": private,
+        "username": username,
+        "edge_owner_to_timeline_media": {"count": posts, "edges": [
+            {"node": {"shortcode": f"{username}{i}", "caption": "Game day with the team " * 4}} for i in range(200)
+        ]},
+    }}}]}}
+    body = (
+        "<body>" + '<script type="text/javascript">window._sharedData = ' + json.dumps(shared_data) + ";</script>"
+        + _filler(INSTAGRAM_BODY_KB, username) + "</body></html>"
+    )
+    return (head + body).encode()
+
+
+def youtube_page(channel):
+    subscribers, videos, _ = _numbers(channel)
+    views = subscribers * 37
+    initial_data = {
+        "header": {"c4TabbedHeaderRenderer": {
+            "title": channel,
+            "subscriberCountText": {"simpleText": f"{subscribers:,} subscribers"},
+            "videosCountText": {"runs": [{"text": f"{videos:,}"}, {"text": " videos"}]},
+        }},
+        "metadata": {"channelMetadataRenderer": {"title": channel, "description": f"Highlights from {channel}"}},
+        "contents": {"twoColumnBrowseResultsRenderer": {"tabs": [
+            {"tabRenderer": {"title": f"Tab {i}", "content": {"items": [
+                {"videoRenderer": {"videoId": f"{channel}{i}-{j}", "title": {"simpleText": "y" * 160},
+                                   "viewCountText": {"simpleText": f"{j * 11:,} views"}}} for j in range(40)
+            ]}}} for i in range(120)
+        ] + [{"tabRenderer": {"title": "About", "content": {"channelAboutFullMetadataRenderer": {
+            "description": {"simpleText": f"Highlights from {channel}"},
+            "viewCountText": {"simpleText": f"{views:,} views"},
+            "joinedDateText": {"runs": [{"text": "Joined "}, {"text": "Aug 12, 2019"}]},
+        }}}}]}},
+    }
+    head = (
+        f"<!DOCTYPE html><html><head><title>{channel} - YouTube</title>"
+        f'<meta name="description" content="Highlights, game film and training from {channel}.">'
+        "</head>"
+    )
+    body = (
+        "<body>" + _filler(YOUTUBE_BODY_KB // 2, channel)
+        + "<script>var ytInitialData = " + json.dumps(initial_data) + ";</script>"
+        + _filler(YOUTUBE_BODY_KB // 2, channel + "-tail") + "</body></html>"
+    )
+    return (head + body).encode()
+
+
+def stub_page(username):
+    """Small page for platforms that are only probed for existence"""
+    return f"<!DOCTYPE html><html><head><title>{username}</title></head><body></body></html>".encode()
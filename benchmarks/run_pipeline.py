@@ -0,0 +1,213 @@
+"""End-to-end pipeline benchmark against the local stand-in platform servers.
+
+Runs scrape -> analyze -> report -> PDF for synthetic rosters and reports
+accounts/sec, per-account scrape latency (p50/p95), CPU seconds per stage
+and peak RSS. Results are written as JSON so runs can be compared:
+
+    python benchmarks/run_pipeline.py --sizes 10 1000 10000
+    python benchmarks/run_pipeline.py --sizes 1000 --compare benchmarks/results/<earlier>.json
+"""
+import argparse
+import json
+import os
+import platform as platform_info
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+sys.path.insert(0, BENCH_DIR)
+
+import standin_server
+
+from socialmediaaudit.analysis import analyze_scraped_data
+from socialmediaaudit.canonical import SCRAPED_PLATFORMS, FetchPlan, index_results
+from socialmediaaudit.engine import ScrapeEngine
+from socialmediaaudit.metrics import AuditTrace
+from socialmediaaudit.report import build_document, render_pdf, render_text
+from socialmediaaudit.scraper import SocialMediaScraper
+from socialmediaaudit.transport import Transport
+
+# Share of accounts per platform, roughly what our rosters look like
+PLATFORM_MIX = [("instagram", 0.40), ("youtube", 0.15), ("twitter", 0.20), ("tiktok", 0.20), ("linkedin", 0.05)]
+
+# Every n-th account gets one of the special behaviours of the stand-in server
+SPECIAL_EVERY = [("missing", 33), ("throttled", 50), ("slow", 20), ("private", 10)]
+
+ACCOUNTS_PER_ATHLETE = 5
+
+
+def make_roster(size):
+    """Synthetic roster of `size` accounts, grouped into athletes"""
+    athletes = []
+    for i in range(size):
+        if i % ACCOUNTS_PER_ATHLETE == 0:
+            athletes.append({"athlete": f"athlete{i // ACCOUNTS_PER_ATHLETE}", "handles": {}})
+        position = (i * 7919) % 100 / 100
+        cumulative = 0
+        for platform, share in PLATFORM_MIX:
+            cumulative += share
+            if position < cumulative:
+                break
+        prefix = "user"
+        for special, every in SPECIAL_EVERY:
+            if i % every == every - 1:
+                prefix = special
+                break
+        athletes[-1]["handles"].setdefault(platform, []).append(f"{prefix}{i}")
+    return athletes
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class Stage:
+    """Wall and CPU time for one pipeline stage"""
+
+    def __init__(self, stages, name):
+        self.stages = stages
+        self.name = name
+
+    def __enter__(self):
+        self.wall = time.perf_counter()
+        self.cpu = time.process_time()
+
+    def __exit__(self, *exc):
+        self.stages[self.name] = {
+            "wall_seconds": round(time.perf_counter() - self.wall, 4),
+            "cpu_seconds": round(time.process_time() - self.cpu, 4),
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+        }
+
+
+def run_size(size, base_urls, workers):
+    athletes = make_roster(size)
+    plan = FetchPlan()
+    for athlete in athletes:
+        plan.add_handles(athlete["handles"], owner=athlete["athlete"])
+    fetch_handles = plan.handles_by_platform(SCRAPED_PLATFORMS)
+
+    trace = AuditTrace()
+    scraper = SocialMediaScraper(transport=Transport(pool_maxsize=workers), base_urls=base_urls)
+    engine = ScrapeEngine(scraper, delay=0, max_workers=workers, trace=trace)
+    stages = {}
+
+    with Stage(stages, "scrape"):
+        unique_results = engine.scrape_all(fetch_handles)
+        results = index_results(fetch_handles, unique_results)
+
+    per_athlete = []
+    with Stage(stages, "analyze"):
+        for athlete in athletes:
+            scraped_results = plan.fan_out(results, SCRAPED_PLATFORMS, owner=athlete["athlete"])
+            per_athlete.append((athlete, scraped_results, analyze_scraped_data(scraped_results)))
+
+    documents = []
+    with Stage(stages, "report"):
+        for athlete, scraped_results, analysis in per_athlete:
+            accounts = sum(len(h) for h in athlete["handles"].values())
+            document = build_document(scraped_results, analysis, athlete["athlete"], accounts,
+                                      len(athlete["handles"]))
+            render_text(document)
+            documents.append(document)
+
+    pdf_bytes = 0
+    with Stage(stages, "pdf"):
+        for document in documents:
+            pdf_bytes += len(render_pdf(document))
+
+    latencies = [record["seconds"] for record in trace.spans if record["span"] == "scrape"]
+    errors = sum(1 for result in results.values() if result.is_error)
+    total_wall = sum(stage["wall_seconds"] for stage in stages.values())
+    transport = scraper.transport.report()
+    return {
+        "accounts": size,
+        "athletes": len(athletes),
+        "errors": errors,
+        "accounts_per_sec": round(size / max(stages["scrape"]["wall_seconds"], 1e-9), 1),
+        "pipeline_accounts_per_sec": round(size / max(total_wall, 1e-9), 1),
+        "latency_p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "latency_p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "retries": transport["retries"],
+        "connection_reuse": round(transport["reuse_ratio"], 3),
+        "pdf_bytes": pdf_bytes,
+        "stages": stages,
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR,
+                                       stderr=subprocess.DEVNULL).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current, previous_path):
+    with open(previous_path, encoding="utf-8") as f:
+        previous = {run["accounts"]: run for run in json.load(f)["runs"]}
+    print(f"\nCompared with {previous_path}:")
+    for run in current["runs"]:
+        before = previous.get(run["accounts"])
+        if before is None:
+            continue
+        for metric in ("accounts_per_sec", "latency_p95_ms", "peak_rss_mb"):
+            old, new = before[metric], run[metric]
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  {run['accounts']:>6} accounts  {metric:18} {old:>10} -> {new:>10}  ({change:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--workers", type=int, default=32, help="Scrape threads (default: %(default)s)")
+    parser.add_argument("--out", help="Results file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    server, base_urls = standin_server.start_in_subprocess()
+    try:
+        runs = []
+        for size in args.sizes:
+            run = run_size(size, base_urls, args.workers)
+            runs.append(run)
+            stage_text = "  ".join(f"{name} {s['wall_seconds']:.2f}s/{s['cpu_seconds']:.2f}cpu"
+                                   for name, s in run["stages"].items())
+            print(f"{size:>6} accounts: {run['accounts_per_sec']:>8} acc/s  "
+                  f"p50 {run['latency_p50_ms']}ms  p95 {run['latency_p95_ms']}ms  "
+                  f"rss {run['peak_rss_mb']}MB  errors {run['errors']}  | {stage_text}")
+    finally:
+        server.terminate()
+
+    results = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform_info.python_version(),
+        "workers": args.workers,
+        "runs": runs,
+    }
+    out = args.out or os.path.join(BENCH_DIR, "results",
+                                   f"pipeline-{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"Results written to {out}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
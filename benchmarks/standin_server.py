@@ -0,0 +1,132 @@
+"""Local stand-in for the platform hosts, used by the offline benchmarks.
+
+One threaded HTTP/1.1 server per platform serves fixture pages. The
+username decides how the server behaves, so a roster can mix in realistic
+failure cases:
+
+    missing*    404 Not Found
+    throttled*  429 with Retry-After: 1 on the first request, then the page
+    slow*       the page, after a 300 ms pause
+    private*    Instagram's private-account page
+    anything else: a normal public profile
+
+Run it on its own to poke at it by hand:
+
+    python benchmarks/standin_server.py
+"""
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import fixtures
+
+SLOW_SECONDS = 0.3
+
+PLATFORMS = ["instagram", "twitter", "tiktok", "youtube", "linkedin"]
+
+
+def _username(platform, path):
+    path = path.split("?", 1)[0].strip("/")
+    if platform == "youtube":
+        path = path.split("/")[-1]
+    return path.lstrip("@")
+
+
+def make_handler(platform):
+    throttled_once = set()
+    lock = threading.Lock()
+    pages = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status, body=b"", headers=None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.command != "HEAD":
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Streaming clients hang up once they have the <head>
+                    self.close_connection = True
+
+        def do_GET(self):
+            username = _username(platform, self.path)
+            if username.startswith("missing"):
+                return self._send(404, b"<html><body>Page not found</body></html>")
+            if username.startswith("throttled"):
+                with lock:
+                    first = username not in throttled_once
+                    throttled_once.add(username)
+                if first:
+                    return self._send(429, b"", {"Retry-After": "1"})
+            if username.startswith("slow"):
+                time.sleep(SLOW_SECONDS)
+            page = pages.get(username)
+            if page is None:
+                if platform == "instagram":
+                    page = fixtures.instagram_page(username, private=username.startswith("private"))
+                elif platform == "youtube":
+                    page = fixtures.youtube_page(username)
+                else:
+                    page = fixtures.stub_page(username)
+                pages[username] = page
+            self._send(200, page)
+
+        do_HEAD = do_GET
+
+    return Handler
+
+
+class QuietServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients that stop reading after </head> reset the connection; that's expected
+        if not isinstance(sys.exc_info()[1], (ConnectionResetError, BrokenPipeError)):
+            super().handle_error(request, client_address)
+
+
+def serve(ports_queue):
+    """Start one server per platform and report {platform: base_url} through the queue"""
+    servers = {}
+    for platform in PLATFORMS:
+        server = QuietServer(("127.0.0.1", 0), make_handler(platform))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers[platform] = f"http://127.0.0.1:{server.server_port}"
+    ports_queue.put(servers)
+    threading.Event().wait()
+
+
+def start_in_subprocess():
+    """Run the stand-in servers in their own process so they don't skew client CPU numbers.
+
+    Returns (process, {platform: base_url}); terminate the process when done.
+    """
+    ports_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(ports_queue,), daemon=True)
+    process.start()
+    return process, ports_queue.get(timeout=30)
+
+
+if __name__ == "__main__":
+    process, base_urls = start_in_subprocess()
+    for platform, url in base_urls.items():
+        print(f"{platform:10} {url}")
+    print("Press Ctrl+C to stop")
+    try:
+        process.join()
+    except KeyboardInterrupt:
+        process.terminate()
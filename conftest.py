@@ -0,0 +1 @@
+# Here so pytest puts the repository root on sys.path and the tests can import socialmediaaudit
@@ -0,0 +1 @@
+"""Scraping, analysis and reporting helpers for the Social Media Audit tool"""
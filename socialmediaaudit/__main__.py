@@ -0,0 +1,3 @@
+from socialmediaaudit.cli import main
+
+main()
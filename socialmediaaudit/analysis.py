@@ -0,0 +1,200 @@
+"""Analysis of scraped social media results"""
+import pandas as pd
+
+from socialmediaaudit.records import Record, Status, as_record
+
+TABLE_COLUMNS = ["athlete", "platform", "is_error", "error", "is_private", "audience",
+                 "username", "channel_name", "lists_subscribers", "text_field", "text"]
+
+# How platforms are written in messages when str.title() gets them wrong
+PLATFORM_LABELS = {"youtube": "YouTube", "tiktok": "TikTok", "linkedin": "LinkedIn"}
+
+# Audience counts above/below which an Instagram account gets an insight
+HIGH_FOLLOWERS = 10000
+LOW_FOLLOWERS = 100
+
+
+def _dict_count(value):
+    # Read as the per-result loop read it: int() of the text without commas, which lets
+    # signs, spaces and underscores through and skips counts that aren't strings
+    if not isinstance(value, str):
+        return None
+    try:
+        return int(value.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _dict_fields(record, result):
+    """(is_private, audience, username) of a result in dict form, read as the per-result loop read them"""
+    audience = _dict_count(result.get(record.audience_field)) if record.audience_field else None
+    username = str(result["username"]) if "username" in result else None
+    return bool(result.get("is_private", False)), audience, username
+
+
+def results_table(scraped_by_athlete):
+    """Normalize {athlete: scraped_results} into one typed row per scraped account.
+
+    Results may be records or their dict form. Row order follows the input,
+    so messages built from the table come out in the order the per-result
+    loop used to produce them. `audience` holds the platform's follower or
+    subscriber count as a nullable integer and `text` the bio or channel
+    description content review screens. Dict-form results are read with
+    the per-result loop's rules, so their analysis comes out as it did.
+    """
+    rows = []
+    for athlete, scraped_results in scraped_by_athlete.items():
+        for platform, results in scraped_results.items():
+            for result in results or []:
+                record = as_record(platform, result)
+                if isinstance(result, Record):
+                    is_private = bool(getattr(record, "is_private", False))
+                    audience, username = record.audience, getattr(record, "username", None)
+                else:
+                    is_private, audience, username = _dict_fields(record, result)
+                rows.append((
+                    athlete,
+                    platform,
+                    record.is_error,
+                    str(record.error) if record.is_error else None,
+                    is_private,
+                    audience,
+                    username,
+                    getattr(record, "channel_name", None),
+                    getattr(record, "subscribers", Status.UNAVAILABLE) is not Status.UNAVAILABLE,
+                    record.text_field,
+                    record.text,
+                ))
+    table = pd.DataFrame.from_records(rows, columns=TABLE_COLUMNS)
+    table["platform"] = table["platform"].astype("category")
+    table["is_error"] = table["is_error"].astype(bool)
+    table["is_private"] = table["is_private"].astype(bool)
+    table["lists_subscribers"] = table["lists_subscribers"].astype(bool)
+    table["audience"] = table["audience"].astype("Int64")
+    return table
+
+
+def _content_risks(table, scanner):
+    """Lexicon matches in every row's text, as a Series of messages indexed like `table`"""
+    texts = table["text"][table["text"].notna()]
+    messages = {}
+    for row, matches in zip(texts.index, scanner.scan_many(texts.tolist())):
+        if not matches:
+            continue
+        found = {}
+        for category, term in matches:
+            if term not in found.setdefault(category, []):
+                found[category].append(term)
+        platform = table.at[row, "platform"]
+        handle = table.at[row, "channel_name"] if platform == "youtube" else f"@{table.at[row, 'username']}"
+        mentions = ", ".join(f"{category} ({', '.join(terms)})" for category, terms in found.items())
+        messages[row] = (f"{PLATFORM_LABELS.get(platform, platform.title())} {handle}: "
+                         f"{table.at[row, 'text_field']} mentions {mentions}")
+    return pd.Series(messages, dtype=object)
+
+
+def _messages(table, scanner=None):
+    """Risk factors and insights for every row at once, as Series indexed like `table`"""
+    platform = table["platform"].astype(str)
+    ok = ~table["is_error"]
+    risks = (platform + ": " + table["error"])[table["is_error"]]
+    if scanner is not None:
+        risks = pd.concat([risks, _content_risks(table, scanner)]).sort_index()
+
+    audience = table["audience"]
+    instagram = ok & (platform == "instagram") & audience.notna() & table["username"].notna()
+    high = instagram & (audience > HIGH_FOLLOWERS).fillna(False)
+    low = instagram & (audience < LOW_FOLLOWERS).fillna(False)
+    handle = "Instagram @" + table["username"].astype(str)
+    high_insights = (handle[high] + ": High follower count ("
+                     + audience[high].map("{:,}".format) + ") - good for recruitment visibility")
+    low_insights = handle[low] + ": Low follower count - consider growing audience"
+
+    youtube = ok & (platform == "youtube") & table["lists_subscribers"]
+    youtube_insights = "YouTube " + table["channel_name"][youtube].astype(str) + ": Active video content creator"
+
+    insights = pd.concat([high_insights, low_insights, youtube_insights]).sort_index()
+    return risks, insights
+
+
+def _grouped_lists(messages, athletes):
+    # A groupby-agg(list) builds a Series per athlete; a single zip is far cheaper
+    grouped = {}
+    for athlete, message in zip(athletes[messages.index].tolist(), messages.tolist()):
+        grouped.setdefault(athlete, []).append(message)
+    return grouped
+
+
+def analyze_table(table, athletes=None, scanner=None):
+    """Analyze every athlete in a results table at once, returning {athlete: analysis}.
+
+    With a lexicon.RiskScanner, bios and descriptions are screened too and
+    any matches join the athlete's risk factors.
+    """
+    if athletes is None:
+        athletes = list(dict.fromkeys(table["athlete"]))
+    ok = ~table["is_error"]
+    by_athlete = table["athlete"]
+    counts = pd.DataFrame({
+        "total_platforms": table.groupby("athlete", sort=False).size(),
+        "accessible_platforms": ok.groupby(by_athlete, sort=False).sum(),
+        "private_accounts": (ok & table["is_private"]).groupby(by_athlete, sort=False).sum(),
+        "public_accounts": (ok & ~table["is_private"]).groupby(by_athlete, sort=False).sum(),
+    }).reindex(athletes, fill_value=0).astype(int)
+    counts["more_private"] = counts["private_accounts"] > counts["public_accounts"]
+    counts["few_platforms"] = counts["total_platforms"] < 3
+
+    risks, insights = _messages(table, scanner)
+    risks = _grouped_lists(risks, by_athlete)
+    insights = _grouped_lists(insights, by_athlete)
+
+    analyses = {}
+    for athlete, row in zip(athletes, counts.itertuples(index=False)):
+        recommendations = []
+        if row.more_private:
+            recommendations.append("Consider making key accounts public for recruitment visibility")
+        if row.few_platforms:
+            recommendations.append("Expand to more social media platforms for better digital presence")
+        analyses[athlete] = {
+            "total_platforms": int(row.total_platforms),
+            "accessible_platforms": int(row.accessible_platforms),
+            "private_accounts": int(row.private_accounts),
+            "public_accounts": int(row.public_accounts),
+            "platform_insights": insights.get(athlete, []),
+            "risk_factors": risks.get(athlete, []),
+            "recommendations": recommendations,
+        }
+    return analyses
+
+
+def analyze_scraped_data(scraped_results, scanner=None):
+    """Analyze the scraped social media data"""
+    return analyze_table(results_table({"": scraped_results}), athletes=[""], scanner=scanner)[""]
+
+
+def roster_summary(table):
+    """Per-athlete roster aggregates: account counts, success rate and audience percentile ranks.
+
+    `<platform>_audience` is the athlete's largest audience on that platform
+    and `<platform>_percentile` its rank within the roster (0-100).
+    """
+    ok = ~table["is_error"]
+    by_athlete = table["athlete"]
+    summary = pd.DataFrame({
+        "accounts": table.groupby("athlete", sort=False).size(),
+        "accessible": ok.groupby(by_athlete, sort=False).sum(),
+        "public": (ok & ~table["is_private"]).groupby(by_athlete, sort=False).sum(),
+        "issues": table["is_error"].groupby(by_athlete, sort=False).sum(),
+    })
+    summary["success_rate"] = (summary["accessible"] / summary["accounts"].clip(lower=1) * 100).round(1)
+
+    audiences = table[ok & table["audience"].notna()]
+    if len(audiences):
+        best = audiences.pivot_table(index="athlete", columns="platform", values="audience",
+                                     aggfunc="max", observed=True)
+        ranks = (best.rank(pct=True) * 100).round(1)
+        for platform in best.columns:
+            summary[f"{platform}_audience"] = best[platform].astype("Int64")
+            summary[f"{platform}_percentile"] = ranks[platform]
+    summary.index.name = "athlete"
+    return summary
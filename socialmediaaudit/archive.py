@@ -0,0 +1,150 @@
+"""Append-only archive of raw responses, for re-running parsers without the network.
+
+File layout: an 8-byte magic header, then one frame per response:
+
+    <u32 meta length> <u32 body length> <meta JSON> <zlib-compressed body>
+
+Frames are only ever appended, so several worker processes can record into
+the same file (appends are serialized with an advisory lock), and a reader
+can memory-map the file and index it in one pass without loading bodies.
+"""
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+from socialmediaaudit.cache import CachedResponse, cache_key
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+MAGIC = b"SMARC01\n"
+FRAME_HEADER = struct.Struct("<II")
+
+
+def _read_at(fd, length, offset):
+    """Read from an offset of a file descriptor; os.pread does not exist on Windows"""
+    os.lseek(fd, offset, os.SEEK_SET)
+    return os.read(fd, length)
+
+
+def _complete_length(fd, size):
+    """Offset just past the last whole frame of an archive file, reading only frame headers"""
+    offset = len(MAGIC)
+    while offset + FRAME_HEADER.size <= size:
+        meta_len, body_len = FRAME_HEADER.unpack(_read_at(fd, FRAME_HEADER.size, offset))
+        end = offset + FRAME_HEADER.size + meta_len + body_len
+        if end > size:
+            break
+        offset = end
+    return offset
+
+
+class ArchiveWriter:
+    """Appends responses to an archive file"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND | getattr(os, "O_BINARY", 0), 0o644)
+        # Every batch worker opens the same file; under the lock only the first writes the
+        # header, and a torn frame left by an interrupted run is cut off before anyone appends
+        with self._locked():
+            size = os.fstat(self.fd).st_size
+            is_archive = size < len(MAGIC) or _read_at(self.fd, len(MAGIC), 0) == MAGIC
+            if size < len(MAGIC):
+                os.ftruncate(self.fd, 0)
+                os.write(self.fd, MAGIC)
+            elif is_archive:
+                end = _complete_length(self.fd, size)
+                if end < size:
+                    os.ftruncate(self.fd, end)
+        if not is_archive:
+            os.close(self.fd)
+            raise ValueError(f"{path} is not a response archive")
+
+    @contextmanager
+    def _locked(self):
+        with self.lock:
+            if fcntl:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(self.fd, fcntl.LOCK_UN)
+
+    def _write(self, data):
+        with self._locked():
+            os.write(self.fd, data)
+
+    def append(self, platform, method, url, status, headers, body):
+        meta = json.dumps({
+            "platform": platform,
+            "method": method,
+            "url": url,
+            "status": status,
+            "headers": dict(headers),
+            "recorded_at": time.time(),
+        }).encode()
+        compressed = zlib.compress(body)
+        self._write(FRAME_HEADER.pack(len(meta), len(compressed)) + meta + compressed)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class ArchiveReader:
+    """Memory-mapped, indexed view of an archive file.
+
+    Only frame headers and metadata are read when the archive is opened;
+    bodies are decompressed on lookup. When a URL was recorded more than
+    once, the latest response wins.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index = {}
+        with open(path, "rb") as f:
+            head = f.read(len(MAGIC))
+            # A writer that died before finishing the header leaves an empty archive
+            # behind, and an empty file can't be memory-mapped
+            if len(head) < len(MAGIC) and MAGIC.startswith(head):
+                self.map = None
+                return
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.map[:len(MAGIC)] != MAGIC:
+            self.map.close()
+            raise ValueError(f"{path} is not a response archive")
+        offset = len(MAGIC)
+        size = len(self.map)
+        while offset + FRAME_HEADER.size <= size:
+            meta_len, body_len = FRAME_HEADER.unpack_from(self.map, offset)
+            body_start = offset + FRAME_HEADER.size + meta_len
+            if body_start + body_len > size:
+                break  # torn write at the end of an interrupted run
+            meta = json.loads(self.map[offset + FRAME_HEADER.size:body_start])
+            self.index[cache_key(meta["url"], meta["method"])] = (meta, body_start, body_len)
+            offset = body_start + body_len
+
+    def __len__(self):
+        return len(self.index)
+
+    def lookup(self, url, method="GET"):
+        """Return the archived response for a request, or None"""
+        entry = self.index.get(cache_key(url, method))
+        if entry is None:
+            return None
+        meta, start, length = entry
+        body = zlib.decompress(self.map[start:start + length])
+        return CachedResponse(meta["status"], meta["headers"], body)
+
+    def close(self):
+        if self.map is not None:
+            self.map.close()
@@ -0,0 +1,382 @@
+"""Headless roster audits spread across a process pool"""
+import csv
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from socialmediaaudit.analysis import analyze_scraped_data, results_table, roster_summary
+from socialmediaaudit.archive import ArchiveReader, ArchiveWriter
+from socialmediaaudit.brand import apply_consistency, roster_brand
+from socialmediaaudit.cache import ResponseCache
+from socialmediaaudit.canonical import PLATFORMS, SCRAPED_PLATFORMS, FetchPlan, index_results
+from socialmediaaudit.engine import ScrapeEngine
+from socialmediaaudit.lexicon import default_scanner
+from socialmediaaudit.metrics import REGISTRY, Registry, span
+from socialmediaaudit.records import as_dict
+from socialmediaaudit.report import change_lines
+from socialmediaaudit.scraper import SocialMediaScraper
+from socialmediaaudit.snapshots import SnapshotStore
+
+# Separator for several handles on one platform in a single roster cell
+HANDLE_SEPARATOR = ";"
+
+# Extra tries a failed fetch task gets before its athletes are left for the next run
+FETCH_RETRIES = 1
+
+
+def read_roster(path):
+    """Read a roster CSV into a list of {"athlete", "handles"} rows.
+
+    The file needs an `athlete` column (or `id`, used as the athlete key when
+    present) plus any of the platform columns. A cell may hold several
+    handles separated by semicolons. Optional `priority` (a number, default
+    1) and `active_until` (YYYY-MM-DD) columns steer the monitor. A JSONL
+    file written by a previous batch run is accepted too, so past audits
+    can be replayed.
+    """
+    athletes = []
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    athletes.append({key: record[key] for key in ("athlete", "name", "handles")})
+        return athletes
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            row = {(k or "").strip().lower(): (v or "") for k, v in row.items()}
+            athlete = (row.get("id") or row.get("athlete") or "").strip()
+            if not athlete:
+                continue
+            handles = {}
+            for platform in PLATFORMS:
+                cell = row.get(platform, "")
+                handles[platform] = [h.strip() for h in cell.split(HANDLE_SEPARATOR) if h.strip()]
+            try:
+                priority = float(row.get("priority") or 1)
+            except ValueError:
+                priority = 1
+            athletes.append({"athlete": athlete, "name": row.get("athlete", athlete).strip(), "handles": handles,
+                             "priority": priority, "active_until": row.get("active_until", "").strip()})
+    return athletes
+
+
+def completed_athletes(output_path):
+    """Athlete keys already written to a JSONL output file.
+
+    A trailing partial line left by an interrupted run is truncated so the
+    next run can append cleanly.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    done = set()
+    for line in data[:end].splitlines():
+        try:
+            done.add(json.loads(line)["athlete"])
+        except (ValueError, KeyError):
+            continue
+    return done
+
+
+_engine = None
+
+
+def _init_worker(delay, use_cache, record_path, replay_path, base_urls):
+    global _engine
+    # Forked workers inherit the parent's metrics; start from zero so merging doesn't double count
+    REGISTRY.reset()
+    cache = ResponseCache() if use_cache else None
+    recorder = ArchiveWriter(record_path) if record_path else None
+    replay = ArchiveReader(replay_path) if replay_path else None
+    scraper = SocialMediaScraper(cache=cache, base_urls=base_urls, recorder=recorder, replay=replay)
+    _engine = ScrapeEngine(scraper, delay=delay)
+
+
+def fetch_accounts(handles_by_platform):
+    """Scrape a set of canonical handles inside a worker process"""
+    start = time.monotonic()
+    scraped_results = _engine.scrape_all(handles_by_platform)
+    indexed = index_results(handles_by_platform, scraped_results)
+    worker_stats = (os.getpid(), _engine.scraper.transport.report(), REGISTRY.snapshot())
+    return list(indexed.items()), time.monotonic() - start, worker_stats
+
+
+def _athlete_record(athlete, plan, results, store, taken_at, scanner, brand_consistency):
+    scraped_results = plan.fan_out(results, SCRAPED_PLATFORMS, owner=athlete["athlete"])
+    handles = athlete["handles"]
+    with span("analyze"):
+        analysis = analyze_scraped_data(scraped_results, scanner=scanner)
+        if brand_consistency:
+            apply_consistency(analysis, handles, scraped_results)
+    record = {
+        "athlete": athlete["athlete"],
+        "name": athlete["name"],
+        "handles": handles,
+        "results": {platform: [as_dict(result) for result in results] for platform, results in scraped_results.items()},
+        "analysis": analysis,
+        "accounts": sum(len(h) for platform, h in handles.items() if platform in SCRAPED_PLATFORMS),
+        "audited_at": time.strftime("%Y-%m-%d %H:%M:%S"),
+    }
+    if store is not None:
+        record["changes"] = change_lines(store.changes(plan.owner_accounts(athlete["athlete"]), results, taken_at))
+    return record
+
+
+class RosterWriter:
+    """Tracks which accounts a roster audit still needs and writes each athlete's line once all of theirs are in.
+
+    Handles are canonicalized across the whole roster first: an account
+    shared by several athletes (or entered twice in different forms) is
+    fetched once, by the first athlete that names it. With a snapshot
+    store, accounts whose latest snapshot is still fresh are taken from it
+    instead of fetched, every fetched result is saved to it, and each line
+    gets follower changes since the previous snapshot.
+
+    `tasks` lists (athlete, accounts) for every athlete that is the first
+    to name an account still to be fetched; results go to add() as they
+    come in, from whichever process fetched them.
+    """
+
+    def __init__(self, pending, out, store=None, scanner=None, brand_consistency=True, log=print):
+        self.out = out
+        self.store = store
+        self.scanner = scanner
+        self.brand_consistency = brand_consistency
+        self.log = log
+        self.total = len(pending)
+        self.written = 0
+        self.accounts = 0
+        self.by_key = {a["athlete"]: a for a in pending}
+
+        self.plan = FetchPlan()
+        for athlete in pending:
+            self.plan.add_handles(athlete["handles"], owner=athlete["athlete"])
+        self.results = {}
+        self.taken_at = {}
+        if store is not None:
+            scraped_accounts = [a for a in self.plan.accounts.values() if a.platform in SCRAPED_PLATFORMS]
+            for key, (fetched_at, result) in store.fresh_results(scraped_accounts).items():
+                self.results[key] = result
+                self.taken_at[key] = fetched_at
+            log(f"{len(self.results)} of {len(scraped_accounts)} accounts have fresh snapshots and won't be refetched")
+
+        # Give each account to the first athlete that names it and track who waits on it
+        self.owners = {}
+        self.tasks = []
+        self.waiting_on = {}
+        self.missing = {}
+        for athlete in pending:
+            owned = []
+            needed = set()
+            for account in self.plan.owner_accounts(athlete["athlete"]):
+                if account.platform not in SCRAPED_PLATFORMS:
+                    continue
+                key = (account.platform, account.key)
+                if key in self.results:
+                    continue
+                needed.add(key)
+                self.waiting_on.setdefault(key, []).append(athlete["athlete"])
+                if key not in self.owners:
+                    self.owners[key] = athlete["athlete"]
+                    owned.append(account)
+            self.missing[athlete["athlete"]] = len(needed)
+            if owned:
+                self.tasks.append((athlete, owned))
+        log(f"{len(self.plan.inputs)} handles resolve to {len(self.plan.accounts)} unique accounts "
+            f"({self.plan.savings() * 100:.0f}% fewer fetches)")
+
+    def write_ready(self, athlete_keys):
+        """Write the line of every athlete in `athlete_keys` that has no accounts left to wait for"""
+        for athlete_key in athlete_keys:
+            if self.missing[athlete_key] != 0:
+                continue
+            self.missing[athlete_key] = -1
+            record = _athlete_record(self.by_key[athlete_key], self.plan, self.results, self.store, self.taken_at,
+                                     self.scanner, self.brand_consistency)
+            self.out.write(json.dumps(record) + "\n")
+            self.out.flush()
+            self.accounts += record["accounts"]
+            self.written += 1
+            self.log(f"[{self.written}/{self.total}] {athlete_key}: {record['accounts']} accounts")
+
+    def unfinished(self):
+        """Athletes whose lines were never written because some of their accounts never came in"""
+        return [athlete_key for athlete_key, missing in self.missing.items() if missing > 0]
+
+    def add(self, fetched, fetched_at=None):
+        """Take fetched ((platform, account_key), result) pairs and write the athletes they complete"""
+        fetched_at = fetched_at or time.time()
+        if self.store is not None:
+            self.store.save([(self.owners.get((platform, account_key)), platform, account_key, result)
+                             for (platform, account_key), result in fetched], fetched_at=fetched_at)
+        ready = []
+        for key, result in fetched:
+            self.results[key] = result
+            self.taken_at[key] = fetched_at
+            for athlete_key in self.waiting_on.get(key, []):
+                self.missing[athlete_key] -= 1
+                ready.append(athlete_key)
+        self.write_ready(ready)
+
+
+def run_summary(writer, elapsed, workers_stats, metrics_path, log):
+    """Log and return a run's throughput, merging the workers' transport stats and metrics"""
+    summary = {
+        "athletes": writer.written,
+        "accounts": writer.accounts,
+        "elapsed": round(elapsed, 3),
+        "accounts_per_minute": round(writer.accounts / max(elapsed, 1e-9) * 60, 1),
+        "failed": writer.unfinished(),
+    }
+    log(f"Audited {writer.accounts} accounts for {writer.written} athletes in {elapsed:.1f}s "
+        f"({summary['accounts_per_minute']} accounts/min)")
+    if summary["failed"]:
+        log(f"{len(summary['failed'])} of {writer.total} athletes could not be audited and were not written; "
+            f"run again to retry them: {', '.join(summary['failed'])}")
+    transports = [transport for transport, _ in workers_stats.values()]
+    if transports:
+        opened = sum(t["connections_opened"] for t in transports)
+        sent = sum(t["pooled_requests"] for t in transports)
+        summary["retries"] = sum(t["retries"] for t in transports)
+        summary["connection_reuse"] = round(1 - opened / sent, 3) if sent else 0.0
+        log(f"{summary['retries']} retries, {summary['connection_reuse'] * 100:.0f}% connection reuse "
+            f"({opened} connections for {sent} requests)")
+    if metrics_path:
+        merged = Registry()
+        merged.merge(REGISTRY.snapshot())
+        for _, metrics in workers_stats.values():
+            merged.merge(metrics)
+        with open(metrics_path, "w", encoding="utf-8") as f:
+            f.write(merged.to_prometheus() if metrics_path.endswith(".prom") else merged.to_json())
+        log(f"Metrics written to {metrics_path}")
+    return summary
+
+
+def run_batch(roster_path, output_path, workers=4, delay=3, use_cache=True, metrics_path=None,
+              record_path=None, replay_path=None, base_urls=None, use_history=True, content_review=True,
+              brand_consistency=True, log=print):
+    """Audit every athlete in a roster, appending one JSON line per athlete.
+
+    Athletes already present in `output_path` are skipped, so an interrupted
+    run can simply be started again. Accounts are deduplicated across the
+    whole roster (see RosterWriter) and each athlete's line is written as
+    soon as all of its accounts are in. Each worker process spaces requests
+    to a host by `delay * workers`, keeping the pool as a whole within
+    `delay` seconds per request per platform.
+
+    With `metrics_path`, the merged metrics of all workers are written there
+    at the end (Prometheus text for a .prom path, JSON otherwise).
+
+    `record_path` appends every raw response to an archive; `replay_path`
+    serves responses from such an archive instead of the network, so the
+    current parsers can be re-run over a past audit at disk speed.
+    `base_urls` points platforms at other hosts, such as a stand-in server.
+
+    With `use_history`, every result is saved to the snapshot store, accounts
+    whose latest snapshot is still inside the platform's freshness window are
+    reused instead of fetched, and each line gets follower changes since the
+    previous snapshot. Replays never read or write history.
+
+    With `content_review`, bios and channel descriptions are screened
+    against the risk lexicon (see socialmediaaudit.lexicon). With
+    `brand_consistency`, each line's analysis gets a score for how well the
+    athlete's handles and bios match across platforms; look-alikes between
+    athletes need the whole roster and come from brand_results().
+    """
+    athletes = read_roster(roster_path)
+    done = completed_athletes(output_path)
+    pending = [a for a in athletes if a["athlete"] not in done]
+    log(f"{len(athletes)} athletes in roster, {len(done)} already audited, {len(pending)} to go")
+    if not pending:
+        return {"athletes": 0, "accounts": 0, "elapsed": 0.0, "accounts_per_minute": 0.0, "failed": []}
+    if replay_path:
+        # Nothing goes over the network, so there is nothing to rate-limit or cache
+        delay, use_cache = 0, False
+
+    store = SnapshotStore() if use_history and not replay_path else None
+    scanner = default_scanner() if content_review else None
+    workers_stats = {}
+    start = time.monotonic()
+    with open(output_path, "a", encoding="utf-8") as out, ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(delay * workers, use_cache, record_path, replay_path, base_urls)
+    ) as pool:
+        writer = RosterWriter(pending, out, store=store, scanner=scanner, brand_consistency=brand_consistency, log=log)
+        # Athletes with nothing to fetch can be written straight away
+        writer.write_ready(list(writer.missing))
+
+        futures = {}
+        for athlete, owned in writer.tasks:
+            handles = writer.plan.handles_by_platform(SCRAPED_PLATFORMS, owned)
+            futures[pool.submit(fetch_accounts, handles)] = (athlete, handles, 0)
+        while futures:
+            finished, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in finished:
+                athlete, handles, tries = futures.pop(future)
+                try:
+                    fetched, _, (pid, transport, metrics) = future.result()
+                except Exception as e:
+                    if tries < FETCH_RETRIES:
+                        log(f"{athlete['athlete']}: fetch failed ({e}), retrying")
+                        futures[pool.submit(fetch_accounts, handles)] = (athlete, handles, tries + 1)
+                    else:
+                        log(f"{athlete['athlete']}: fetch failed ({e})")
+                    continue
+                workers_stats[pid] = (transport, metrics)
+                writer.add(fetched)
+
+    return run_summary(writer, time.monotonic() - start, workers_stats, metrics_path, log)
+
+
+def summarize_results(results_path, output_path, log=print):
+    """Write roster-wide aggregates for a batch output file as CSV.
+
+    Every athlete's results go into one columnar table, so counts, success
+    rates and per-platform audience percentile ranks come from a handful of
+    vectorized operations however large the roster is.
+    """
+    scraped_by_athlete = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                scraped_by_athlete[record["athlete"]] = record["results"]
+    summary = roster_summary(results_table(scraped_by_athlete))
+    summary.to_csv(output_path)
+    log(f"Summarized {len(summary)} athletes into {output_path}")
+    return summary
+
+
+def brand_results(results_path, output_path, log=print):
+    """Write per-athlete brand consistency and cross-roster look-alike accounts for a batch output file as CSV.
+
+    Every account in the file goes into one similarity index, so an
+    account resembling a teammate's is found without comparing each pair
+    of athletes. Each look-alike pair is listed on both athletes' rows.
+    """
+    athletes = {}
+    names = {}
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                athletes[record["athlete"]] = (record["handles"], record["results"])
+                names[record["athlete"]] = record["name"]
+    start = time.monotonic()
+    report = roster_brand(athletes, names)
+    elapsed = time.monotonic() - start
+    with open(output_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["athlete", "name", "consistency", "off_brand", "lookalikes"])
+        for athlete, brand in report.items():
+            writer.writerow([athlete, names[athlete], "" if brand["consistency"] is None else brand["consistency"],
+                             "; ".join(brand["off_brand"]), "; ".join(brand["lookalikes"])])
+    flagged = sum(1 for brand in report.values() if brand["lookalikes"])
+    log(f"Checked {len(report)} athletes' brands in {elapsed:.1f}s; {flagged} have look-alike accounts. "
+        f"Written to {output_path}")
+    return report
@@ -0,0 +1,372 @@
+"""Brand consistency across an athlete's accounts and look-alike accounts across a roster"""
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from socialmediaaudit.analysis import PLATFORM_LABELS
+from socialmediaaudit.canonical import FetchPlan
+from socialmediaaudit.lexicon import LEET, normalize
+from socialmediaaudit.records import as_record
+
+# MinHash signature length and LSH banding. Handles are cut into 32 bands of 3 rows, making pairs
+# that share about a third of their trigrams likely candidates ((1/32) ** (1/3) ~ 0.31); bios are
+# only compared as near copies and use 16 bands of 6 ((1/16) ** (1/6) ~ 0.63)
+NUM_PERM = 96
+HANDLE_BANDS = 32
+TEXT_BANDS = 16
+
+# Signature slot of a set with no trigrams
+EMPTY = np.uint32(2**32 - 1)
+
+# Trigrams hashed, or candidate pairs estimated, per block; bounds the (block x NUM_PERM) work arrays
+SIGNATURE_BLOCK = 32768
+
+# How far below the threshold a candidate's signature estimate may fall and still have its exact sets
+# compared: about three standard deviations of a NUM_PERM-slot estimate
+ESTIMATE_SLACK = 0.15
+
+# An LSH bucket holding more accounts than this is boilerplate much of the roster shares (a team
+# bio template), not a look-alike; its members are still compared through their other bands
+MAX_BUCKET = 200
+
+# Handles look alike at this trigram Jaccard similarity, or when this much of the shorter one's
+# trigrams appear in the longer ("realjdoe23" and "jdoe23"); shorter handles are too generic to judge
+LOOKALIKE_HANDLE = 0.5
+LOOKALIKE_CONTAINMENT = 0.8
+MIN_HANDLE_TRIGRAMS = 5
+
+# Bios or descriptions at this similarity are near copies; texts with fewer trigrams aren't compared
+NEAR_COPY_TEXT = 0.8
+MIN_TEXT_TRIGRAMS = 20
+TEXT_CHAR_CAP = 1000
+
+# An account whose handle matches none of the athlete's other handles this well is off-brand
+OFF_BRAND = 0.3
+# Weight of handle similarity in the consistency score; the rest is bio similarity when there is any
+HANDLE_WEIGHT = 0.7
+
+# One of an athlete's accounts as the brand checks see it. `name` is the handle or channel name
+# shown in messages, `handle_grams` and `text_grams` the trigram sets compared, and `failed`
+# whether its scrape came back as an error.
+BrandAccount = namedtuple("BrandAccount",
+                          ["athlete", "platform", "key", "name", "handle_grams", "text_grams", "failed"])
+
+
+def trigrams(text):
+    """Character trigrams of a text padded with a space at each end"""
+    text = f" {text} "
+    return frozenset(text[i:i + 3] for i in range(len(text) - 2))
+
+
+def handle_trigrams(name):
+    """Trigrams of a handle with case, leetspeak and separators (".", "_", "-") ignored"""
+    return trigrams(re.sub(r"[\W_]+", "", name.casefold().translate(LEET))) if name else frozenset()
+
+
+def text_trigrams(text):
+    """Trigrams of a bio or description, normalized like content review normalizes it"""
+    return trigrams(normalize(text[:TEXT_CHAR_CAP]).strip()) if text else frozenset()
+
+
+def jaccard(a, b):
+    if not a or not b:
+        return 0.0
+    shared = len(a & b)
+    return shared / (len(a) + len(b) - shared)
+
+
+def containment(a, b):
+    """Share of the smaller set's members that are in the other"""
+    return len(a & b) / min(len(a), len(b)) if a and b else 0.0
+
+
+def _account_name(account):
+    if account.platform != "youtube":
+        return account.key
+    if account.key.startswith("@"):
+        return account.key[1:]
+    if not account.key.startswith("channel/"):
+        return account.key.split("/")[-1]
+    # A channel ID says nothing about the brand, and the scraper doesn't read the channel's title
+    return None
+
+
+def athlete_accounts(athlete, handles, scraped_results):
+    """The unique accounts an athlete's handles name, with the texts their scrape results hold.
+
+    Results line up with the canonical inputs of each platform the way
+    FetchPlan.fan_out produced them. Platforms that aren't scraped still
+    count through their handles.
+    """
+    plan = FetchPlan()
+    plan.add_handles(handles)
+    positions = {}
+    accounts = {}
+    for _, account in plan.inputs:
+        results = scraped_results.get(account.platform) or []
+        position = positions.get(account.platform, 0)
+        positions[account.platform] = position + 1
+        record = as_record(account.platform, results[position]) if position < len(results) else None
+        if (account.platform, account.key) in accounts:
+            continue
+        name = _account_name(account)
+        text = record.text if record is not None else None
+        accounts[(account.platform, account.key)] = BrandAccount(
+            athlete, account.platform, account.key, name, handle_trigrams(name), text_trigrams(text),
+            record is not None and record.is_error)
+    return list(accounts.values())
+
+
+def describe(account):
+    """How an account is named in messages, e.g. "Instagram @jdoe23" """
+    label = PLATFORM_LABELS.get(account.platform, account.platform.title())
+    if account.platform == "youtube" and account.key.startswith("channel/"):
+        return f"{label} youtube.com/{account.key}"
+    return f"{label} @{account.name}"
+
+
+def _best_matches(sets, similarity=jaccard):
+    """For each set, its highest similarity with any of the others"""
+    return [max(similarity(a, b) for j, b in enumerate(sets) if j != i) for i, a in enumerate(sets)]
+
+
+def _handle_similarity(a, b):
+    # One person's handles often differ by an added word ("jdoe23" and "jdoe23hoops")
+    return max(jaccard(a, b), containment(a, b))
+
+
+def consistency(accounts):
+    """Score (0-100) how well an athlete's accounts match each other, plus the off-brand ones.
+
+    Each handle is scored by its best match among the athlete's other
+    handles, and likewise each bio, so one odd account out lowers the
+    score without hiding that the rest agree. Two handles match by the
+    higher of their Jaccard similarity and their containment ratio (the
+    share of the shorter handle's trigrams found in the longer one), so
+    "jdoe23hoops" still matches "jdoe23" closely. Returns (score,
+    [(account, best match)]); the score is None with fewer than two named
+    accounts.
+    """
+    named = [account for account in accounts if account.handle_grams]
+    if len(named) < 2:
+        return None, []
+    handle_best = _best_matches([account.handle_grams for account in named], _handle_similarity)
+    score = sum(handle_best) / len(handle_best)
+    texts = [account.text_grams for account in accounts if len(account.text_grams) >= MIN_TEXT_TRIGRAMS]
+    if len(texts) >= 2:
+        text_best = _best_matches(texts)
+        score = HANDLE_WEIGHT * score + (1 - HANDLE_WEIGHT) * sum(text_best) / len(text_best)
+    off_brand = [(account, best) for account, best in zip(named, handle_best) if best < OFF_BRAND]
+    return round(score * 100), off_brand
+
+
+def apply_consistency(analysis, handles, scraped_results):
+    """Add an athlete's brand consistency score, and a recommendation per off-brand handle, to an analysis"""
+    score, off_brand = consistency(athlete_accounts("", handles, scraped_results))
+    analysis["brand_consistency"] = score
+    for account, best in off_brand:
+        if account.failed:
+            # There's no live account to align, and the scrape error is reported already
+            continue
+        analysis["recommendations"].append(
+            f"Align {describe(account)} with your other handles for a consistent brand (closest match {best:.0%})")
+    return analysis
+
+
+class SimilarityIndex:
+    """Finds similar pairs among many trigram sets without comparing every pair.
+
+    Each set gets a MinHash signature: `num_perm` hash functions, each
+    keeping the smallest hash of any member, so two signatures agree in a
+    slot with probability equal to the sets' Jaccard similarity. Signatures
+    are cut into `bands` and sets sharing a whole band land in the same LSH
+    bucket; more, shorter bands catch less similar pairs. Only pairs that
+    meet in some bucket are candidates. Candidates whose signatures agree
+    well enough are confirmed on their exact sets. Hashing, bucketing and
+    the signature check run in numpy over whole arrays; Python only sees
+    the pairs that survive them.
+    """
+
+    def __init__(self, num_perm=NUM_PERM, bands=HANDLE_BANDS, seed=1, stats=None):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        rng = np.random.default_rng(seed)
+        self.num_perm = num_perm
+        self.bands = bands
+        # Multiply-shift hashing: (a * x + b) mod 2**64, top 32 bits, with a odd
+        self.a = rng.integers(1, 2**63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self.b = rng.integers(0, 2**63, size=num_perm, dtype=np.uint64)
+        self.stats = stats if stats is not None else {}
+        for name in ("sets", "candidates", "estimated", "pairs"):
+            self.stats.setdefault(name, 0)
+
+    def signatures(self, sets):
+        """MinHash signatures of `sets` as a (len(sets), num_perm) uint32 array; empty sets are all EMPTY"""
+        # Athletes often reuse one bio across platforms; each distinct set is hashed once
+        distinct = {}
+        rows = [distinct.setdefault(s, len(distinct)) for s in sets]
+        return self._signatures(list(distinct))[rows]
+
+    def _signatures(self, sets):
+        sizes = np.fromiter((len(s) for s in sets), dtype=np.int64, count=len(sets))
+        ends = np.cumsum(sizes)
+        starts = ends - sizes
+        # Every trigram is three characters, so one UTF-32 encode of them all packs each into an int
+        codes = np.frombuffer("".join(map("".join, sets)).encode("utf-32-le"), dtype=np.uint32)
+        codes = codes.reshape(-1, 3).astype(np.uint64)
+        values = (codes[:, 0] << np.uint64(42)) | (codes[:, 1] << np.uint64(21)) | codes[:, 2]
+        signatures = np.full((len(sets), self.num_perm), EMPTY, dtype=np.uint32)
+        filled = np.flatnonzero(sizes)
+        i = 0
+        while i < len(filled):
+            # Whole sets per block, so every segment handed to reduceat is non-empty
+            j = max(i + 1, int(np.searchsorted(ends[filled], starts[filled[i]] + SIGNATURE_BLOCK, side="right")))
+            rows = filled[i:j]
+            low, high = starts[rows[0]], ends[rows[-1]]
+            hashed = ((values[low:high, None] * self.a + self.b) >> np.uint64(32)).astype(np.uint32)
+            signatures[rows] = np.minimum.reduceat(hashed, starts[rows] - low, axis=0)
+            i = j
+        return signatures
+
+    def candidates(self, signatures):
+        """Index pairs sharing at least one LSH bucket, as two arrays `first` < `second`"""
+        rows = self.num_perm // self.bands
+        filled = np.flatnonzero(signatures[:, 0] != EMPTY)
+        if len(filled) < 2:
+            # Nothing to pair; an empty band would also trip up the bucket grouping below
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        firsts, seconds = [], []
+        for band in range(self.bands):
+            block = signatures[filled, band * rows:(band + 1) * rows].astype(np.uint64)
+            keys = block[:, 0]
+            for column in range(1, rows):
+                keys = keys * np.uint64(0x9E3779B97F4A7C15) + block[:, column]
+            order = np.argsort(keys, kind="stable")
+            keys = keys[order]
+            group = np.concatenate(([0], np.cumsum(keys[1:] != keys[:-1])))
+            sizes = np.bincount(group)[group]
+            shared = (sizes > 1) & (sizes <= MAX_BUCKET)
+            members, group = filled[order[shared]], group[shared]
+            # Members of a bucket sit next to each other; pair each with the one `step` places on
+            for step in range(1, len(members)):
+                same = group[step:] == group[:-step]
+                if not same.any():
+                    break
+                firsts.append(members[:-step][same])
+                seconds.append(members[step:][same])
+        if not firsts:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        first, second = np.concatenate(firsts), np.concatenate(seconds)
+        codes = np.unique(np.minimum(first, second) * len(signatures) + np.maximum(first, second))
+        return codes // len(signatures), codes % len(signatures)
+
+    def similar_pairs(self, sets, threshold, min_containment=None):
+        """(i, j, similarity) for pairs of `sets` at or above the Jaccard `threshold`.
+
+        With `min_containment`, pairs where that share of the smaller set
+        is in the larger also count, reported with their containment.
+        """
+        signatures = self.signatures(sets)
+        first, second = self.candidates(signatures)
+        needed = np.full(len(first), threshold)
+        if min_containment is not None:
+            sizes = np.fromiter((len(s) for s in sets), dtype=np.float64, count=len(sets))
+            small = np.minimum(sizes[first], sizes[second])
+            large = np.maximum(sizes[first], sizes[second])
+            # The lowest Jaccard at which the smaller set can still be min_containment inside the larger
+            needed = np.minimum(needed, min_containment * small / (small + large - min_containment * small))
+        keep = np.empty(len(first), dtype=bool)
+        for start in range(0, len(first), SIGNATURE_BLOCK):
+            block = slice(start, start + SIGNATURE_BLOCK)
+            estimate = (signatures[first[block]] == signatures[second[block]]).mean(axis=1)
+            keep[block] = estimate >= needed[block] - ESTIMATE_SLACK
+
+        similar = []
+        for i, j in zip(first[keep].tolist(), second[keep].tolist()):
+            similarity = jaccard(sets[i], sets[j])
+            if similarity >= threshold:
+                similar.append((i, j, similarity))
+            elif min_containment is not None:
+                contained = containment(sets[i], sets[j])
+                if contained >= min_containment:
+                    similar.append((i, j, contained))
+        self.stats["sets"] += len(sets)
+        self.stats["candidates"] += len(first)
+        self.stats["estimated"] += int(keep.sum())
+        self.stats["pairs"] += len(similar)
+        return similar
+
+
+def lookalikes(accounts, stats=None):
+    """Pairs of different accounts, named by different athletes, whose handles or bios look alike.
+
+    An account several athletes name (a team page) is one account, not a
+    look-alike of itself. Returns [(account, other, kind, similarity)] with
+    kind "handle" or "bio"; `account` and `other` are BrandAccounts whose
+    athlete fields name one owner each. `stats` collects SimilarityIndex
+    counters when given.
+    """
+    unique = {}
+    owners = {}
+    for account in accounts:
+        key = (account.platform, account.key)
+        unique.setdefault(key, account)
+        owners.setdefault(key, set()).add(account.athlete)
+    keys = list(unique)
+
+    found = []
+    checks = [
+        ("handle", [k for k in keys if len(unique[k].handle_grams) >= MIN_HANDLE_TRIGRAMS],
+         lambda account: account.handle_grams, HANDLE_BANDS, LOOKALIKE_HANDLE, LOOKALIKE_CONTAINMENT),
+        ("bio", [k for k in keys if len(unique[k].text_grams) >= MIN_TEXT_TRIGRAMS],
+         lambda account: account.text_grams, TEXT_BANDS, NEAR_COPY_TEXT, None),
+    ]
+    for kind, candidates, grams, bands, threshold, min_containment in checks:
+        index = SimilarityIndex(bands=bands, stats=stats)
+        sets = [grams(unique[key]) for key in candidates]
+        for i, j, similarity in index.similar_pairs(sets, threshold, min_containment):
+            first, second = candidates[i], candidates[j]
+            for athlete in sorted(owners[first] - owners[second]):
+                for other in sorted(owners[second] - owners[first]):
+                    found.append((unique[first]._replace(athlete=athlete), unique[second]._replace(athlete=other),
+                                  kind, similarity))
+    return found
+
+
+def roster_brand(athletes, names=None, stats=None):
+    """Consistency scores and look-alike warnings for every athlete of a roster.
+
+    `athletes` maps athlete keys to (handles, scraped_results). Returns
+    {athlete: {"consistency", "off_brand", "lookalikes"}} with the latter
+    two as message lists; each look-alike pair is reported to both
+    athletes. Accounts across the whole roster go through a
+    SimilarityIndex, so the work grows with the number of accounts rather
+    than the number of pairs.
+    """
+    names = names or {}
+    report = {}
+    accounts = []
+    for athlete, (handles, scraped_results) in athletes.items():
+        athlete_list = athlete_accounts(athlete, handles, scraped_results)
+        accounts.extend(athlete_list)
+        score, off_brand = consistency(athlete_list)
+        report[athlete] = {
+            "consistency": score,
+            "off_brand": [f"{describe(account)} (closest match {best:.0%})" for account, best in off_brand],
+            "lookalikes": [],
+        }
+    # One message per pair of athletes and kind, listing the accounts involved on each side
+    grouped = {}
+    for account, other, kind, similarity in lookalikes(accounts, stats):
+        for mine, theirs in ((account, other), (other, account)):
+            mine_list, theirs_list, best = grouped.setdefault((mine.athlete, theirs.athlete, kind), ([], [], [0.0]))
+            for found, listed in ((mine, mine_list), (theirs, theirs_list)):
+                if describe(found) not in listed:
+                    listed.append(describe(found))
+            best[0] = max(best[0], similarity)
+    for (athlete, other, kind), (mine_list, theirs_list, best) in grouped.items():
+        report[athlete]["lookalikes"].append(
+            f"{', '.join(mine_list)} {kind} resembles {names.get(other, other)}'s {', '.join(theirs_list)} "
+            f"({best[0]:.0%} similar)")
+    return report
@@ -0,0 +1,176 @@
+"""On-disk HTTP response cache with per-platform TTLs and LRU eviction"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit, urlunsplit
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "socialmediaaudit")
+
+# How long a cached page is served without asking the platform again (seconds)
+PLATFORM_TTLS = {
+    "instagram": 6 * 3600,
+    "twitter": 24 * 3600,
+    "tiktok": 24 * 3600,
+    "youtube": 12 * 3600,
+    "linkedin": 7 * 24 * 3600,
+}
+DEFAULT_TTL = 3600
+
+# Compressed bytes kept on disk before least-recently-used entries are evicted
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+
+def normalize_url(url):
+    """Normalize a URL so trivially different spellings share a cache entry"""
+    parts = urlsplit(url.strip())
+    scheme = (parts.scheme or "https").lower()
+    netloc = parts.netloc.lower()
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def cache_key(url, method="GET", part=None):
+    """Cache key for a request; HEAD probes are kept apart from full GETs.
+
+    `part` names what a streamed body was read for (a sink's cache_part),
+    so a page cut off where one parser stopped is never served whole.
+    """
+    key = normalize_url(url)
+    key = key if method == "GET" else f"{method} {key}"
+    return key if part is None else f"{key} #{part}"
+
+
+class CachedResponse:
+    """Minimal stand-in for `requests.Response` built from a cache entry"""
+
+    def __init__(self, status_code, headers, content, from_cache=True):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.from_cache = from_cache
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8", errors="replace")
+
+
+class ResponseCache:
+    """SQLite-backed response cache keyed by normalized URL.
+
+    Bodies are stored zlib-compressed. Entries younger than their platform's
+    TTL are served directly; older entries are revalidated with
+    ETag/Last-Modified so unchanged pages come back as cheap 304s.
+    """
+
+    def __init__(self, path=None, ttls=None, max_bytes=DEFAULT_MAX_BYTES):
+        if path is None:
+            cache_dir = os.environ.get("SOCIALMEDIAAUDIT_CACHE_DIR", DEFAULT_CACHE_DIR)
+            os.makedirs(cache_dir, exist_ok=True)
+            path = os.path.join(cache_dir, "http_cache.sqlite3")
+        self.path = path
+        self.ttls = dict(PLATFORM_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                platform TEXT,
+                status INTEGER,
+                headers TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL,
+                last_access REAL,
+                size INTEGER
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.conn.commit()
+        self.stats = {"hits": 0, "misses": 0, "revalidated": 0, "evictions": 0}
+
+    def record(self, stat):
+        """Increment a hit/miss counter"""
+        with self.lock:
+            self.stats[stat] += 1
+
+    def lookup(self, platform, url, method="GET", part=None):
+        """Return (entry, is_fresh) for a URL, or (None, False) when not cached"""
+        key = cache_key(url, method, part)
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT status, headers, body, etag, last_modified, fetched_at FROM responses WHERE url = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None, False
+            self.conn.execute("UPDATE responses SET last_access = ? WHERE url = ?", (time.time(), key))
+            self.conn.commit()
+        status, headers, body, etag, last_modified, fetched_at = row
+        entry = {
+            "status": status,
+            "headers": json.loads(headers),
+            "body": zlib.decompress(body),
+            "etag": etag,
+            "last_modified": last_modified,
+        }
+        is_fresh = time.time() - fetched_at < self.ttls.get(platform, DEFAULT_TTL)
+        return entry, is_fresh
+
+    def validators(self, entry):
+        """Conditional request headers for revalidating a cached entry"""
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def store(self, platform, url, status, headers, body, method="GET", part=None):
+        """Store a response body and its validators, evicting old entries if needed"""
+        key = cache_key(url, method, part)
+        compressed = zlib.compress(body)
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, platform, status, json.dumps(dict(headers)), compressed,
+                 headers.get("ETag"), headers.get("Last-Modified"), now, now, len(compressed)),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def touch(self, url, method="GET", part=None):
+        """Mark a revalidated entry as freshly fetched"""
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "UPDATE responses SET fetched_at = ?, last_access = ? WHERE url = ?",
+                (now, now, cache_key(url, method, part)),
+            )
+            self.conn.commit()
+
+    def _evict(self):
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self.conn.execute(
+            "SELECT url, size FROM responses ORDER BY last_access"
+        ).fetchall():
+            self.conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.stats["evictions"] += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self):
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
@@ -0,0 +1,160 @@
+"""Canonical account keys and deduplicated fetch plans"""
+from collections import namedtuple
+from urllib.parse import urlsplit
+
+# Every platform the app collects handles for, in display order
+PLATFORMS = ["instagram", "twitter", "tiktok", "snapchat", "youtube", "linkedin", "facebook"]
+
+# Platforms SocialMediaScraper knows how to fetch
+SCRAPED_PLATFORMS = ["instagram", "twitter", "tiktok", "youtube", "linkedin"]
+
+# A platform account in canonical form. `key` identifies the account,
+# `handle` is what gets passed to the scraper and `url` is the profile page
+# (None for platforms that are never fetched).
+Account = namedtuple("Account", ["platform", "key", "handle", "url"])
+
+# Hosts whose URLs identify the platform regardless of which list they were typed in
+URL_HOSTS = {
+    "instagram.com": "instagram",
+    "twitter.com": "twitter",
+    "x.com": "twitter",
+    "tiktok.com": "tiktok",
+    "snapchat.com": "snapchat",
+    "youtube.com": "youtube",
+    "youtu.be": "youtube",
+    "linkedin.com": "linkedin",
+    "facebook.com": "facebook",
+    "fb.com": "facebook",
+}
+
+
+def _split_url(raw):
+    """Return (platform, path segments) for a profile URL, or (None, None)"""
+    text = raw if "://" in raw else f"https://{raw}"
+    parts = urlsplit(text)
+    host = parts.netloc.lower().split(":")[0]
+    if host.startswith("www.") or host.startswith("m."):
+        host = host.split(".", 1)[1]
+    platform = URL_HOSTS.get(host)
+    if platform is None:
+        return None, None
+    return platform, [s for s in parts.path.split("/") if s]
+
+
+def _simple_account(platform, name, url_template):
+    key = name.lstrip("@").lower()
+    return Account(platform, key, key, url_template.format(key) if url_template else None)
+
+
+def canonicalize(platform, raw):
+    """Map any accepted input form of a handle to its canonical Account.
+
+    `@jdoe`, ` JDoe ` and `https://www.instagram.com/jdoe/` all become the
+    same Instagram account. A URL is attributed to the platform it points at,
+    even if it was entered under a different platform.
+    """
+    raw = raw.strip()
+    url_platform, segments = _split_url(raw) if ("/" in raw or "." in raw) else (None, None)
+    if url_platform is not None:
+        platform = url_platform
+
+    if platform == "youtube":
+        if segments is None:
+            if raw.startswith("@"):
+                segments = [raw]
+            elif raw.startswith(("c/", "channel/", "user/")):
+                segments = raw.split("/")
+            else:
+                segments = ["c", raw]
+        if segments and segments[0].startswith("@"):
+            path = segments[0].lower()
+        elif len(segments) >= 2 and segments[0] == "channel":
+            # Channel IDs are case-sensitive
+            path = f"channel/{segments[1]}"
+        elif len(segments) >= 2 and segments[0] in ("c", "user"):
+            path = f"{segments[0]}/{segments[1].lower()}"
+        else:
+            path = "/".join(segments).lower()
+        # The scraper reports the handle as the channel name, so it stays as typed
+        return Account("youtube", path, raw, f"https://www.youtube.com/{path}")
+
+    if segments is None:
+        segments = [s for s in raw.split("/") if s]
+    if platform == "linkedin" and segments and segments[0] == "in":
+        segments = segments[1:]
+    name = segments[0] if segments else raw
+    if platform == "tiktok":
+        return _simple_account("tiktok", name, "https://www.tiktok.com/@{}")
+    if platform == "instagram":
+        return _simple_account("instagram", name, "https://www.instagram.com/{}/")
+    if platform == "twitter":
+        return _simple_account("twitter", name, "https://twitter.com/{}")
+    if platform == "linkedin":
+        return _simple_account("linkedin", name, "https://www.linkedin.com/in/{}")
+    return _simple_account(platform, name, None)
+
+
+class FetchPlan:
+    """Deduplicated set of accounts to fetch, remembering every input that named them.
+
+    Inputs are added per owner (an athlete, or None in the single-athlete
+    app). Each canonical account appears once in the plan; `fan_out` maps
+    the per-account results back to every input that referred to it.
+    """
+
+    def __init__(self):
+        self.accounts = {}
+        self.inputs = []
+
+    def add(self, platform, raw, owner=None):
+        account = canonicalize(platform, raw)
+        self.accounts.setdefault((account.platform, account.key), account)
+        self.inputs.append((owner, account))
+        return account
+
+    def add_handles(self, handles_by_platform, owner=None):
+        for platform, handles in handles_by_platform.items():
+            for raw in handles:
+                if raw.strip():
+                    self.add(platform, raw, owner)
+
+    def handles_by_platform(self, platforms, accounts=None):
+        """Unique handles to fetch, grouped by platform, for the given platforms"""
+        plan = {}
+        for account in accounts if accounts is not None else self.accounts.values():
+            if account.platform in platforms:
+                plan.setdefault(account.platform, []).append(account.handle)
+        return plan
+
+    def owner_accounts(self, owner):
+        """Unique accounts referred to by one owner's inputs"""
+        seen = {}
+        for input_owner, account in self.inputs:
+            if input_owner == owner:
+                seen.setdefault((account.platform, account.key), account)
+        return list(seen.values())
+
+    def fan_out(self, results_by_key, platforms, owner=None):
+        """Expand per-account results back to one entry per input, grouped by platform"""
+        scraped_results = {}
+        for input_owner, account in self.inputs:
+            if input_owner != owner or account.platform not in platforms:
+                continue
+            result = results_by_key.get((account.platform, account.key))
+            if result is not None:
+                scraped_results.setdefault(account.platform, []).append(result)
+        return scraped_results
+
+    def savings(self):
+        """Fraction of inputs that did not need a fetch of their own"""
+        return 1 - len(self.accounts) / len(self.inputs) if self.inputs else 0.0
+
+
+def index_results(handles_by_platform, scraped_results):
+    """Index engine results, which follow the order of `handles_by_platform`, by account key"""
+    indexed = {}
+    for platform, handles in handles_by_platform.items():
+        for handle, result in zip(handles, scraped_results.get(platform, [])):
+            account = canonicalize(platform, handle)
+            indexed[(account.platform, account.key)] = result
+    return indexed
@@ -0,0 +1,26 @@
+"""What each platform scraper can actually extract without an official API"""
+from enum import Enum
+
+
+class Capability(Enum):
+    FULL = "full"              # profile page is downloaded and parsed
+    EXISTENCE = "existence"    # only a cheap HEAD probe to see if the account exists
+    NONE = "none"              # nothing useful is public; no request is made
+
+
+PLATFORM_CAPABILITIES = {
+    "instagram": Capability.FULL,
+    "youtube": Capability.FULL,
+    "twitter": Capability.EXISTENCE,
+    "tiktok": Capability.EXISTENCE,
+    "linkedin": Capability.NONE,
+}
+
+
+def capability_for(platform):
+    return PLATFORM_CAPABILITIES.get(platform, Capability.FULL)
+
+
+def not_fetched(reason):
+    """Placeholder for a report field the scraper deliberately did not fetch"""
+    return f"Not fetched ({reason})"
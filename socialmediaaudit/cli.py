@@ -0,0 +1,168 @@
+"""Command-line entry point: python -m socialmediaaudit <command>"""
+import argparse
+
+from socialmediaaudit.batch import brand_results, run_batch, summarize_results
+from socialmediaaudit.export import export_roster
+from socialmediaaudit.monitor import run_monitor
+from socialmediaaudit.shards import DEFAULT_LEASE, DEFAULT_SHARD_SIZE, MAX_ATTEMPTS, run_coordinator, run_worker
+
+
+def parse_base_url(value):
+    """Turn a PLATFORM=URL option into a (platform, url) pair"""
+    platform, sep, url = value.partition("=")
+    if not sep:
+        raise argparse.ArgumentTypeError(f"expected PLATFORM=URL, got {value!r}")
+    return platform.strip().lower(), url.strip()
+
+
+def parse_budget(value):
+    """Turn a PLATFORM=N option into a (platform, requests per hour) pair"""
+    platform, sep, per_hour = value.partition("=")
+    try:
+        per_hour = float(per_hour) if sep else None
+    except ValueError:
+        per_hour = None
+    if per_hour is None:
+        raise argparse.ArgumentTypeError(f"expected PLATFORM=N, got {value!r}")
+    return platform.strip().lower(), per_hour
+
+
+def parse_address(value):
+    """Turn a HOST:PORT option into a (host, port) pair"""
+    host, sep, port = value.rpartition(":")
+    if not sep or not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host or "127.0.0.1", int(port)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m socialmediaaudit",
+                                     description="Social Media Audit tool for student-athletes")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    batch = commands.add_parser("batch", help="Audit every athlete in a roster CSV")
+    batch.add_argument("roster", help="CSV with an athlete column and one column per platform")
+    batch.add_argument("-o", "--output", default="audit_results.jsonl",
+                       help="JSONL file to append results to (default: %(default)s)")
+    batch.add_argument("-w", "--workers", type=int, default=4,
+                       help="Worker processes (default: %(default)s)")
+    batch.add_argument("-d", "--delay", type=float, default=3,
+                       help="Seconds between requests to the same platform (default: %(default)s)")
+    batch.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    batch.add_argument("--no-history", action="store_true",
+                       help="Don't reuse or save per-account snapshots")
+    batch.add_argument("--no-content-review", action="store_true",
+                       help="Don't screen bios and descriptions against the risk lexicon")
+    batch.add_argument("--no-brand-consistency", action="store_true",
+                       help="Don't score how well each athlete's handles and bios match across platforms")
+    batch.add_argument("--metrics-out", help="Write merged metrics here (.prom for Prometheus text, else JSON)")
+    batch.add_argument("--base-url", action="append", type=parse_base_url, metavar="PLATFORM=URL",
+                       help="Send a platform's requests to another host, e.g. a stand-in server")
+    batch.add_argument("--record", metavar="ARCHIVE",
+                       help="Append every raw response to this archive (bypasses the response cache)")
+
+    replay = commands.add_parser("replay", help="Re-run the parsers and analysis over an archived audit")
+    replay.add_argument("archive", help="Archive written by batch --record")
+    replay.add_argument("roster", help="The roster CSV, or the JSONL output, of the recorded run")
+    replay.add_argument("-o", "--output", default="replayed_results.jsonl",
+                        help="JSONL file to append results to (default: %(default)s)")
+    replay.add_argument("-w", "--workers", type=int, default=4,
+                        help="Worker processes (default: %(default)s)")
+    replay.add_argument("--base-url", action="append", type=parse_base_url, metavar="PLATFORM=URL",
+                        help="The --base-url options the recorded run used")
+
+    summarize = commands.add_parser("summarize", help="Roster-wide counts and audience percentiles for batch results")
+    summarize.add_argument("results", help="JSONL output of a batch or replay run")
+    summarize.add_argument("-o", "--output", default="roster_summary.csv",
+                           help="CSV file to write (default: %(default)s)")
+
+    brand = commands.add_parser("brand", help="Brand consistency scores and look-alike accounts across a roster")
+    brand.add_argument("results", help="JSONL output of a batch or replay run")
+    brand.add_argument("-o", "--output", default="roster_brand.csv",
+                       help="CSV file to write (default: %(default)s)")
+
+    export = commands.add_parser("export", help="Render every athlete's PDF report, plus a roster summary, into one ZIP")
+    export.add_argument("results", help="JSONL output of a batch or replay run")
+    export.add_argument("-o", "--output", default="roster_reports.zip",
+                        help="ZIP file to write (default: %(default)s)")
+    export.add_argument("-w", "--workers", type=int, default=4,
+                        help="Render processes (default: %(default)s)")
+    export.add_argument("--max-pending", type=int,
+                        help="Renders queued or running at once (default: twice --workers)")
+    export.add_argument("--no-cache", action="store_true", help="Render every PDF even if it was rendered before")
+
+    monitor = commands.add_parser("monitor", help="Keep a roster's account snapshots fresh within request budgets")
+    monitor.add_argument("roster", help="CSV as for batch; optional priority and active_until columns")
+    monitor.add_argument("--budget", action="append", type=parse_budget, metavar="PLATFORM=N",
+                         help="Requests per hour for a platform (defaults: instagram/youtube 120, twitter/tiktok 60)")
+    monitor.add_argument("--jitter", type=float, default=0.2,
+                         help="Random spread applied to request spacing (default: %(default)s)")
+    monitor.add_argument("--duration", type=float, help="Stop after this many seconds (default: run until Ctrl+C)")
+    monitor.add_argument("--base-url", action="append", type=parse_base_url, metavar="PLATFORM=URL",
+                         help="Send a platform's requests to another host, e.g. a stand-in server")
+
+    coordinate = commands.add_parser("coordinate",
+                                     help="Audit a roster by handing shards of it to worker processes or hosts")
+    coordinate.add_argument("roster", help="CSV as for batch")
+    coordinate.add_argument("-o", "--output", default="audit_results.jsonl",
+                            help="JSONL file to append results to (default: %(default)s)")
+    coordinate.add_argument("-q", "--queue", default="shards.sqlite3",
+                            help="Shard queue file the workers open (default: %(default)s)")
+    coordinate.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                            help="Accounts per shard (default: %(default)s)")
+    coordinate.add_argument("--max-attempts", type=int, default=MAX_ATTEMPTS,
+                            help="Times a shard is handed out before it is given up on (default: %(default)s)")
+    coordinate.add_argument("--serve", type=parse_address, metavar="HOST:PORT",
+                            help="Also serve the queue over HTTP for workers on other hosts")
+    coordinate.add_argument("--no-history", action="store_true",
+                            help="Don't reuse or save per-account snapshots")
+    coordinate.add_argument("--no-content-review", action="store_true",
+                            help="Don't screen bios and descriptions against the risk lexicon")
+    coordinate.add_argument("--no-brand-consistency", action="store_true",
+                            help="Don't score how well each athlete's handles and bios match across platforms")
+    coordinate.add_argument("--metrics-out", help="Write merged metrics here (.prom for Prometheus text, else JSON)")
+
+    worker = commands.add_parser("worker", help="Fetch shards for a coordinator until its run is over")
+    worker.add_argument("queue", help="The coordinator's queue file, or the URL it serves the queue at")
+    worker.add_argument("--name", help="Name in the coordinator's log (default: host-pid)")
+    worker.add_argument("-d", "--delay", type=float, default=3,
+                        help="Seconds between this worker's requests to the same platform (default: %(default)s)")
+    worker.add_argument("--proxy", metavar="URL", help="Send this worker's requests through a proxy")
+    worker.add_argument("--lease", type=float, default=DEFAULT_LEASE,
+                        help="Seconds a shard stays leased without a heartbeat (default: %(default)s)")
+    worker.add_argument("--no-cache", action="store_true", help="Bypass the on-disk response cache")
+    worker.add_argument("--base-url", action="append", type=parse_base_url, metavar="PLATFORM=URL",
+                        help="Send a platform's requests to another host, e.g. a stand-in server")
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        run_batch(args.roster, args.output, workers=args.workers, delay=args.delay,
+                  use_cache=not (args.no_cache or args.record), metrics_path=args.metrics_out,
+                  record_path=args.record, base_urls=dict(args.base_url or []),
+                  use_history=not args.no_history, content_review=not args.no_content_review,
+                  brand_consistency=not args.no_brand_consistency)
+    elif args.command == "replay":
+        run_batch(args.roster, args.output, workers=args.workers, replay_path=args.archive,
+                  base_urls=dict(args.base_url or []))
+    elif args.command == "summarize":
+        summarize_results(args.results, args.output)
+    elif args.command == "brand":
+        brand_results(args.results, args.output)
+    elif args.command == "export":
+        export_roster(args.results, args.output, workers=args.workers, max_pending=args.max_pending,
+                      use_cache=not args.no_cache)
+    elif args.command == "coordinate":
+        run_coordinator(args.roster, args.output, args.queue, shard_size=args.shard_size, serve=args.serve,
+                        max_attempts=args.max_attempts, use_history=not args.no_history,
+                        content_review=not args.no_content_review,
+                        brand_consistency=not args.no_brand_consistency, metrics_path=args.metrics_out)
+    elif args.command == "worker":
+        run_worker(args.queue, name=args.name, delay=args.delay, base_urls=dict(args.base_url or []),
+                   proxy=args.proxy, use_cache=not args.no_cache, lease=args.lease)
+    elif args.command == "monitor":
+        run_monitor(args.roster, budgets=dict(args.budget or []), jitter=args.jitter,
+                    duration=args.duration, base_urls=dict(args.base_url or []))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Concurrent scraping engine with per-host rate limiting"""
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from socialmediaaudit.capabilities import Capability, capability_for
+from socialmediaaudit.metrics import span
+from socialmediaaudit.records import ScrapeError
+
+# Host each platform's scraper talks to; requests to one host share a rate limiter
+PLATFORM_HOSTS = {
+    "instagram": "www.instagram.com",
+    "twitter": "twitter.com",
+    "tiktok": "www.tiktok.com",
+    "youtube": "www.youtube.com",
+    "linkedin": "www.linkedin.com",
+}
+
+
+class TokenBucket:
+    """Thread-safe token bucket that refills at `rate` tokens per second"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class ScrapeEngine:
+    """Runs scrape calls for different hosts in parallel.
+
+    Each host gets its own token bucket, so `delay` spaces out requests to the
+    same platform without holding up the others. Total wall-clock time is
+    roughly the longest single-platform queue instead of the sum of all of them.
+
+    Platforms are scheduled by capability: NONE platforms are answered
+    immediately without touching the network or the rate limiter, and
+    EXISTENCE platforms are probed as one batch per host so their HEAD
+    requests run back-to-back on a single worker and pooled connection.
+    """
+
+    def __init__(self, scraper, delay=3, max_workers=8, trace=None):
+        self.scraper = scraper
+        self.delay = delay
+        self.max_workers = max_workers
+        self.trace = trace
+        self.buckets = {}
+        self.buckets_lock = threading.Lock()
+
+    def bucket_for(self, platform):
+        """Return the shared token bucket for a platform's host"""
+        host = PLATFORM_HOSTS.get(platform, platform)
+        with self.buckets_lock:
+            if host not in self.buckets:
+                self.buckets[host] = TokenBucket(1 / self.delay if self.delay > 0 else float("inf"))
+            return self.buckets[host]
+
+    def _scrape(self, platform, handle):
+        with span("scrape", trace=self.trace, platform=platform) as timing:
+            try:
+                return self.scraper.scrape(platform, handle)
+            except Exception as e:
+                timing.set(error=type(e).__name__)
+                return ScrapeError(error=f"Error scraping {platform} {handle}: {str(e)}")
+
+    def _run_batch(self, platform, batch, results):
+        bucket = self.bucket_for(platform)
+        for index, handle in batch:
+            with span("rate_limit_wait", trace=self.trace, platform=platform):
+                bucket.acquire()
+            results.put((platform, index, handle, self._scrape(platform, handle)))
+
+    def run(self, handles_by_platform):
+        """Scrape every handle, yielding (platform, index, handle, result) as each finishes"""
+        results = queue.Queue()
+        batches = []
+        queues = []
+        for platform, handles in handles_by_platform.items():
+            capability = capability_for(platform)
+            indexed = list(enumerate(handles))
+            if not indexed:
+                continue
+            if capability is Capability.NONE:
+                for index, handle in indexed:
+                    yield platform, index, handle, self._scrape(platform, handle)
+            elif capability is Capability.EXISTENCE:
+                batches.append((platform, indexed))
+            else:
+                queues.append((platform, indexed))
+
+        # Interleave full-scrape platforms so each host's queue starts straight away
+        tasks = list(batches)
+        while any(indexed for _, indexed in queues):
+            for platform, indexed in queues:
+                if indexed:
+                    tasks.append((platform, [indexed.pop(0)]))
+
+        pending = sum(len(batch) for _, batch in tasks)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for platform, batch in tasks:
+                pool.submit(self._run_batch, platform, batch, results)
+            for _ in range(pending):
+                yield results.get()
+
+    def scrape_all(self, handles_by_platform, on_result=None):
+        """Scrape every handle and return results grouped by platform in input order"""
+        scraped_results = {p: [None] * len(h) for p, h in handles_by_platform.items() if h}
+        for platform, index, handle, result in self.run(handles_by_platform):
+            scraped_results[platform][index] = result
+            if on_result:
+                on_result(platform, handle, result)
+        return scraped_results
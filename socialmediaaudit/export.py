@@ -0,0 +1,154 @@
+"""Bulk export of a roster's audit reports as one ZIP of PDFs"""
+import json
+import multiprocessing
+import os
+import re
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import pandas as pd
+
+from socialmediaaudit.analysis import results_table, roster_summary
+from socialmediaaudit.report import RenderCache, build_document, build_roster_document, render_pdf
+
+SUMMARY_FILENAME = "Roster_Summary.pdf"
+
+# Athletes whose results are held before being folded into the compact roster table
+TABLE_CHUNK = 1000
+
+
+def read_results(results_path):
+    """Yield the records of a batch output file one line at a time"""
+    with open(results_path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def athlete_document(record):
+    """The report document for one line of batch output"""
+    active_platforms = sum(1 for handles in record["handles"].values() if handles)
+    total_handles = sum(len(handles) for handles in record["handles"].values())
+    return build_document(record["results"], record["analysis"], record["name"], total_handles,
+                          active_platforms, record.get("changes"), generated=record.get("audited_at"))
+
+
+def pdf_filename(name, used):
+    """A ZIP entry name for an athlete's PDF, unique among `used`"""
+    base = re.sub(r"[^\w.-]+", "_", name).strip("._") or "athlete"
+    filename = f"{base}.pdf"
+    n = 1
+    while filename in used:
+        n += 1
+        filename = f"{base}_{n}.pdf"
+    used.add(filename)
+    return filename
+
+
+_cache = None
+
+
+def _init_worker(cache_path):
+    global _cache
+    _cache = RenderCache(cache_path) if cache_path else None
+
+
+def render_document(document):
+    """Render one athlete's PDF inside a worker process"""
+    return _cache.render(document, "pdf") if _cache else render_pdf(document)
+
+
+def export_roster(results_path, output_path, workers=4, max_pending=None, use_cache=True, progress=None,
+                  log=print):
+    """Render every athlete in a batch output file to PDF and write them, with a roster summary, to one ZIP.
+
+    Records are read one line at a time and rendered in a process pool.
+    At most `max_pending` renders (default: twice `workers`) are queued
+    or running at once, and each PDF is written to the ZIP as soon as it
+    is done, so memory stays flat however long the roster is. The ZIP is
+    built next to `output_path` and moved into place when complete.
+
+    With `use_cache`, an athlete whose report hasn't changed since an
+    earlier export is copied from the render cache without going to the
+    pool, and the pool is only started once something needs rendering.
+    `progress(done, total)` is called after each PDF is written.
+    """
+    with open(results_path, encoding="utf-8") as f:
+        total = sum(1 for line in f if line.strip())
+    cache = RenderCache() if use_cache else None
+    max_pending = max_pending or workers * 2
+    used = {SUMMARY_FILENAME}
+    names = {}
+    chunk = {}
+    tables = []
+    latest = ""
+    stats = {"written": 0, "failed": 0, "cached": 0}
+    pool = None
+    pending = {}
+    start = time.monotonic()
+
+    partial = output_path + ".part"
+    with zipfile.ZipFile(partial, "w", compression=zipfile.ZIP_STORED) as archive:
+        def write(filename, data):
+            archive.writestr(filename, data)
+            stats["written"] += 1
+            log(f"[{stats['written']}/{total}] {filename}")
+            if progress:
+                progress(stats["written"], total)
+
+        def drain(limit):
+            while len(pending) > limit:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    filename = pending.pop(future)
+                    try:
+                        data = future.result()
+                    except Exception as e:
+                        stats["failed"] += 1
+                        log(f"{filename}: render failed ({e})")
+                        continue
+                    write(filename, data)
+
+        try:
+            for record in read_results(results_path):
+                names[record["athlete"]] = record["name"]
+                chunk[record["athlete"]] = record["results"]
+                if len(chunk) >= TABLE_CHUNK:
+                    tables.append(results_table(chunk))
+                    chunk = {}
+                latest = max(latest, record.get("audited_at") or "")
+
+                filename = pdf_filename(record["name"], used)
+                document = athlete_document(record)
+                data = cache.get(document, "pdf") if cache else None
+                if data is not None:
+                    stats["cached"] += 1
+                    write(filename, data)
+                    continue
+                if pool is None:
+                    # Spawned rather than forked: the app calls this from a process running worker threads
+                    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                               initializer=_init_worker, initargs=(cache.path if cache else None,))
+                drain(max_pending - 1)
+                pending[pool.submit(render_document, document)] = filename
+            drain(0)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        if chunk:
+            tables.append(results_table(chunk))
+        if tables:
+            table = pd.concat(tables, ignore_index=True)
+            table["platform"] = table["platform"].astype("category")
+            document = build_roster_document(roster_summary(table), names, generated=latest or None)
+            archive.writestr(SUMMARY_FILENAME, cache.render(document, "pdf") if cache else render_pdf(document))
+    os.replace(partial, output_path)
+
+    elapsed = time.monotonic() - start
+    log(f"Exported {stats['written']} athlete reports ({stats['cached']} unchanged since an earlier export) "
+        f"and a roster summary to {output_path} in {elapsed:.1f}s"
+        + (f"; {stats['failed']} failed" if stats["failed"] else ""))
+    return {"athletes": stats["written"], "cached": stats["cached"], "failed": stats["failed"],
+            "elapsed": round(elapsed, 3), "bytes": os.path.getsize(output_path)}
@@ -0,0 +1,207 @@
+"""Incremental extraction of the few page elements the scrapers read"""
+import codecs
+import json
+import re
+from html.parser import HTMLParser
+
+# Stop downloading a profile page after this many bytes even if </head> never shows up
+HEAD_BYTE_CAP = 512 * 1024
+
+# Inline JSON blobs like ytInitialData sit far into the body and often run past 1 MB
+BLOB_BYTE_CAP = 4 * 1024 * 1024
+
+# Bytes read looking for a blob's marker before the page is taken not to have one
+BLOB_MARKER_BYTE_CAP = 1024 * 1024
+
+# Text kept between chunks so a key split across two of them is still found
+BLOB_OVERLAP = 512
+
+# A wanted value longer than this is skipped rather than buffered further
+VALUE_CHAR_CAP = 64 * 1024
+
+COUNT_SUFFIXES = {"K": 10 ** 3, "M": 10 ** 6, "B": 10 ** 9}
+
+
+class HeadExtractor(HTMLParser):
+    """Collects <meta> tags and application/ld+json scripts from streamed HTML.
+
+    Bytes are fed in as they arrive and no document tree is built. `done`
+    flips to True once the parser reaches </head> or <body>, which tells the
+    fetcher it can stop reading the response.
+    """
+
+    cache_part = "head"
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self.meta = {}
+        self.ld_json = []
+        self.done = False
+        self._script = None
+
+    def feed(self, data):
+        if self.done:
+            return
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data)
+        super().feed(data)
+
+    def handle_starttag(self, tag, attrs):
+        if self.done:
+            return
+        if tag == "meta":
+            attrs = dict(attrs)
+            name = attrs.get("name") or attrs.get("property")
+            if name and name not in self.meta:
+                self.meta[name] = attrs.get("content") or ""
+        elif tag == "script" and dict(attrs).get("type") == "application/ld+json":
+            self._script = []
+        elif tag == "body":
+            self.done = True
+
+    def handle_endtag(self, tag):
+        if tag == "script" and self._script is not None:
+            self.ld_json.append("".join(self._script))
+            self._script = None
+        elif tag == "head":
+            self.done = True
+
+    def handle_data(self, data):
+        if self._script is not None:
+            self._script.append(data)
+
+
+class NullSink:
+    """Sink for fetches where only the status code matters"""
+
+    done = True
+    cache_part = "status"
+
+    def feed(self, data):
+        pass
+
+
+class BlobScanner:
+    """Pulls a few values out of a large inline JSON blob in streamed HTML.
+
+    Text before `marker` (e.g. "var ytInitialData = ") is skipped. Inside
+    the blob, `fields` maps each wanted name to a regex for the text just
+    before its value, starting with the quoted key it belongs to. The key
+    is located with str.find, the regex is only tried where it occurs, and
+    the first match's value is decoded on its own with raw_decode. The
+    rest of the blob is never parsed and is dropped as it streams past, so
+    only a chunk and a short overlap are held however large the blob is.
+    `done` flips once every field is found or the blob's </script> has
+    gone by, or when `marker_cap` bytes have gone by without the marker,
+    so a page that lacks the blob isn't read to the end.
+    """
+
+    byte_cap = BLOB_BYTE_CAP
+
+    def __init__(self, marker, fields, marker_cap=BLOB_MARKER_BYTE_CAP):
+        self.marker = marker
+        self.marker_cap = marker_cap
+        self.fields = {name: (re.match(r'"[^"]+"', pattern).group(), re.compile(pattern))
+                       for name, pattern in fields.items()}
+        self.values = {}
+        self.done = False
+        self.decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._in_blob = False
+        self._searched = 0
+
+    @property
+    def cache_part(self):
+        return f"{self.marker.strip()} {self.marker_cap}"
+
+    def feed(self, data):
+        if self.done:
+            return
+        if not self._in_blob:
+            self._searched += len(data)
+        if isinstance(data, bytes):
+            data = self.decoder.decode(data)
+        self._buffer += data
+        if not self._in_blob:
+            start = self._buffer.find(self.marker)
+            if start < 0:
+                self._buffer = self._buffer[-len(self.marker):]
+                if self._searched >= self.marker_cap:
+                    self.done = True
+                    self._buffer = ""
+                return
+            self._in_blob = True
+            self._buffer = self._buffer[start + len(self.marker):]
+        self._scan()
+
+    def _scan(self):
+        buffer = self._buffer
+        end = buffer.find("</script>")
+        complete = end >= 0
+        limit = end if complete else len(buffer)
+        keep = max(0, len(buffer) - BLOB_OVERLAP)
+        for name, (key, pattern) in self.fields.items():
+            if name in self.values:
+                continue
+            at = buffer.find(key, 0, limit)
+            while at >= 0:
+                match = pattern.match(buffer, at, limit)
+                if match:
+                    try:
+                        value, value_end = self._json.raw_decode(buffer, match.end())
+                    except ValueError:
+                        value_end = None
+                    if not complete and (value_end is None or value_end >= len(buffer)) \
+                            and len(buffer) - match.end() < VALUE_CHAR_CAP:
+                        # The value may go on in a chunk that hasn't arrived yet
+                        keep = min(keep, at)
+                        break
+                    if value_end is not None:
+                        self.values[name] = value
+                        break
+                at = buffer.find(key, at + 1, limit)
+        if complete or len(self.values) == len(self.fields):
+            self.done = True
+            self._buffer = ""
+        else:
+            self._buffer = buffer[keep:]
+
+
+class Sinks:
+    """Feeds one response to several sinks until all of them are done"""
+
+    def __init__(self, *sinks):
+        self.sinks = sinks
+        self.byte_cap = max(getattr(sink, "byte_cap", HEAD_BYTE_CAP) for sink in sinks)
+        self.cache_part = "+".join(sink.cache_part for sink in sinks)
+
+    @property
+    def done(self):
+        return all(sink.done for sink in self.sinks)
+
+    def feed(self, data):
+        for sink in self.sinks:
+            if not sink.done:
+                sink.feed(data)
+
+
+def text_of(value):
+    """Display text of a YouTube text object ({"simpleText": ...} or {"runs": [...]}) or a plain string"""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, dict):
+        if "simpleText" in value:
+            return str(value["simpleText"])
+        return "".join(str(run.get("text", "")) for run in value.get("runs", []) if isinstance(run, dict))
+    return ""
+
+
+def count_from_text(text):
+    """The number in text like "12,345 subscribers" or "1.2M views", or None"""
+    match = re.search(r"(\d[\d,]*(?:\.\d+)?)\s*([KMB])?\b", text or "", re.IGNORECASE)
+    if not match:
+        return None
+    number = float(match.group(1).replace(",", ""))
+    return round(number * COUNT_SUFFIXES.get((match.group(2) or "").upper(), 1))
@@ -0,0 +1,438 @@
+"""Background audit jobs that run on a shared worker pool and persist in SQLite"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+from socialmediaaudit.canonical import SCRAPED_PLATFORMS, FetchPlan
+from socialmediaaudit.capabilities import Capability, capability_for
+from socialmediaaudit.engine import PLATFORM_HOSTS
+from socialmediaaudit.metrics import AuditTrace, span
+from socialmediaaudit.records import ScrapeError, as_dict
+from socialmediaaudit.snapshots import DEFAULT_DATA_DIR
+
+# Job states; only queued and running jobs are handed to workers
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+CANCELLED = "cancelled"
+FAILED = "failed"
+
+# Account states within a job
+PENDING = "pending"
+FETCHED = "fetched"
+
+
+class _ActiveJob:
+    """Scheduling state for a job that still has accounts to fetch"""
+
+    def __init__(self, job_id, owner, athlete_name, created_at, delay, status):
+        self.job_id = job_id
+        self.owner = owner
+        self.athlete_name = athlete_name
+        self.created_at = created_at
+        self.delay = delay
+        self.status = status
+        self.pending = []
+        self.running = 0
+        self.busy = set()
+        self.trace = AuditTrace()
+
+
+class JobQueue:
+    """Runs audits on a pool of background threads so no Streamlit script waits on them.
+
+    Jobs and every fetched account are written to SQLite as they happen, so
+    a closed tab loses nothing, finished reports can be reopened without
+    re-scraping, and unfinished jobs pick up where they left off after a
+    restart. Workers take one account at a time from the owner with the
+    fewest accounts in flight, so one user's large roster can't starve
+    everyone else. Requests to each platform's host are spaced by the
+    delay of the job that sends them, across every job in the queue, as a
+    ScrapeEngine's per-host token bucket does for a synchronous audit, so
+    concurrent audits don't hit one platform together.
+
+    `scraper` may also be a function returning one, called when the first
+    account is fetched, so a queue with nothing to do never loads the
+    HTTP stack.
+    """
+
+    def __init__(self, scraper, path=None, workers=4, snapshots=None):
+        if path is None:
+            data_dir = os.environ.get("SOCIALMEDIAAUDIT_DATA_DIR", DEFAULT_DATA_DIR)
+            os.makedirs(data_dir, exist_ok=True)
+            path = os.path.join(data_dir, "jobs.sqlite3")
+        self._scraper = scraper
+        self._scraper_lock = threading.Lock()
+        self.snapshots = snapshots
+        self.path = path
+        self.db_lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                owner TEXT NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                finished_at REAL,
+                params TEXT NOT NULL,
+                scraped_results TEXT,
+                analysis TEXT,
+                report TEXT,
+                document TEXT,
+                pdf BLOB,
+                pdf_error TEXT,
+                timings TEXT,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS job_accounts (
+                job_id TEXT NOT NULL,
+                seq INTEGER NOT NULL,
+                platform TEXT NOT NULL,
+                account_key TEXT NOT NULL,
+                handle TEXT NOT NULL,
+                status TEXT NOT NULL,
+                fetched_at REAL,
+                result TEXT,
+                PRIMARY KEY (job_id, seq)
+            );
+            CREATE INDEX IF NOT EXISTS jobs_created ON jobs (created_at);
+        """)
+        # Databases created before reports had a document model lack its column
+        if "document" not in [row[1] for row in self.conn.execute("PRAGMA table_info(jobs)")]:
+            self.conn.execute("ALTER TABLE jobs ADD COLUMN document TEXT")
+        self.conn.commit()
+
+        self.cond = threading.Condition()
+        self.active = {}
+        self.host_ready_at = {}
+        self.closed = False
+        self._load_unfinished()
+        for job in list(self.active.values()):
+            if not job.pending and job.status != CANCELLED:
+                self._finish(job)
+        self.threads = [threading.Thread(target=self._work, daemon=True, name=f"audit-worker-{i}")
+                        for i in range(workers)]
+        for thread in self.threads:
+            thread.start()
+
+    @property
+    def scraper(self):
+        """The scraper accounts are fetched with, made on first use if the queue was given a function"""
+        with self._scraper_lock:
+            if callable(self._scraper):
+                self._scraper = self._scraper()
+            return self._scraper
+
+    @property
+    def scraper_started(self):
+        """Whether the scraper exists yet"""
+        return not callable(self._scraper)
+
+    def _execute(self, query, params=()):
+        with self.db_lock:
+            rows = self.conn.execute(query, params).fetchall()
+            self.conn.commit()
+        return rows
+
+    def _load_unfinished(self):
+        # Accounts that were mid-fetch when the process stopped are fetched again
+        for job_id, owner, status, created_at, params in self._execute(
+            "SELECT id, owner, status, created_at, params FROM jobs WHERE status IN (?, ?, ?) ORDER BY created_at",
+            (QUEUED, RUNNING, CANCELLED),
+        ):
+            params = json.loads(params)
+            job = _ActiveJob(job_id, owner, params["athlete_name"], created_at, params["delay"],
+                             CANCELLED if status == CANCELLED else QUEUED)
+            job.pending = self._execute(
+                "SELECT seq, platform, account_key, handle FROM job_accounts WHERE job_id = ? AND status != ? ORDER BY seq",
+                (job_id, FETCHED),
+            )
+            self.active[job_id] = job
+            if job.status == QUEUED:
+                self._execute("UPDATE jobs SET status = ? WHERE id = ?", (QUEUED, job_id))
+
+    def submit(self, owner, handles, athlete_name, total_handles, active_platforms, delay=3,
+               refresh=False, audit_key=None, options=None):
+        """Queue an audit of `handles` ({platform: [handles]}) and return its job id.
+
+        Accounts with a fresh snapshot are filled in straight away unless
+        `refresh` is set. `options` holds the app's analysis checkboxes,
+        e.g. {"content_review": True, "brand_consistency": True}.
+        """
+        job_id = uuid.uuid4().hex
+        created_at = time.time()
+        plan = FetchPlan()
+        plan.add_handles(handles)
+        accounts = [a for a in plan.accounts.values() if a.platform in SCRAPED_PLATFORMS]
+        fresh = {} if refresh or self.snapshots is None else self.snapshots.fresh_results(accounts)
+
+        params = {
+            "handles": handles,
+            "athlete_name": athlete_name,
+            "total_handles": total_handles,
+            "active_platforms": active_platforms,
+            "delay": delay,
+            "audit_key": audit_key,
+            "options": options or {},
+        }
+        job = _ActiveJob(job_id, owner, athlete_name, created_at, delay, QUEUED)
+        rows = []
+        for seq, account in enumerate(accounts):
+            snapshot = fresh.get((account.platform, account.key))
+            if snapshot is None:
+                rows.append((job_id, seq, account.platform, account.key, account.handle, PENDING, None, None))
+                job.pending.append((seq, account.platform, account.key, account.handle))
+            else:
+                fetched_at, result = snapshot
+                rows.append((job_id, seq, account.platform, account.key, account.handle, FETCHED,
+                             fetched_at, json.dumps(as_dict(result))))
+        with self.db_lock:
+            self.conn.execute(
+                "INSERT INTO jobs (id, owner, status, created_at, params) VALUES (?, ?, ?, ?, ?)",
+                (job_id, owner, QUEUED, created_at, json.dumps(params)),
+            )
+            self.conn.executemany("INSERT INTO job_accounts VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.commit()
+
+        with self.cond:
+            self.active[job_id] = job
+            self.cond.notify_all()
+        if not job.pending:
+            self._finish(job)
+        return job_id
+
+    def cancel(self, job_id):
+        """Stop handing out a job's accounts; fetches already in flight still land"""
+        with self.cond:
+            job = self.active.get(job_id)
+            if job is None or job.status == CANCELLED:
+                return False
+            job.status = CANCELLED
+        self._execute("UPDATE jobs SET status = ? WHERE id = ?", (CANCELLED, job_id))
+        return True
+
+    def resume(self, job_id):
+        """Continue a cancelled job from the accounts it had not fetched yet"""
+        with self.cond:
+            job = self.active.get(job_id)
+            if job is None or job.status != CANCELLED:
+                return False
+            job.status = QUEUED if job.running == 0 else RUNNING
+            finished = not job.pending and job.running == 0
+            self.cond.notify_all()
+        self._execute("UPDATE jobs SET status = ? WHERE id = ?", (job.status, job_id))
+        if finished:
+            self._finish(job)
+        return True
+
+    def _next(self, now):
+        """Pick the next account to fetch as (job, seq, platform, key, handle), or how long to wait"""
+        in_flight = {}
+        for job in self.active.values():
+            in_flight[job.owner] = in_flight.get(job.owner, 0) + job.running
+        wait = None
+        candidates = sorted(
+            (job for job in self.active.values() if job.status in (QUEUED, RUNNING) and job.pending),
+            key=lambda job: (in_flight[job.owner], job.created_at),
+        )
+        for job in candidates:
+            for position, (seq, platform, key, handle) in enumerate(job.pending):
+                if platform in job.busy:
+                    continue
+                ready_at = self.host_ready_at.get(PLATFORM_HOSTS.get(platform, platform), 0)
+                if ready_at > now:
+                    wait = ready_at - now if wait is None else min(wait, ready_at - now)
+                    continue
+                del job.pending[position]
+                return (job, seq, platform, key, handle), None
+        return None, wait
+
+    def _work(self):
+        while True:
+            with self.cond:
+                while True:
+                    if self.closed:
+                        return
+                    task, wait = self._next(time.monotonic())
+                    if task is not None:
+                        break
+                    self.cond.wait(wait)
+                job, seq, platform, key, handle = task
+                job.running += 1
+                job.busy.add(platform)
+                if capability_for(platform) is not Capability.NONE:
+                    # Space request starts per host, whichever job sends the next one
+                    self.host_ready_at[PLATFORM_HOSTS.get(platform, platform)] = time.monotonic() + job.delay
+                started = job.status == QUEUED
+                if started:
+                    job.status = RUNNING
+            if started:
+                self._execute("UPDATE jobs SET status = ? WHERE id = ? AND status = ?", (RUNNING, job.job_id, QUEUED))
+
+            with span("scrape", trace=job.trace, platform=platform) as timing:
+                try:
+                    result = self.scraper.scrape(platform, handle)
+                except Exception as e:
+                    timing.set(error=type(e).__name__)
+                    result = ScrapeError(error=f"Error scraping {platform} {handle}: {str(e)}")
+            fetched_at = time.time()
+            self._execute(
+                "UPDATE job_accounts SET status = ?, fetched_at = ?, result = ? WHERE job_id = ? AND seq = ?",
+                (FETCHED, fetched_at, json.dumps(as_dict(result)), job.job_id, seq),
+            )
+            if self.snapshots is not None:
+                self.snapshots.save([(job.athlete_name, platform, key, result)], fetched_at=fetched_at)
+
+            with self.cond:
+                job.running -= 1
+                job.busy.discard(platform)
+                finished = not job.pending and job.running == 0 and job.status != CANCELLED
+                if finished:
+                    del self.active[job.job_id]
+                self.cond.notify_all()
+            if finished:
+                self._finish(job)
+
+    def _finish(self, job):
+        """Analyze a fully fetched job, render its report and store everything"""
+        # Imported on first use, so the app's first page doesn't wait for pandas, numpy and fpdf
+        from socialmediaaudit.analysis import analyze_scraped_data
+        from socialmediaaudit.brand import apply_consistency
+        from socialmediaaudit.lexicon import default_scanner
+        from socialmediaaudit.report import build_document, change_lines, render_json, render_pdf, render_text
+
+        with self.cond:
+            self.active.pop(job.job_id, None)
+        params = self.params(job.job_id)
+        results = {}
+        taken_at = {}
+        for platform, key, fetched_at, result in self._execute(
+            "SELECT platform, account_key, fetched_at, result FROM job_accounts WHERE job_id = ?", (job.job_id,)
+        ):
+            results[(platform, key)] = json.loads(result)
+            taken_at[(platform, key)] = fetched_at
+
+        try:
+            plan = FetchPlan()
+            plan.add_handles(params["handles"])
+            scraped_results = plan.fan_out(results, SCRAPED_PLATFORMS)
+            changes = []
+            if self.snapshots is not None:
+                accounts = [a for a in plan.accounts.values() if a.platform in SCRAPED_PLATFORMS]
+                changes = change_lines(self.snapshots.changes(accounts, results, taken_at))
+            with span("analyze", trace=job.trace):
+                options = params.get("options", {})
+                scanner = default_scanner() if options.get("content_review") else None
+                analysis = analyze_scraped_data(scraped_results, scanner=scanner)
+                if options.get("brand_consistency"):
+                    apply_consistency(analysis, params["handles"], scraped_results)
+            with span("report", trace=job.trace):
+                document = build_document(scraped_results, analysis, params["athlete_name"],
+                                          params["total_handles"], params["active_platforms"], changes)
+                report = render_text(document)
+            try:
+                with span("pdf", trace=job.trace):
+                    pdf_bytes = render_pdf(document)
+                pdf_error = None
+            except Exception as e:
+                pdf_bytes = None
+                pdf_error = str(e)
+        except Exception as e:
+            self._execute("UPDATE jobs SET status = ?, finished_at = ?, error = ? WHERE id = ?",
+                          (FAILED, time.time(), str(e), job.job_id))
+            return
+
+        self._execute(
+            "UPDATE jobs SET status = ?, finished_at = ?, scraped_results = ?, analysis = ?, report = ?, "
+            "document = ?, pdf = ?, pdf_error = ?, timings = ? WHERE id = ?",
+            (DONE, time.time(), json.dumps(scraped_results), json.dumps(analysis), report,
+             render_json(document), pdf_bytes, pdf_error, json.dumps(job.trace.spans), job.job_id),
+        )
+
+    def params(self, job_id):
+        """Inputs a job was submitted with"""
+        rows = self._execute("SELECT params FROM jobs WHERE id = ?", (job_id,))
+        return json.loads(rows[0][0]) if rows else None
+
+    def status(self, job_id):
+        """Job state and progress as a dict, or None for an unknown job"""
+        rows = self._execute(
+            "SELECT owner, status, created_at, finished_at, params, error FROM jobs WHERE id = ?", (job_id,)
+        )
+        if not rows:
+            return None
+        owner, status, created_at, finished_at, params, error = rows[0]
+        counts = dict(self._execute(
+            "SELECT status, COUNT(*) FROM job_accounts WHERE job_id = ? GROUP BY status", (job_id,)
+        ))
+        return {
+            "id": job_id,
+            "owner": owner,
+            "status": status,
+            "created_at": created_at,
+            "finished_at": finished_at,
+            "params": json.loads(params),
+            "error": error,
+            "fetched": counts.get(FETCHED, 0),
+            "total": sum(counts.values()),
+        }
+
+    def accounts(self, job_id):
+        """Per-account progress of a job, in fetch-plan order, with results as they land"""
+        return [
+            {"platform": platform, "handle": handle, "status": status,
+             "result": json.loads(result) if result else None}
+            for platform, handle, status, result in self._execute(
+                "SELECT platform, handle, status, result FROM job_accounts WHERE job_id = ? ORDER BY seq", (job_id,)
+            )
+        ]
+
+    def audit(self, job_id):
+        """Stored output of a finished job, in the shape the app renders, or None"""
+        from socialmediaaudit.report import ReportDocument
+
+        rows = self._execute(
+            "SELECT scraped_results, analysis, report, document, pdf, pdf_error, timings, finished_at, params "
+            "FROM jobs WHERE id = ? AND status = ?", (job_id, DONE)
+        )
+        if not rows:
+            return None
+        scraped_results, analysis, report, document, pdf, pdf_error, timings, finished_at, params = rows[0]
+        params = json.loads(params)
+        timestamp = time.strftime("%Y%m%d_%H%M", time.localtime(finished_at))
+        return {
+            "job": job_id,
+            "key": params["audit_key"],
+            "scraped_results": json.loads(scraped_results),
+            "analysis": json.loads(analysis),
+            "report": report,
+            "document": ReportDocument.from_dict(json.loads(document)) if document else None,
+            "pdf_bytes": pdf,
+            "pdf_error": pdf_error,
+            "filename": f"Live_Social_Media_Audit_{params['athlete_name']}_{timestamp}.pdf",
+            "timings": json.loads(timings),
+        }
+
+    def recent(self, owner=None, limit=20):
+        """Most recent jobs, newest first, as (id, athlete_name, status, created_at)"""
+        query = "SELECT id, params, status, created_at FROM jobs"
+        params = []
+        if owner is not None:
+            query += " WHERE owner = ?"
+            params.append(owner)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        params.append(limit)
+        return [(job_id, json.loads(job_params)["athlete_name"], status, created_at)
+                for job_id, job_params, status, created_at in self._execute(query, params)]
+
+    def close(self):
+        """Stop the workers once their current fetches finish"""
+        with self.cond:
+            self.closed = True
+            self.cond.notify_all()
+        for thread in self.threads:
+            thread.join()
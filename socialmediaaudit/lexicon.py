@@ -0,0 +1,181 @@
+"""Screening of bios and channel descriptions against a compliance lexicon"""
+import csv
+import os
+import re
+from bisect import bisect_right
+
+# Built-in terms by category; SOCIALMEDIAAUDIT_LEXICON names a CSV of category,term rows to add
+RISK_LEXICON = {
+    "profanity": [
+        "fuck", "fucks", "fucking", "fucked", "motherfucker", "wtf", "stfu", "shit", "shitty", "bullshit",
+        "bitch", "bitches", "asshole", "pussy", "cunt", "bastard",
+    ],
+    "substances": [
+        "weed", "marijuana", "cannabis", "420", "dab pen", "edibles", "mdma",
+        "cocaine", "xanax", "percs", "shrooms", "vape", "juul", "drunk", "hungover", "keg stand", "beer pong",
+    ],
+    "gambling": [
+        "gambling", "sports betting", "bet slip", "parlay", "parlays", "sportsbook", "bookie", "draftkings",
+        "fanduel", "prizepicks", "odds boost", "casino", "online poker", "wager",
+    ],
+    "harassment": [
+        "kill yourself", "kill urself", "kys", "go die", "retard", "retarded", "fight me", "catch these hands",
+        "snitches get stitches",
+    ],
+}
+
+# Terms that are also everyday names ("Molly", "Kush", "Bong"), flagged only when the same text
+# has one of the cues or another term of their category. "dick" is left out altogether: as a
+# name it is too common for any cue to tell the two apart
+CONTEXT_TERMS = {
+    "substances": {
+        "terms": ["molly", "kush", "bong"],
+        "cues": ["smoke", "smoking", "smoked", "smokin", "get high", "getting high", "stoned", "blaze", "blazed",
+                 "blazing", "toke", "zaza", "popping", "poppin", "rollin"],
+    },
+}
+
+# Leetspeak substitutions undone before matching; other whitespace becomes a space and
+# zero-width characters (used to slip words past filters) are dropped
+LEET = str.maketrans({"0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b",
+                      "@": "a", "$": "s", "!": "i", "|": "l", "+": "t",
+                      "\t": " ", "\r": " ", "\f": " ", "\v": " ", "\xa0": " ", "\u2009": " ",
+                      "\u200b": None, "\u200c": None, "\u200d": None, "\u2060": None, "\ufeff": None})
+
+# "f.u.c.k", "s-h-i-t": separators between single characters are dropped. The pattern starts
+# with the separator so the regex engine can skip ahead to candidates instead of trying every position
+SPACED_LETTERS = re.compile(r"[.\-_*](?<=\b\w[.\-_*])(?=\w\b)")
+# "fuuuuck": runs of three or more of a character become one
+REPEATS = re.compile(r"(\w)\1{2,}")
+SPACES = re.compile(" {2,}")
+
+
+def normalize(text):
+    """Casefolded text with leetspeak, spaced-out letters and stretched characters undone"""
+    text = text.casefold().translate(LEET)
+    text = SPACED_LETTERS.sub("", text)
+    text = REPEATS.sub(r"\1", text)
+    return SPACES.sub(" ", text)
+
+
+def load_lexicon(path):
+    """Read a category,term CSV (lines starting with # are skipped) into {category: [terms]}"""
+    lexicon = {}
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or row[0].startswith("#"):
+                continue
+            category, term = row[0].strip().lower(), row[1].strip()
+            if category and term:
+                lexicon.setdefault(category, []).append(term)
+    return lexicon
+
+
+def _trie_pattern(node):
+    """Regex for a trie, factored by shared prefixes so the engine never tries a term twice"""
+    branches = [re.escape(char) + _trie_pattern(child) for char, child in sorted(node.items()) if char]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        return body + "?" if len(branches) == 1 and len(branches[0]) == 1 else "(?:" + body + ")?"
+    return body
+
+
+class RiskScanner:
+    """Finds lexicon terms in many texts with one pass over all of them.
+
+    The lexicon is normalized and compiled once into a trie, emitted as a
+    single prefix-factored regex, so each position of the input is tried
+    against every term at once by the C regex engine rather than once per
+    term. Texts are normalized and scanned joined by newlines, and each
+    match is mapped back to its text by offset. Terms only match as whole
+    words, so "class" never trips "ass".
+
+    `context_terms` ({category: {"terms", "cues"}}, see CONTEXT_TERMS) go
+    into the same regex, but a context term only counts in a text that
+    also has one of its cues or a plain term of its category. The default
+    lexicon comes with CONTEXT_TERMS; a lexicon passed in has none unless
+    they are given too.
+    """
+
+    def __init__(self, lexicon=None, context_terms=None):
+        if lexicon is None:
+            lexicon = RISK_LEXICON
+            context_terms = CONTEXT_TERMS if context_terms is None else context_terms
+        self.terms = {}
+        # Normalized context term -> its category, and cue -> the categories it vouches for
+        self.needs_context = {}
+        self.cues = {}
+        for category, terms in lexicon.items():
+            for term in terms:
+                key = normalize(term).strip()
+                if key and key not in self.terms:
+                    self.terms[key] = (category, term)
+        for category, entry in (context_terms or {}).items():
+            for term in entry.get("terms", []):
+                key = normalize(term).strip()
+                if key and key not in self.terms:
+                    self.terms[key] = (category, term)
+                    self.needs_context[key] = category
+            for cue in entry.get("cues", []):
+                key = normalize(cue).strip()
+                if key:
+                    self.cues.setdefault(key, set()).add(category)
+        trie = {}
+        for key in set(self.terms) | set(self.cues):
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[""] = {}
+        self.pattern = re.compile(r"(?<!\w)" + _trie_pattern(trie) + r"(?!\w)") if trie else None
+
+    def scan_many(self, texts):
+        """For each text, a list of (category, term) matches in the order they appear"""
+        matches = [[] for _ in texts]
+        if self.pattern is None or not texts:
+            return matches
+        normalized = normalize("\n".join(text.replace("\n", " ") for text in texts))
+        starts = []
+        offset = 0
+        for piece in normalized.split("\n"):
+            starts.append(offset)
+            offset += len(piece) + 1
+        found = [[] for _ in texts]
+        for match in self.pattern.finditer(normalized):
+            found[bisect_right(starts, match.start()) - 1].append(match.group())
+        for keys, text_matches in zip(found, matches):
+            if not keys:
+                continue
+            vouched = set()
+            for key in keys:
+                vouched |= self.cues.get(key, set())
+                if key in self.terms and key not in self.needs_context:
+                    vouched.add(self.terms[key][0])
+            for key in keys:
+                if key not in self.terms:
+                    continue
+                category = self.needs_context.get(key)
+                if category is None or category in vouched:
+                    text_matches.append(self.terms[key])
+        return matches
+
+    def scan(self, text):
+        """(category, term) matches in one text"""
+        return self.scan_many([text])[0]
+
+
+_default = None
+
+
+def default_scanner():
+    """The process-wide scanner for the built-in lexicon plus SOCIALMEDIAAUDIT_LEXICON, compiled once"""
+    global _default
+    if _default is None:
+        lexicon = {category: list(terms) for category, terms in RISK_LEXICON.items()}
+        path = os.environ.get("SOCIALMEDIAAUDIT_LEXICON")
+        if path:
+            for category, terms in load_lexicon(path).items():
+                lexicon.setdefault(category, []).extend(terms)
+        _default = RiskScanner(lexicon, CONTEXT_TERMS)
+    return _default
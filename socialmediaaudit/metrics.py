@@ -0,0 +1,222 @@
+"""Timing spans, process-wide histograms and Prometheus/JSON export.
+
+Set SOCIALMEDIAAUDIT_METRICS=0 to disable. Disabled spans are a shared
+no-op object, so instrumented code paths cost a function call and nothing
+more.
+"""
+import json
+import os
+import threading
+import time
+
+ENABLED = os.environ.get("SOCIALMEDIAAUDIT_METRICS", "1") != "0"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+BYTES_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus style"""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Registry:
+    """Process-wide store of histograms and counters, keyed by name and labels"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + amount
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.counters.clear()
+
+    def snapshot(self):
+        """JSON-serializable copy of every metric"""
+        with self.lock:
+            return {
+                "histograms": [
+                    {"name": name, "labels": dict(labels), "buckets": list(h.buckets),
+                     "counts": list(h.counts), "sum": h.sum, "count": h.count}
+                    for (name, labels), h in self.histograms.items()
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in self.counters.items()
+                ],
+            }
+
+    def merge(self, snapshot):
+        """Add another process's snapshot into this registry"""
+        with self.lock:
+            for entry in snapshot["histograms"]:
+                key = (entry["name"], tuple(sorted(entry["labels"].items())))
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram(tuple(entry["buckets"]))
+                histogram.counts = [a + b for a, b in zip(histogram.counts, entry["counts"])]
+                histogram.sum += entry["sum"]
+                histogram.count += entry["count"]
+            for entry in snapshot["counters"]:
+                key = (entry["name"], tuple(sorted(entry["labels"].items())))
+                self.counters[key] = self.counters.get(key, 0) + entry["value"]
+
+    def to_prometheus(self):
+        """Render every metric in the Prometheus text exposition format"""
+        snapshot = self.snapshot()
+        lines = []
+        typed = set()
+        for entry in sorted(snapshot["counters"], key=lambda e: e["name"]):
+            name = f"socialmediaaudit_{entry['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(entry['labels'])} {entry['value']}")
+        for entry in sorted(snapshot["histograms"], key=lambda e: e["name"]):
+            name = f"socialmediaaudit_{entry['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            cumulative = 0
+            for bound, count in zip(list(entry["buckets"]) + ["+Inf"], entry["counts"]):
+                cumulative += count
+                lines.append(f"{name}_bucket{_labels(dict(entry['labels'], le=bound))} {cumulative}")
+            lines.append(f"{name}_sum{_labels(entry['labels'])} {entry['sum']}")
+            lines.append(f"{name}_count{_labels(entry['labels'])} {entry['count']}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self):
+        return json.dumps(self.snapshot(), indent=2)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    inner = ",".join(f'{k}="{str(v)}"' for k, v in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+REGISTRY = Registry()
+
+_local = threading.local()
+
+
+class AuditTrace:
+    """Spans recorded during one audit, for the per-audit breakdown in the UI"""
+
+    def __init__(self):
+        self.spans = []
+        self.lock = threading.Lock()
+
+    def add(self, record):
+        with self.lock:
+            self.spans.append(record)
+
+    def summary(self):
+        """Total seconds and count per span name"""
+        totals = {}
+        for record in self.spans:
+            total = totals.setdefault(record["span"], {"span": record["span"], "count": 0, "seconds": 0.0})
+            total["count"] += 1
+            total["seconds"] += record["seconds"]
+        return list(totals.values())
+
+
+class Span:
+    """Times a block of code and records it in the registry and the active trace.
+
+    Attributes set with `set()` (bytes, status, cache) are kept on the trace
+    record; `bytes` and `status` also feed process-wide metrics. Spans nest
+    per thread: a child inherits its parent's trace and platform.
+    """
+
+    def __init__(self, name, trace=None, **labels):
+        self.name = name
+        self.trace = trace
+        self.labels = labels
+        self.attributes = {}
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        if stack:
+            parent = stack[-1]
+            if self.trace is None:
+                self.trace = parent.trace
+            for key, value in parent.labels.items():
+                self.labels.setdefault(key, value)
+        stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _local.stack.pop()
+        REGISTRY.observe("span_seconds", seconds, span=self.name, **self.labels)
+        if "bytes" in self.attributes:
+            REGISTRY.observe("response_bytes", self.attributes["bytes"], buckets=BYTES_BUCKETS, **self.labels)
+        if "status" in self.attributes:
+            REGISTRY.inc("responses_total", status=self.attributes["status"], **self.labels)
+        if "cache" in self.attributes:
+            REGISTRY.inc("cache_results_total", result=self.attributes["cache"], **self.labels)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        if self.trace is not None:
+            self.trace.add({"span": self.name, "seconds": seconds, **self.labels, **self.attributes})
+        return False
+
+
+class _NullSpan:
+    def set(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NULL_SPAN = _NullSpan()
+
+
+def span(name, trace=None, **labels):
+    """Start a timing span, or return the shared no-op span when metrics are off"""
+    if not ENABLED:
+        return NULL_SPAN
+    return Span(name, trace, **labels)
@@ -0,0 +1,240 @@
+"""Continuous monitoring that keeps a roster's snapshots fresh within per-platform request budgets"""
+import heapq
+import random
+import threading
+import time
+from collections import deque
+from datetime import date
+
+from socialmediaaudit.canonical import SCRAPED_PLATFORMS, FetchPlan
+from socialmediaaudit.capabilities import Capability, capability_for
+from socialmediaaudit.metrics import span
+from socialmediaaudit.records import ScrapeError
+from socialmediaaudit.snapshots import DEFAULT_FRESHNESS
+
+# Requests per hour each platform gets by default
+DEFAULT_BUDGETS = {
+    "instagram": 120,
+    "youtube": 120,
+    "twitter": 60,
+    "tiktok": 60,
+}
+
+# Importance multiplier for athletes whose active_until date has not passed
+ACTIVE_WINDOW_BOOST = 3
+
+# Relative audience change per day that doubles how often an account is checked
+CHANGE_RATE_SCALE = 0.01
+MAX_CHANGE_BOOST = 4
+
+# Error-rate backoff: measured over the last ERROR_WINDOW fetches per platform
+ERROR_WINDOW = 20
+ERROR_THRESHOLD = 0.5
+MAX_BACKOFF = 16
+
+# Statuses that mean the account is gone, not that the platform is pushing back
+MISSING_STATUSES = {404, 410}
+
+
+def importance(claims, today):
+    """Highest weight any athlete gives an account, from their (priority, active_until) claims"""
+    return max(priority * (ACTIVE_WINDOW_BOOST if active_until >= today else 1)
+               for priority, active_until in claims)
+
+
+def counts_as_error(result):
+    """Whether a fetch should push its platform towards backing off"""
+    return result.is_error and getattr(result, "status", None) not in MISSING_STATUSES
+
+
+def change_rate(history):
+    """Mean relative audience change per day from (fetched_at, audience) pairs, newest first"""
+    points = [(fetched_at, audience) for fetched_at, audience in history if audience is not None]
+    rates = []
+    for (newer_at, newer), (older_at, older) in zip(points, points[1:]):
+        days = (newer_at - older_at) / 86400
+        if days > 0:
+            rates.append(abs(newer - older) / max(older, 1) / days)
+    return sum(rates) / len(rates) if rates else 0.0
+
+
+class PlatformPacer:
+    """Spaces one platform's requests evenly across its hourly budget.
+
+    Intervals are jittered so requests don't line up on a fixed beat, and
+    they stretch (up to MAX_BACKOFF times) while the recent error rate is
+    above ERROR_THRESHOLD, shrinking back once it recovers.
+    """
+
+    def __init__(self, per_hour, jitter=0.2):
+        self.interval = 3600 / per_hour
+        self.jitter = jitter
+        self.backoff = 1
+        self.outcomes = deque(maxlen=ERROR_WINDOW)
+        self.next_at = 0
+
+    def error_rate(self):
+        return sum(self.outcomes) / len(self.outcomes) if self.outcomes else 0.0
+
+    def record(self, failed, now):
+        """Note a fetch outcome and schedule the next request slot"""
+        self.outcomes.append(bool(failed))
+        if len(self.outcomes) >= ERROR_WINDOW // 2:
+            rate = self.error_rate()
+            if rate > ERROR_THRESHOLD:
+                self.backoff = min(MAX_BACKOFF, self.backoff * 2)
+            elif rate < ERROR_THRESHOLD / 2:
+                self.backoff = max(1, self.backoff / 2)
+        spread = random.uniform(1 - self.jitter, 1 + self.jitter)
+        self.next_at = now + self.interval * self.backoff * spread
+
+
+class Monitor:
+    """Keeps snapshots of a roster's accounts fresh, most useful fetches first.
+
+    Each platform has a priority queue ordered by when an account is next
+    due: its last fetch plus the platform's freshness window divided by a
+    weight. The weight grows with the athlete's priority (boosted while in
+    an active recruiting window, checked again at every fetch) and with how
+    fast the account's audience has been changing, so important and
+    volatile accounts come round more often. Never-fetched accounts go
+    first. A platform only spends its budget on accounts that are due, so
+    load stays steady and below the budget rather than bursting. Missing
+    profiles don't count as errors towards a platform's backoff.
+    """
+
+    def __init__(self, scraper, store, budgets=None, jitter=0.2, log=print):
+        self.scraper = scraper
+        self.store = store
+        self.budgets = dict(DEFAULT_BUDGETS, **(budgets or {}))
+        self.jitter = jitter
+        self.log = log
+        self.lock = threading.Lock()
+        self.queues = {}
+        self.pacers = {}
+        self.stats = {"fetches": 0, "errors": 0}
+
+    def _weight(self, account, claims):
+        history = self.store.account_history(account.platform, account.key)
+        boost = min(MAX_CHANGE_BOOST, change_rate([(f, a) for f, a, _ in history]) / CHANGE_RATE_SCALE)
+        return importance(claims, date.today().isoformat()) * (1 + boost), (history[0][0] if history else None)
+
+    def _due(self, platform, last_fetched, weight):
+        if last_fetched is None:
+            return -weight
+        return last_fetched + self.store.windows.get(platform, DEFAULT_FRESHNESS) / weight
+
+    def load(self, athletes):
+        """Queue every fetchable account in a roster (see batch.read_roster)"""
+        plan = FetchPlan()
+        claims = {}
+        owners = {}
+        for athlete in athletes:
+            plan.add_handles(athlete["handles"], owner=athlete["athlete"])
+            claim = (athlete.get("priority", 1), athlete.get("active_until", ""))
+            for account in plan.owner_accounts(athlete["athlete"]):
+                key = (account.platform, account.key)
+                claims.setdefault(key, set()).add(claim)
+                owners.setdefault(key, athlete["athlete"])
+
+        queues = {}
+        for key, account in plan.accounts.items():
+            platform = account.platform
+            if platform not in SCRAPED_PLATFORMS or capability_for(platform) is Capability.NONE:
+                continue
+            if platform not in self.budgets:
+                continue
+            account_claims = tuple(claims[key])
+            weight, last_fetched = self._weight(account, account_claims)
+            entry = (self._due(platform, last_fetched, weight), account.key, account, owners[key], account_claims)
+            queues.setdefault(platform, []).append(entry)
+        with self.lock:
+            for platform, queue in queues.items():
+                heapq.heapify(queue)
+                self.queues[platform] = queue
+                self.pacers.setdefault(platform, PlatformPacer(self.budgets[platform], self.jitter))
+        return {platform: len(queue) for platform, queue in queues.items()}
+
+    def step(self, platform, now=None):
+        """Fetch the platform's most overdue account if its budget allows.
+
+        Returns seconds until this platform should be stepped again.
+        """
+        now = now or time.time()
+        with self.lock:
+            pacer = self.pacers[platform]
+            queue = self.queues[platform]
+            if now < pacer.next_at:
+                return pacer.next_at - now
+            if not queue or queue[0][0] > now:
+                return min(pacer.interval, queue[0][0] - now) if queue else pacer.interval
+            due, account_key, account, athlete, claims = heapq.heappop(queue)
+
+        with span("monitor_fetch", platform=platform) as timing:
+            try:
+                result = self.scraper.scrape(platform, account.handle)
+            except Exception as e:
+                timing.set(error=type(e).__name__)
+                result = ScrapeError(error=f"Error scraping {platform} {account.handle}: {str(e)}")
+        fetched_at = time.time()
+        try:
+            self.store.save([(athlete, platform, account.key, result)], fetched_at=fetched_at)
+            weight, _ = self._weight(account, claims)
+        except Exception as e:
+            # Keep the account queued; it comes round again at its base weight
+            self.log(f"{platform} {account.key}: could not save snapshot ({e})")
+            weight = importance(claims, date.today().isoformat())
+
+        with self.lock:
+            pacer.record(counts_as_error(result), fetched_at)
+            heapq.heappush(queue, (self._due(platform, fetched_at, weight), account.key, account, athlete, claims))
+            self.stats["fetches"] += 1
+            self.stats["errors"] += result.is_error
+            wait = pacer.next_at - fetched_at
+        self.log(f"{platform} {account.key}: {'error' if result.is_error else 'ok'}"
+                 f"{f' (backing off x{pacer.backoff:g})' if pacer.backoff > 1 else ''}")
+        return wait
+
+    def _run_platform(self, platform, stop):
+        while not stop.is_set():
+            try:
+                wait = self.step(platform)
+            except Exception as e:
+                # One bad step must not silently end monitoring of the platform
+                self.log(f"{platform}: monitor step failed ({e})")
+                wait = self.pacers[platform].interval
+            stop.wait(max(0.0, wait))
+
+    def run(self, stop=None, duration=None):
+        """Step every platform on its own thread until `stop` is set or `duration` seconds pass"""
+        stop = stop or threading.Event()
+        threads = [threading.Thread(target=self._run_platform, args=(platform, stop), daemon=True)
+                   for platform in self.queues]
+        for thread in threads:
+            thread.start()
+        try:
+            stop.wait(duration)
+        except KeyboardInterrupt:
+            pass
+        stop.set()
+        for thread in threads:
+            thread.join()
+        return dict(self.stats)
+
+
+def run_monitor(roster_path, budgets=None, jitter=0.2, duration=None, base_urls=None, log=print):
+    """Monitor every account in a roster until interrupted or `duration` seconds pass"""
+    from socialmediaaudit.batch import read_roster
+    from socialmediaaudit.scraper import SocialMediaScraper
+    from socialmediaaudit.snapshots import SnapshotStore
+    from socialmediaaudit.transport import Transport
+
+    # No response cache: its TTLs would keep handing back the page a snapshot was last taken from
+    scraper = SocialMediaScraper(transport=Transport(), base_urls=base_urls)
+    monitor = Monitor(scraper, SnapshotStore(), budgets=budgets, jitter=jitter, log=log)
+    counts = monitor.load(read_roster(roster_path))
+    for platform, count in sorted(counts.items()):
+        log(f"{platform}: {count} accounts at {monitor.budgets[platform]:g} requests/hour")
+    stats = monitor.run(duration=duration)
+    log(f"Made {stats['fetches']} fetches ({stats['errors']} errors)")
+    return stats
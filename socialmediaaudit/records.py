@@ -0,0 +1,233 @@
+"""Compact typed scrape results with a status enum in place of placeholder strings"""
+from enum import Enum
+
+from socialmediaaudit.capabilities import not_fetched
+
+# Result field holding the audience size for each platform
+AUDIENCE_FIELDS = {"instagram": "followers", "youtube": "subscribers"}
+
+
+class Status(Enum):
+    """Why a profile field has no value; the value is the text reports show for it"""
+    PRIVATE = "Private/Unable to access"
+    UNAVAILABLE = "Unable to access"
+    NOT_LISTED = "N/A"
+    NEEDS_API = not_fetched("requires API access")
+    TIKTOK_RESTRICTED = not_fetched("TikTok restricts scraping")
+    LINKEDIN_RESTRICTED = not_fetched("LinkedIn restricts scraping")
+
+
+PLACEHOLDERS = {status.value: status for status in Status}
+
+
+def parse_count(value):
+    """Audience count as an int, or None for placeholders like "Private/Unable to access" """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str):
+        digits = value.replace(",", "").strip()
+        # isdecimal, not isdigit: superscripts like "²" are digits int() can't parse
+        if digits.isdecimal():
+            return int(digits)
+    return None
+
+
+class Record:
+    """Base for per-platform scrape results.
+
+    `fields` lists the attributes in the order reports show them, `defaults`
+    their values before anything is scraped, `counts` the fields that hold
+    numbers and `text_field` the free text (bio, description) that content
+    review screens. Counts are parsed to ints once, here, and placeholder
+    strings become Status members, so consumers never re-check sentinels.
+    """
+
+    __slots__ = ()
+    fields = ()
+    defaults = {}
+    counts = ()
+    audience_field = None
+    text_field = None
+    is_error = False
+
+    def __init__(self, **values):
+        for name in self.fields:
+            setattr(self, name, values[name] if name in values else self.defaults.get(name))
+
+    @property
+    def text(self):
+        """The profile's free text, or None when it wasn't available"""
+        if self.text_field is None:
+            return None
+        value = getattr(self, self.text_field)
+        return value if isinstance(value, str) else None
+
+    @property
+    def audience(self):
+        """Follower or subscriber count as an int, or None when it wasn't available"""
+        if self.audience_field is None:
+            return None
+        value = getattr(self, self.audience_field)
+        return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+    def to_dict(self):
+        """The plain dict shape reports, JSON output and st.json have always used"""
+        data = {}
+        for name in self.fields:
+            value = getattr(self, name)
+            if isinstance(value, Status):
+                value = value.value
+            elif name in self.counts and isinstance(value, int) and not isinstance(value, bool):
+                value = f"{value:,}"
+            data[name] = value
+        return data
+
+    @classmethod
+    def from_dict(cls, data):
+        """Rebuild a record from its dict shape, e.g. after a JSON round trip"""
+        values = {}
+        for name in cls.fields:
+            if name not in data:
+                continue
+            value = data[name]
+            if isinstance(value, str) and value in PLACEHOLDERS:
+                value = PLACEHOLDERS[value]
+            elif name in cls.counts:
+                count = parse_count(value)
+                value = value if count is None else count
+            values[name] = value
+        return cls(**values)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and all(getattr(self, n) == getattr(other, n) for n in self.fields)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({', '.join(f'{n}={getattr(self, n)!r}' for n in self.fields)})"
+
+
+class ScrapeError(Record):
+    # `status` is the HTTP status of a page that answered but wasn't a profile; it isn't reported
+    __slots__ = ("error", "status")
+    fields = ("error",)
+    is_error = True
+
+    def __init__(self, status=None, **values):
+        super().__init__(**values)
+        self.status = status
+
+
+class InstagramProfile(Record):
+    __slots__ = ("username", "followers", "following", "posts", "bio", "is_private",
+                 "profile_pic_url", "external_url")
+    fields = __slots__
+    defaults = {
+        "followers": Status.PRIVATE,
+        "following": Status.PRIVATE,
+        "posts": Status.PRIVATE,
+        "bio": Status.PRIVATE,
+        "is_private": True,
+    }
+    counts = ("followers", "following", "posts")
+    audience_field = "followers"
+    text_field = "bio"
+
+
+class TwitterProfile(Record):
+    __slots__ = ("username", "followers", "following", "tweets", "bio", "verified", "location")
+    fields = __slots__
+    defaults = {
+        "followers": Status.NEEDS_API,
+        "following": Status.NEEDS_API,
+        "tweets": Status.NEEDS_API,
+        "bio": Status.NEEDS_API,
+        "verified": False,
+    }
+    counts = ("followers", "following", "tweets")
+    text_field = "bio"
+
+
+class TikTokProfile(Record):
+    __slots__ = ("username", "followers", "likes", "videos", "bio")
+    fields = __slots__
+    defaults = {
+        "followers": Status.TIKTOK_RESTRICTED,
+        "likes": Status.TIKTOK_RESTRICTED,
+        "videos": Status.TIKTOK_RESTRICTED,
+        "bio": Status.TIKTOK_RESTRICTED,
+    }
+    counts = ("followers", "likes", "videos")
+    text_field = "bio"
+
+
+class YouTubeChannel(Record):
+    __slots__ = ("channel_name", "subscribers", "views", "videos", "description")
+    fields = __slots__
+    defaults = {
+        "subscribers": Status.UNAVAILABLE,
+        "views": Status.UNAVAILABLE,
+        "videos": Status.UNAVAILABLE,
+        "description": Status.UNAVAILABLE,
+    }
+    counts = ("subscribers", "views", "videos")
+    audience_field = "subscribers"
+    text_field = "description"
+
+
+class LinkedInProfile(Record):
+    __slots__ = ("profile_url", "name", "headline", "connections", "location")
+    fields = __slots__
+    defaults = {
+        "name": Status.LINKEDIN_RESTRICTED,
+        "headline": Status.LINKEDIN_RESTRICTED,
+        "connections": Status.LINKEDIN_RESTRICTED,
+        "location": Status.LINKEDIN_RESTRICTED,
+    }
+    text_field = "headline"
+
+
+class GenericProfile(Record):
+    """Result for a platform with no record type of its own, keeping whatever fields it came with"""
+
+    __slots__ = ("fields", "values")
+
+    def __init__(self, **values):
+        self.fields = tuple(values)
+        self.values = values
+
+    def __getattr__(self, name):
+        if name in ("fields", "values"):
+            raise AttributeError(name)
+        try:
+            return self.values[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(**{name: PLACEHOLDERS.get(value, value) if isinstance(value, str) else value
+                      for name, value in data.items()})
+
+
+RECORD_TYPES = {
+    "instagram": InstagramProfile,
+    "twitter": TwitterProfile,
+    "tiktok": TikTokProfile,
+    "youtube": YouTubeChannel,
+    "linkedin": LinkedInProfile,
+}
+
+
+def as_record(platform, result):
+    """A record for a scrape result that may still be in dict form"""
+    if isinstance(result, Record):
+        return result
+    if "error" in result:
+        return ScrapeError(error=result["error"])
+    return RECORD_TYPES.get(platform, GenericProfile).from_dict(result)
+
+
+def as_dict(result):
+    """The dict shape of a scrape result that may be a record"""
+    return result.to_dict() if isinstance(result, Record) else result
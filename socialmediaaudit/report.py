@@ -0,0 +1,495 @@
+"""Audit reports as a structured document with text, PDF and JSON renderers"""
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+from datetime import datetime
+
+import fpdf
+from fpdf import FPDF
+
+from socialmediaaudit.records import AUDIENCE_FIELDS, as_dict
+from socialmediaaudit.snapshots import DEFAULT_DATA_DIR
+
+# Bumped whenever a renderer's output changes, so cached renders are not reused
+RENDER_VERSION = 1
+
+# Unicode TrueType fonts for PDFs, first one found wins; SOCIALMEDIAAUDIT_PDF_FONT overrides
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/usr/local/share/fonts/DejaVuSans.ttf",
+    "/Library/Fonts/DejaVuSans.ttf",
+    os.path.expanduser("~/Library/Fonts/DejaVuSans.ttf"),
+    "C:\\Windows\\Fonts\\DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "C:\\Windows\\Fonts\\arial.ttf",
+]
+
+TECHNICAL_NOTES = [
+    "Social media platforms actively restrict automated data collection",
+    "Some metrics may be unavailable due to privacy settings or API limitations  ",
+    "Results reflect publicly available information only",
+    "Manual verification recommended for recruitment purposes",
+    "Consider using official APIs for comprehensive analysis",
+]
+
+NEXT_STEPS = [
+    "Review flagged accounts and privacy settings",
+    "Implement recommended improvements",
+    "Schedule regular monitoring of public presence",
+    "Consider professional social media audit services for deeper analysis",
+    "Ensure compliance with platform Terms of Service",
+]
+
+
+def change_lines(changes):
+    """Describe audience changes from SnapshotStore.changes() for the report"""
+    lines = []
+    for (platform, key), change in changes.items():
+        since = datetime.fromtimestamp(change["since"]).strftime("%Y-%m-%d")
+        lines.append(f"{platform.title()} {key}: {change['change']:+,} {AUDIENCE_FIELDS[platform]} "
+                     f"since {since} (was {change['previous']:,})")
+    return lines
+
+
+class Section:
+    """A titled part of a report. `style` says what `items` hold:
+
+    fields    (label, value) pairs
+    bullets   (marker, text) pairs
+    numbered  plain strings
+    accounts  (platform, number, result dict), one per scraped account
+    """
+
+    __slots__ = ("title", "style", "items")
+
+    def __init__(self, title, style, items):
+        self.title = title
+        self.style = style
+        self.items = items
+
+
+class ReportDocument:
+    """An audit report built once and rendered to text, PDF or JSON"""
+
+    __slots__ = ("title", "generated", "sections")
+
+    def __init__(self, title, generated, sections):
+        self.title = title
+        self.generated = generated
+        self.sections = sections
+
+    def to_dict(self):
+        return {
+            "title": self.title,
+            "generated": self.generated,
+            "sections": [{"title": s.title, "style": s.style, "items": s.items} for s in self.sections],
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        sections = [Section(s["title"], s["style"], [tuple(item) if isinstance(item, list) else item
+                                                      for item in s["items"]])
+                    for s in data["sections"]]
+        return cls(data["title"], data["generated"], sections)
+
+    def content_hash(self):
+        """Hash of everything a renderer reads, used to key cached renders"""
+        digest = hashlib.sha256(f"v{RENDER_VERSION}\n".encode())
+        for chunk in iter_json(self):
+            digest.update(chunk.encode())
+        return digest.hexdigest()
+
+
+def build_document(scraped_results, analysis, athlete_name, total_handles, active_platforms, changes=None,
+                   generated=None):
+    """Build the structured audit report for one athlete"""
+    generated = generated or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    accounts = []
+    for platform, results in scraped_results.items():
+        for i, result in enumerate(results or [], 1):
+            accounts.append((platform, i, as_dict(result)))
+
+    sections = [
+        Section("EXECUTIVE SUMMARY", "fields", [
+            ("Athlete", athlete_name),
+            ("Total Accounts Analyzed", str(total_handles)),
+            ("Platforms Covered", str(active_platforms)),
+            ("Scraping Success Rate",
+             f"{(analysis['accessible_platforms'] / max(1, analysis['total_platforms'])) * 100:.1f}%"),
+        ]),
+        Section("SCRAPING RESULTS", "fields", [
+            ("Successfully Analyzed", f"{analysis['accessible_platforms']} accounts"),
+            ("Private/Restricted", f"{analysis['private_accounts']} accounts  "),
+            ("Public/Accessible", f"{analysis['public_accounts']} accounts"),
+            ("Errors Encountered", f"{len(analysis['risk_factors'])} issues"),
+        ]),
+        Section("DETAILED PLATFORM ANALYSIS", "accounts", accounts),
+    ]
+    optional = [
+        ("KEY INSIGHTS", "•", analysis['platform_insights']),
+        ("CHANGES SINCE LAST AUDIT", "•", changes or []),
+        ("ISSUES FOUND", "⚠️", analysis['risk_factors']),
+        ("RECOMMENDATIONS", "→", analysis['recommendations']),
+    ]
+    for title, marker, lines in optional:
+        if lines:
+            sections.append(Section(title, "bullets", [(marker, line) for line in lines]))
+    readiness = [
+        ("Platform Diversity", f"{active_platforms}/7 major platforms"),
+        ("Public Visibility", f"{analysis['public_accounts']} public accounts"),
+        ("Data Accessibility", f"{analysis['accessible_platforms']} profiles analyzed"),
+    ]
+    if analysis.get("brand_consistency") is not None:
+        readiness.append(("Brand Consistency", f"{analysis['brand_consistency']}/100"))
+    readiness.append(
+        ("Overall Score", f"{min(100, (analysis['accessible_platforms'] / max(1, total_handles)) * 100):.0f}%"))
+    sections += [
+        Section("RECRUITMENT READINESS ASSESSMENT", "fields", readiness),
+        Section("TECHNICAL NOTES", "bullets", [("•", note) for note in TECHNICAL_NOTES]),
+        Section("NEXT STEPS", "numbered", list(NEXT_STEPS)),
+    ]
+    return ReportDocument("LIVE SOCIAL MEDIA AUDIT REPORT", generated, sections)
+
+
+def _as_int(value):
+    # Missing audiences come out of the summary as None, NaN or pandas' NA, none of which int() takes
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def build_roster_document(summary, names=None, generated=None):
+    """Build a one-document overview of a roster from analysis.roster_summary()"""
+    generated = generated or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    names = names or {}
+    platforms = [column[:-len("_audience")] for column in summary.columns if column.endswith("_audience")]
+    accounts = int(summary["accounts"].sum())
+    accessible = int(summary["accessible"].sum())
+
+    athletes = []
+    attention = []
+    for athlete, row in summary.iterrows():
+        name = names.get(athlete, athlete)
+        audiences = []
+        for platform in platforms:
+            audience = _as_int(row[f"{platform}_audience"])
+            if audience is not None:
+                audiences.append(f"{platform.title()} {audience:,} "
+                                 f"(percentile {row[f'{platform}_percentile']:.0f})")
+        athletes.append(("•", f"{name}: {int(row['accounts'])} accounts, {row['success_rate']:.1f}% accessible"
+                              + (f", {', '.join(audiences)}" if audiences else "")))
+        if row["issues"]:
+            attention.append((int(row["issues"]), name))
+
+    sections = [
+        Section("ROSTER OVERVIEW", "fields", [
+            ("Athletes", str(len(summary))),
+            ("Total Accounts Analyzed", str(accounts)),
+            ("Successfully Analyzed", f"{accessible} accounts"),
+            ("Public/Accessible", f"{int(summary['public'].sum())} accounts"),
+            ("Scraping Success Rate", f"{accessible / max(1, accounts) * 100:.1f}%"),
+            ("Errors Encountered", f"{int(summary['issues'].sum())} issues"),
+        ]),
+        Section("ATHLETES", "bullets", athletes),
+    ]
+    if attention:
+        attention.sort(key=lambda item: -item[0])
+        sections.append(Section("NEEDS ATTENTION", "bullets",
+                                [("⚠️", f"{name}: {issues} accounts could not be analyzed") for issues, name in attention]))
+    return ReportDocument("ROSTER SOCIAL MEDIA SUMMARY", generated, sections)
+
+
+def iter_lines(document):
+    """Yield (kind, text) for every line of the report.
+
+    kind is "title", "heading", "subheading", "blank" or "text"; renderers
+    use it for styling and the text renderer ignores it.
+    """
+    yield "title", document.title
+    yield "text", f"Generated: {document.generated}"
+    for section in document.sections:
+        yield "blank", ""
+        yield "heading", f"=== {section.title} ==="
+        if section.style == "fields":
+            for label, value in section.items:
+                yield "text", f"{label}: {value}"
+        elif section.style == "bullets":
+            for marker, text in section.items:
+                yield "text", f"{marker} {text}"
+        elif section.style == "numbered":
+            for i, text in enumerate(section.items, 1):
+                yield "text", f"{i}. {text}"
+        elif section.style == "accounts":
+            current = None
+            for platform, number, result in section.items:
+                if platform != current:
+                    current = platform
+                    yield "blank", ""
+                    yield "subheading", f"{platform.upper()} ANALYSIS:"
+                yield "blank", ""
+                yield "text", f"Account {number}:"
+                if "error" in result:
+                    yield "text", f"  ❌ Error: {result['error']}"
+                else:
+                    for key, value in result.items():
+                        yield "text", f"  • {key.title()}: {value}"
+
+
+def render_text(document):
+    """The plain-text report"""
+    return "\n".join(text for _, text in iter_lines(document))
+
+
+def build_report(scraped_results, analysis, athlete_name, total_handles, active_platforms, changes=None):
+    """Build the plain-text audit report"""
+    return render_text(build_document(scraped_results, analysis, athlete_name, total_handles,
+                                      active_platforms, changes))
+
+
+def iter_json(document):
+    """Yield the report as JSON in chunks of at most one item, so large rosters never sit in one string"""
+    yield '{"title": ' + json.dumps(document.title) + ', "generated": ' + json.dumps(document.generated)
+    yield ', "sections": ['
+    for i, section in enumerate(document.sections):
+        yield (", " if i else "") + '{"title": ' + json.dumps(section.title) + ', "style": ' \
+            + json.dumps(section.style) + ', "items": ['
+        for j, item in enumerate(section.items):
+            yield (", " if j else "") + json.dumps(item, ensure_ascii=False)
+        yield "]}"
+    yield "]}"
+
+
+def render_json(document):
+    """The report as a JSON string"""
+    return "".join(iter_json(document))
+
+
+class _CharSubset(list):
+    """A TrueType font's used characters, each kept once.
+
+    FPDF 1.7.2 appends every character it writes to a plain list and later
+    tests all 65,536 code points against it, so embedding a font in a long
+    report took tens of seconds.
+    """
+
+    def __init__(self, chars=()):
+        super().__init__(dict.fromkeys(chars))
+        self._seen = set(self)
+
+    def append(self, char):
+        if char not in self._seen:
+            self._seen.add(char)
+            super().append(char)
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._seen = set(self)
+
+    def __contains__(self, char):
+        return char in self._seen
+
+
+class _LinearFPDF(FPDF):
+    """FPDF that collects output in a list of chunks.
+
+    FPDF 1.7.2 appends every PDF object to one growing string, which makes
+    writing a large document quadratic in its size.
+    """
+
+    def add_font(self, family, style='', fname='', uni=False):
+        super().add_font(family, style, fname, uni)
+        for font in self.fonts.values():
+            if isinstance(font.get('subset'), list) and not isinstance(font['subset'], _CharSubset):
+                font['subset'] = _CharSubset(font['subset'])
+
+    @property
+    def buffer(self):
+        return "".join(self._chunks)
+
+    @buffer.setter
+    def buffer(self, value):
+        self._chunks = [value] if value else []
+        self._length = len(value)
+
+    def _out(self, s):
+        if isinstance(s, bytes):
+            s = s.decode("latin1")
+        elif not isinstance(s, str):
+            s = str(s)
+        if self.state == 2:
+            self.pages[self.page] += s + "\n"
+        else:
+            self._chunks.append(s + "\n")
+            self._length += len(s) + 1
+
+    def _newobj(self):
+        self.n += 1
+        self.offsets[self.n] = self._length
+        self._out(str(self.n) + " 0 obj")
+
+
+def find_unicode_font():
+    """Path of a Unicode TrueType font for PDFs, or None to fall back to Latin-1 Arial"""
+    override = os.environ.get("SOCIALMEDIAAUDIT_PDF_FONT")
+    for path in ([override] if override else []) + FONT_CANDIDATES:
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def _setup_fonts(pdf):
+    """Register fonts and return a function that makes text printable in them"""
+    font = find_unicode_font()
+    if font is None:
+        pdf.set_font("Arial", '', 10)
+        return lambda text, bold=False: text.encode('latin1', 'ignore').decode('latin1')
+
+    # Parsed font metrics are cached next to our other data instead of beside the font file
+    cache_dir = os.path.join(os.environ.get("SOCIALMEDIAAUDIT_DATA_DIR", DEFAULT_DATA_DIR), "fonts")
+    os.makedirs(cache_dir, exist_ok=True)
+    fpdf.set_global("FPDF_CACHE_MODE", 2)
+    fpdf.set_global("FPDF_CACHE_DIR", cache_dir)
+    with warnings.catch_warnings():
+        # FPDF's TrueType parser warns about cmap entries it skips; the glyphs we use are unaffected
+        warnings.simplefilter("ignore", UserWarning)
+        pdf.add_font("report", '', font, uni=True)
+        bold = os.path.splitext(font)[0] + "-Bold.ttf"
+        if os.path.exists(bold):
+            pdf.add_font("report", 'B', bold, uni=True)
+    pdf.set_font("report", '', 10)
+
+    # Characters the font has no glyph for (most emoji) are dropped rather than drawn as boxes
+    widths = pdf.current_font['cw']
+    covered = {}
+
+    def printable(text, bold=False):
+        kept = []
+        for ch in text:
+            ok = covered.get(ch)
+            if ok is None:
+                code = ord(ch)
+                ok = covered[ch] = code < 128 or (code < len(widths) and widths[code] > 0)
+            if ok:
+                kept.append(ch)
+        return "".join(kept)
+
+    return printable
+
+
+def render_pdf(document):
+    """Render a report document as PDF bytes"""
+    pdf = _LinearFPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    printable = _setup_fonts(pdf)
+    family = pdf.font_family
+    has_bold = family + "B" in pdf.fonts or family in ("arial", "helvetica")
+
+    for kind, line in iter_lines(document):
+        if kind == "blank" or not line.strip():
+            pdf.ln(2)
+            continue
+        if kind == "title":
+            pdf.set_font(family, 'B' if has_bold else '', 14)
+        elif kind in ("heading", "subheading"):
+            pdf.set_font(family, 'B' if has_bold else '', 10)
+        text = printable(line)
+        if len(text) > 80:
+            pdf.multi_cell(0, 5, text)
+        else:
+            pdf.cell(0, 5, text, ln=True)
+        if kind != "text":
+            pdf.set_font(family, '', 10)
+
+    with warnings.catch_warnings():
+        # Subsetting the font re-reads its cmap, which repeats the warnings silenced in _setup_fonts
+        warnings.simplefilter("ignore", UserWarning)
+        return pdf.output(dest='S').encode('latin1')
+
+
+RENDERERS = {
+    "txt": lambda document: render_text(document).encode("utf-8"),
+    "json": lambda document: render_json(document).encode("utf-8"),
+    "pdf": render_pdf,
+}
+
+
+def render_settings(fmt):
+    """What a format's output depends on besides the document: for PDFs, the FPDF version and font files"""
+    if fmt != "pdf":
+        return ""
+    font = find_unicode_font()
+    settings = [fpdf.FPDF_VERSION, str(font)]
+    if font is not None:
+        for path in (font, os.path.splitext(font)[0] + "-Bold.ttf"):
+            if os.path.exists(path):
+                stat = os.stat(path)
+                settings.append(f"{path}:{stat.st_size}:{stat.st_mtime_ns}")
+    return "\n".join(settings)
+
+
+class RenderCache:
+    """Rendered reports on disk, keyed by the document's content hash and the render settings.
+
+    Rendering the same content again with the same fonts, e.g. a repeated
+    download or a bulk export that includes an unchanged athlete, reads
+    the earlier output instead. The least recently used files go once
+    there are more than `max_files`.
+    """
+
+    def __init__(self, path=None, max_files=2000):
+        if path is None:
+            path = os.path.join(os.environ.get("SOCIALMEDIAAUDIT_DATA_DIR", DEFAULT_DATA_DIR), "renders")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_files = max_files
+        self.stats = {"hits": 0, "misses": 0}
+
+    def _target(self, document, fmt):
+        key = hashlib.sha256(f"{document.content_hash()}\n{render_settings(fmt)}".encode()).hexdigest()
+        return os.path.join(self.path, f"{key}.{fmt}")
+
+    def get(self, document, fmt):
+        """Cached bytes of `document` rendered as `fmt`, or None if it hasn't been rendered"""
+        return self._read(self._target(document, fmt))
+
+    def _read(self, target):
+        try:
+            with open(target, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        os.utime(target)
+        self.stats["hits"] += 1
+        return data
+
+    def render(self, document, fmt):
+        """Bytes of `document` rendered as "pdf", "txt" or "json", from the cache when possible"""
+        target = self._target(document, fmt)
+        data = self._read(target)
+        if data is not None:
+            return data
+        self.stats["misses"] += 1
+        data = RENDERERS[fmt](document)
+        fd, tmp = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, target)
+        self._evict()
+        return data
+
+    def _evict(self):
+        entries = [entry for entry in os.scandir(self.path) if not entry.name.endswith(".tmp")]
+        if len(entries) <= self.max_files:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:len(entries) - self.max_files]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,291 @@
+"""Platform scrapers for public social media profile pages"""
+import json
+import re
+import time
+from urllib.parse import urlsplit
+
+from socialmediaaudit.cache import CachedResponse
+from socialmediaaudit.canonical import canonicalize
+from socialmediaaudit.extract import HEAD_BYTE_CAP, BlobScanner, HeadExtractor, NullSink, Sinks, count_from_text, text_of
+from socialmediaaudit.metrics import span
+from socialmediaaudit.records import (InstagramProfile, LinkedInProfile, ScrapeError, Status, TikTokProfile,
+                                      TwitterProfile, YouTubeChannel, parse_count)
+from socialmediaaudit.transport import Transport
+
+# Most of a page kept when recording responses for replay
+RECORD_BYTE_CAP = 8 * 1024 * 1024
+
+# Profile fields in Instagram's inline shared data, as the regex that precedes each value
+INSTAGRAM_SHARED_DATA = "window._sharedData = "
+INSTAGRAM_FIELDS = {
+    "followers": r'"edge_followed_by"\s*:\s*\{\s*"count"\s*:\s*',
+    "following": r'"edge_follow"\s*:\s*\{\s*"count"\s*:\s*',
+    "posts": r'"edge_owner_to_timeline_media"\s*:\s*\{\s*"count"\s*:\s*',
+    "bio": r'"biography"\s*:\s*',
+    "is_private": r'"is_private"\s*:\s*',
+}
+
+# Channel counts in YouTube's ytInitialData. Every video has a viewCountText too, so the
+# channel's views are read from its (small) about metadata object
+YOUTUBE_INITIAL_DATA = "var ytInitialData = "
+YOUTUBE_FIELDS = {
+    "subscribers": r'"subscriberCountText"\s*:\s*',
+    "videos": r'"videosCountText"\s*:\s*',
+    "about": r'"channelAboutFullMetadataRenderer"\s*:\s*',
+}
+
+
+class SocialMediaScraper:
+    def __init__(self, cache=None, transport=None, base_urls=None, recorder=None, replay=None):
+        self.transport = transport or Transport()
+        # Per-platform replacement for scheme and host, e.g. a local stand-in server
+        self.base_urls = base_urls or {}
+        self.session = self.transport.session
+        self.session.headers.update({
+            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+        })
+        self.cache = cache
+        # ArchiveWriter that keeps every response, or ArchiveReader to serve them instead of the network
+        self.recorder = recorder
+        self.replay = replay
+    
+    def _fetch(self, platform, url, sink=None, method="GET"):
+        """Request a URL, serving and revalidating through the response cache.
+        
+        The body is streamed into `sink` (see socialmediaaudit.extract) and
+        reading stops as soon as the sink has what it needs or HEAD_BYTE_CAP
+        is reached. Without a sink the whole body is read. When recording,
+        the rest of the body is still read (up to RECORD_BYTE_CAP) so later
+        parsers can find what today's don't look for. A body read through a
+        sink is cached under the sink's cache_part, since it may stop short
+        of the whole page.
+        """
+        with span("fetch", platform=platform) as timing:
+            if self.replay is not None:
+                response = self.replay.lookup(url, method)
+                if response is None:
+                    raise LookupError(f"No archived response for {method} {url}")
+                timing.set(cache="replay", status=response.status_code, bytes=0)
+                return self._feed(response, sink)
+            
+            part = getattr(sink, "cache_part", None)
+            entry, is_fresh = self.cache.lookup(platform, url, method, part) if self.cache else (None, False)
+            if entry and is_fresh:
+                self.cache.record("hits")
+                timing.set(cache="hit", status=entry["status"], bytes=0)
+                return self._record(platform, method, url, self._from_cache(entry, sink))
+            
+            headers = self.cache.validators(entry) if entry else {}
+            response = self.transport.request(platform, method, url, headers=headers,
+                                              stream=True, allow_redirects=True)
+            try:
+                if entry and response.status_code == 304:
+                    self.cache.record("revalidated")
+                    self.cache.touch(url, method, part)
+                    timing.set(cache="revalidated", status=304, bytes=0)
+                    return self._record(platform, method, url, self._from_cache(entry, sink))
+                body = self._read(response, sink, timing)
+            finally:
+                response.close()
+            
+            timing.set(status=response.status_code, bytes=len(body))
+            if self.cache:
+                self.cache.record("misses")
+                timing.set(cache="miss")
+                if response.status_code == 200:
+                    self.cache.store(platform, url, response.status_code, response.headers, body, method, part)
+            fetched = CachedResponse(response.status_code, response.headers, body, from_cache=False)
+            return self._record(platform, method, url, fetched)
+    
+    def _read(self, response, sink, timing):
+        """Read a streamed response body, stopping early once the sink is satisfied"""
+        if sink is None:
+            return response.content
+        if sink.done and self.recorder is None:
+            return b""
+        limit = RECORD_BYTE_CAP if self.recorder is not None else getattr(sink, "byte_cap", HEAD_BYTE_CAP)
+        chunks = []
+        received = 0
+        parse_seconds = 0.0
+        for chunk in response.iter_content(chunk_size=16384):
+            chunks.append(chunk)
+            received += len(chunk)
+            if not sink.done:
+                parse_start = time.perf_counter()
+                sink.feed(chunk)
+                parse_seconds += time.perf_counter() - parse_start
+            if (sink.done and self.recorder is None) or received >= limit:
+                break
+        timing.set(parse_seconds=parse_seconds)
+        return b"".join(chunks)
+    
+    def _from_cache(self, entry, sink):
+        """Build a response from a cache entry, feeding its body to the sink"""
+        return self._feed(CachedResponse(entry["status"], entry["headers"], entry["body"]), sink)
+    
+    def _feed(self, response, sink):
+        if sink is not None:
+            sink.feed(response.content)
+        return response
+    
+    def _record(self, platform, method, url, response):
+        if self.recorder is not None:
+            self.recorder.append(platform, method, url, response.status_code, response.headers, response.content)
+        return response
+    
+    def _url(self, account):
+        """Profile URL for an account, pointed at a stand-in host if one is configured"""
+        base = self.base_urls.get(account.platform)
+        if not base:
+            return account.url
+        parts = urlsplit(account.url)
+        return base.rstrip("/") + parts.path + (f"?{parts.query}" if parts.query else "")
+    
+    def _probe(self, platform, url):
+        """Cheap existence check: a HEAD request whose body is never read"""
+        return self._fetch(platform, url, sink=NullSink(), method="HEAD")
+    
+    def scrape(self, platform, handle):
+        """Dispatch to the platform-specific scrape method"""
+        scrapers = {
+            "instagram": self.scrape_instagram_profile,
+            "twitter": self.scrape_twitter_profile,
+            "tiktok": self.scrape_tiktok_profile,
+            "youtube": self.scrape_youtube_channel,
+            "linkedin": self.scrape_linkedin_profile,
+        }
+        return scrapers[platform](handle)
+    
+    def scrape_instagram_profile(self, username):
+        """Scrape Instagram profile data"""
+        try:
+            account = canonicalize("instagram", username)
+            username, url = account.key, self._url(account)
+            
+            head = HeadExtractor()
+            # Shared data, when a page has it, comes early; one without it is read no further than its head
+            shared = BlobScanner(INSTAGRAM_SHARED_DATA, INSTAGRAM_FIELDS, marker_cap=HEAD_BYTE_CAP)
+            response = self._fetch("instagram", url, sink=Sinks(head, shared))
+            if response.status_code != 200:
+                return ScrapeError(error=f"Profile not found or private: {username}", status=response.status_code)
+            
+            # Try to extract data from meta tags and script tags
+            data = InstagramProfile(username=username)
+            
+            # Look for JSON data in script tags
+            for script in head.ld_json:
+                try:
+                    json_data = json.loads(script)
+                    if isinstance(json_data, dict) and 'author' in json_data:
+                        author = json_data['author']
+                        if isinstance(author, dict):
+                            data.bio = author.get('description', 'No bio available')
+                            followers = author.get('interactionStatistic', {}).get('userInteractionCount')
+                            if followers is None:
+                                data.followers = Status.NOT_LISTED
+                            else:
+                                count = parse_count(followers)
+                                data.followers = followers if count is None else count
+                except:
+                    continue
+            
+            # Try to get meta description
+            if 'description' in head.meta:
+                content = head.meta['description']
+                # Parse follower count from meta description
+                follower_match = re.search(r'([\d,]+)\s+Followers', content)
+                if follower_match:
+                    data.followers = parse_count(follower_match.group(1))
+                    data.is_private = False
+            
+            # Shared data, when the page has it, gives exact counts including following and posts
+            for field in ("followers", "following", "posts"):
+                count = shared.values.get(field)
+                if isinstance(count, int) and not isinstance(count, bool):
+                    setattr(data, field, count)
+            if isinstance(shared.values.get("bio"), str):
+                data.bio = shared.values["bio"]
+            if isinstance(shared.values.get("is_private"), bool):
+                data.is_private = shared.values["is_private"]
+            
+            return data
+            
+        except Exception as e:
+            return ScrapeError(error=f"Error scraping Instagram profile {username}: {str(e)}")
+    
+    def scrape_twitter_profile(self, username):
+        """Scrape Twitter/X profile data"""
+        try:
+            account = canonicalize("twitter", username)
+            # Note: Twitter heavily restricts scraping, this is a basic attempt
+            username, url = account.key, self._url(account)
+            
+            response = self._probe("twitter", url)
+            if response.status_code != 200:
+                return ScrapeError(error=f"Profile not found: {username}", status=response.status_code)
+            
+            # Only existence is checked; profile fields need the official API
+            return TwitterProfile(username=username)
+            
+        except Exception as e:
+            return ScrapeError(error=f"Error scraping Twitter profile {username}: {str(e)}")
+    
+    def scrape_tiktok_profile(self, username):
+        """Scrape TikTok profile data"""
+        try:
+            account = canonicalize("tiktok", username)
+            username, url = account.key, self._url(account)
+            
+            response = self._probe("tiktok", url)
+            if response.status_code != 200:
+                return ScrapeError(error=f"Profile not found: {username}", status=response.status_code)
+            
+            # Only existence is checked; TikTok serves no profile data to scrapers
+            return TikTokProfile(username=username)
+            
+        except Exception as e:
+            return ScrapeError(error=f"Error scraping TikTok profile {username}: {str(e)}")
+    
+    def scrape_youtube_channel(self, channel_name):
+        """Scrape YouTube channel data"""
+        try:
+            # Handle different YouTube URL formats
+            url = self._url(canonicalize("youtube", channel_name))
+            
+            head = HeadExtractor()
+            initial_data = BlobScanner(YOUTUBE_INITIAL_DATA, YOUTUBE_FIELDS)
+            response = self._fetch("youtube", url, sink=Sinks(head, initial_data))
+            if response.status_code != 200:
+                return ScrapeError(error=f"Channel not found: {channel_name}", status=response.status_code)
+            
+            data = YouTubeChannel(channel_name=channel_name)
+            
+            # Try to extract from meta tags
+            if 'description' in head.meta:
+                data.description = head.meta['description']
+            
+            # Counts come from the ytInitialData blob, e.g. {"simpleText": "1.2M subscribers"}
+            values = dict(initial_data.values)
+            about = values.pop("about", None)
+            if isinstance(about, dict):
+                values["views"] = about.get("viewCountText")
+            for field, value in values.items():
+                count = count_from_text(text_of(value))
+                if count is not None:
+                    setattr(data, field, count)
+            
+            return data
+            
+        except Exception as e:
+            return ScrapeError(error=f"Error scraping YouTube channel {channel_name}: {str(e)}")
+    
+    def scrape_linkedin_profile(self, profile_url):
+        """Scrape LinkedIn profile data"""
+        try:
+            profile_url = canonicalize("linkedin", profile_url).url
+            
+            # LinkedIn serves nothing useful to scrapers, so no request is made
+            return LinkedInProfile(profile_url=profile_url)
+            
+        except Exception as e:
+            return ScrapeError(error=f"Error accessing LinkedIn profile: {str(e)}")
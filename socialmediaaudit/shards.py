@@ -0,0 +1,523 @@
+"""Roster audits split into shards for worker processes on one or many hosts"""
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from socialmediaaudit.batch import RosterWriter, completed_athletes, read_roster, run_summary
+from socialmediaaudit.cache import ResponseCache
+from socialmediaaudit.canonical import SCRAPED_PLATFORMS, index_results
+from socialmediaaudit.engine import ScrapeEngine
+from socialmediaaudit.lexicon import default_scanner
+from socialmediaaudit.metrics import REGISTRY
+from socialmediaaudit.records import as_dict, as_record
+from socialmediaaudit.scraper import SocialMediaScraper
+from socialmediaaudit.snapshots import SnapshotStore
+from socialmediaaudit.transport import Transport
+
+# Shard states. Done shards hold their results until the coordinator collects them
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+COLLECTED = "collected"
+FAILED = "failed"
+
+# Run states; workers exit once the coordinator closes its run
+OPEN = "open"
+CLOSED = "closed"
+
+# Canonical accounts per shard: small enough to spread a roster evenly over
+# the workers, large enough to keep every platform's rate limiter busy
+DEFAULT_SHARD_SIZE = 20
+
+# Seconds a lease lasts without a heartbeat; a worker renews it every third of that
+DEFAULT_LEASE = 60
+
+# Times a shard is handed out before it is given up on
+MAX_ATTEMPTS = 3
+
+# Seconds between polls of the queue, by the coordinator and by idle workers
+POLL_SECONDS = 0.5
+
+# Seconds the coordinator keeps serving a closed queue, so idle remote workers see it close
+CLOSE_LINGER = 2
+
+
+class ShardQueue:
+    """SQLite queue of roster shards that workers lease, fetch and hand back.
+
+    A shard is a set of canonical accounts to fetch, grouped by platform.
+    A worker leases one shard at a time inside a write transaction, so no
+    two workers ever hold the same shard, and keeps renewing the lease
+    while it fetches. A shard whose worker reports a failure, or stops
+    renewing because it crashed or lost its network, goes back to the
+    queue until it has been handed out `max_attempts` times. Only the
+    worker currently holding a lease can complete it, so a worker that
+    comes back after its shard was re-leased can't overwrite the new
+    holder's results.
+
+    Worker processes on the same host open the same file. Workers on
+    other hosts go through a QueueServer instead.
+    """
+
+    def __init__(self, path, max_attempts=MAX_ATTEMPTS):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS shards (
+                id INTEGER PRIMARY KEY,
+                handles TEXT NOT NULL,
+                accounts INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                results TEXT,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS workers (
+                name TEXT PRIMARY KEY,
+                shards INTEGER NOT NULL,
+                accounts INTEGER NOT NULL,
+                stats TEXT,
+                seen_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS state (
+                key TEXT PRIMARY KEY,
+                value TEXT
+            );
+            CREATE INDEX IF NOT EXISTS shards_status ON shards (status, id);
+        """)
+
+    @contextmanager
+    def _transaction(self):
+        # BEGIN IMMEDIATE takes the write lock up front, so two processes can't both read a shard as free
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.conn
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("COMMIT")
+
+    def _state(self, key="run"):
+        row = self.conn.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def run_state(self):
+        """OPEN while a coordinator is handing out shards, CLOSED after, None before the first run"""
+        with self.lock:
+            return self._state()
+
+    def current_run(self):
+        """(run number, run state); the number goes up with every run a coordinator opens"""
+        with self.lock:
+            run_id = self._state("run_id")
+            return (int(run_id) if run_id is not None else None), self._state()
+
+    def open_run(self, shards):
+        """Replace whatever was queued with `shards` ({platform: [handles]} each) and open the run"""
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM shards")
+            conn.execute("DELETE FROM workers")
+            conn.executemany(
+                "INSERT INTO shards (handles, accounts, status) VALUES (?, ?, ?)",
+                [(json.dumps(handles), sum(len(h) for h in handles.values()), PENDING) for handles in shards],
+            )
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('run_id', ?)",
+                         (str((int(self._state("run_id") or 0)) + 1),))
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('run', ?)", (OPEN,))
+
+    def close_run(self):
+        """Tell the workers there is nothing more to lease"""
+        with self._transaction() as conn:
+            conn.execute("INSERT OR REPLACE INTO state (key, value) VALUES ('run', ?)", (CLOSED,))
+
+    def lease(self, worker, seconds=DEFAULT_LEASE):
+        """Hand the next free or abandoned shard to `worker`, returning (shard_id, handles) or None"""
+        now = time.time()
+        with self._transaction() as conn:
+            if self._state() != OPEN:
+                return None
+            row = conn.execute(
+                "SELECT id, handles FROM shards WHERE (status = ? OR (status = ? AND lease_until < ?)) "
+                "AND attempts < ? ORDER BY id LIMIT 1",
+                (PENDING, LEASED, now, self.max_attempts),
+            ).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE shards SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 "
+                         "WHERE id = ?", (LEASED, worker, now + seconds, row[0]))
+        return row[0], json.loads(row[1])
+
+    def renew(self, shard_id, worker, seconds=DEFAULT_LEASE):
+        """Extend a lease; False if the shard is no longer `worker`'s"""
+        with self._transaction() as conn:
+            cursor = conn.execute("UPDATE shards SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?",
+                                  (time.time() + seconds, shard_id, worker, LEASED))
+        return cursor.rowcount == 1
+
+    def complete(self, shard_id, worker, results, stats=None):
+        """Store a shard's results, a list of [platform, account_key, result dict].
+
+        `stats` is the worker's latest {"transport", "metrics"} report.
+        Returns False, storing nothing, if the lease had already passed to
+        another worker.
+        """
+        now = time.time()
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET status = ?, results = ?, lease_until = NULL, error = NULL "
+                "WHERE id = ? AND worker = ? AND status = ?",
+                (DONE, json.dumps(results), shard_id, worker, LEASED),
+            )
+            if cursor.rowcount != 1:
+                return False
+            conn.execute(
+                "INSERT INTO workers (name, shards, accounts, stats, seen_at) VALUES (?, 1, ?, ?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET shards = shards + 1, accounts = accounts + excluded.accounts, "
+                "stats = excluded.stats, seen_at = excluded.seen_at",
+                (worker, len(results), json.dumps(stats), now),
+            )
+        return True
+
+    def release(self, shard_id, worker, error):
+        """Give a shard back after a failed attempt, to be leased again unless it is out of attempts"""
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE shards SET status = CASE WHEN attempts >= ? THEN ? ELSE ? END, error = ?, worker = NULL, "
+                "lease_until = NULL WHERE id = ? AND worker = ? AND status = ?",
+                (self.max_attempts, FAILED, PENDING, error, shard_id, worker, LEASED),
+            )
+
+    def sweep(self):
+        """Fail shards whose last allowed lease ran out; returns how many"""
+        with self._transaction() as conn:
+            cursor = conn.execute(
+                "UPDATE shards SET status = ?, error = 'lease expired on every attempt' "
+                "WHERE status = ? AND lease_until < ? AND attempts >= ?",
+                (FAILED, LEASED, time.time(), self.max_attempts),
+            )
+        return cursor.rowcount
+
+    def collect(self):
+        """Results of shards finished since the last call, as [(shard_id, [((platform, account_key), record)])]"""
+        with self._transaction() as conn:
+            rows = conn.execute("SELECT id, results FROM shards WHERE status = ? ORDER BY id", (DONE,)).fetchall()
+            conn.executemany("UPDATE shards SET status = ?, results = NULL WHERE id = ?",
+                             [(COLLECTED, shard_id) for shard_id, _ in rows])
+        return [(shard_id, [((platform, key), as_record(platform, result))
+                            for platform, key, result in json.loads(results)])
+                for shard_id, results in rows]
+
+    def failed(self):
+        """(shard_id, accounts, attempts, error) of every shard given up on"""
+        with self.lock:
+            return self.conn.execute("SELECT id, accounts, attempts, error FROM shards WHERE status = ? ORDER BY id",
+                                     (FAILED,)).fetchall()
+
+    def counts(self):
+        """Number of shards in each state"""
+        with self.lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM shards GROUP BY status").fetchall())
+
+    def re_leased(self):
+        """Number of shards that took more than one lease"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM shards WHERE attempts > 1").fetchone()[0]
+
+    def workers(self):
+        """{worker: {"shards", "accounts", "stats"}} for every worker that completed a shard this run"""
+        with self.lock:
+            rows = self.conn.execute("SELECT name, shards, accounts, stats FROM workers ORDER BY name").fetchall()
+        return {name: {"shards": shards, "accounts": accounts, "stats": json.loads(stats) if stats else None}
+                for name, shards, accounts, stats in rows}
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+# Calls a QueueServer answers; everything else about the queue stays with the coordinator
+WORKER_CALLS = {"lease", "renew", "complete", "release", "run_state", "current_run"}
+
+
+class _QueueHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        name = self.path.strip("/")
+        try:
+            params = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+            if name not in WORKER_CALLS:
+                status, body = 404, {"error": f"unknown call {name!r}"}
+            else:
+                status, body = 200, {"result": getattr(self.server.queue, name)(**params)}
+        except (TypeError, ValueError) as e:
+            status, body = 400, {"error": str(e)}
+        except sqlite3.OperationalError as e:
+            # The queue file is busy; the worker backs off and asks again
+            status, body = 503, {"error": str(e)}
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class QueueServer(ThreadingHTTPServer):
+    """JSON-over-HTTP front for a ShardQueue, for workers on other hosts.
+
+    Each worker call is a POST to /<call> with the call's arguments as a
+    JSON object, answered with {"result": ...}. There is no
+    authentication, so bind it to an address only the worker hosts can
+    reach.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, queue, address):
+        super().__init__(address, _QueueHandler)
+        self.queue = queue
+
+    def start(self):
+        """Serve from a background thread; stop with shutdown()"""
+        threading.Thread(target=self.serve_forever, daemon=True, name="shard-queue-server").start()
+        return self
+
+    @property
+    def url(self):
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+class RemoteShardQueue:
+    """Worker's view of a ShardQueue served by a QueueServer, with the same worker calls"""
+
+    def __init__(self, url, timeout=30):
+        import requests
+        self.url = url.rstrip("/")
+        self.timeout = timeout
+        self.lock = threading.Lock()
+        self.session = requests.Session()
+        # Proxy variables are for reaching the platforms, not the coordinator
+        self.session.trust_env = False
+
+    def _call(self, name, **params):
+        with self.lock:
+            response = self.session.post(f"{self.url}/{name}", json=params, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()["result"]
+
+    def run_state(self):
+        return self._call("run_state")
+
+    def current_run(self):
+        return tuple(self._call("current_run"))
+
+    def lease(self, worker, seconds=DEFAULT_LEASE):
+        leased = self._call("lease", worker=worker, seconds=seconds)
+        return None if leased is None else tuple(leased)
+
+    def renew(self, shard_id, worker, seconds=DEFAULT_LEASE):
+        return self._call("renew", shard_id=shard_id, worker=worker, seconds=seconds)
+
+    def complete(self, shard_id, worker, results, stats=None):
+        return self._call("complete", shard_id=shard_id, worker=worker, results=results, stats=stats)
+
+    def release(self, shard_id, worker, error):
+        return self._call("release", shard_id=shard_id, worker=worker, error=error)
+
+
+def open_queue(location, max_attempts=MAX_ATTEMPTS):
+    """A ShardQueue for a file path, or a RemoteShardQueue for an http(s):// URL"""
+    if location.startswith(("http://", "https://")):
+        return RemoteShardQueue(location)
+    return ShardQueue(location, max_attempts=max_attempts)
+
+
+def plan_shards(writer, shard_size=DEFAULT_SHARD_SIZE):
+    """Split the accounts a RosterWriter still needs into shards of up to `shard_size` canonical accounts.
+
+    Accounts keep roster order, so an athlete's accounts mostly land in
+    one shard and their line can be written as soon as that shard is in.
+    """
+    accounts = [account for _, owned in writer.tasks for account in owned]
+    return [writer.plan.handles_by_platform(SCRAPED_PLATFORMS, accounts[i:i + shard_size])
+            for i in range(0, len(accounts), shard_size)]
+
+
+def _heartbeat(queue, shard_id, worker, lease, stop):
+    """Renew a lease every third of its length until `stop` is set or the lease is lost"""
+    while not stop.wait(lease / 3):
+        try:
+            if not queue.renew(shard_id, worker, lease):
+                return
+        except (OSError, sqlite3.OperationalError):
+            # Try again next beat; the lease outlives two missed renewals
+            continue
+
+
+def run_worker(queue, name=None, delay=3, base_urls=None, proxy=None, use_cache=True, lease=DEFAULT_LEASE,
+               poll=POLL_SECONDS, log=print):
+    """Fetch shards from a coordinator's queue until it closes its run.
+
+    `queue` is the queue file the coordinator writes, or the URL of its
+    QueueServer. Each worker is its own egress point with its own rate
+    budget: `delay` spaces its requests to each platform and `proxy`
+    routes them (see Transport), so workers on different hosts or proxies
+    add up instead of sharing one limit. A worker may start before the
+    coordinator, or while the queue still shows an earlier run as closed,
+    and waits for the next run to open.
+    """
+    if isinstance(queue, str):
+        queue = open_queue(queue)
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    scraper = SocialMediaScraper(cache=ResponseCache() if use_cache else None, transport=Transport(proxy=proxy),
+                                 base_urls=base_urls)
+    engine = ScrapeEngine(scraper, delay=delay)
+    stats = {"shards": 0, "accounts": 0, "lost": 0, "failed": 0}
+    unreachable_since = None
+    # A run already closed when the worker first looks is a previous one, not the worker's cue to stop
+    stale_run = missing = object()
+    while True:
+        try:
+            leased = queue.lease(name, lease)
+            if leased is None:
+                run_id, state = queue.current_run()
+                if stale_run is missing:
+                    stale_run = run_id if state == CLOSED else None
+                if state == CLOSED and run_id != stale_run:
+                    break
+            elif stale_run is missing:
+                stale_run = None
+            unreachable_since = None
+        except (OSError, sqlite3.OperationalError) as e:
+            # A coordinator that is gone for longer than a lease has finished or died either way
+            unreachable_since = unreachable_since or time.monotonic()
+            if time.monotonic() - unreachable_since > lease:
+                log(f"{name}: queue unavailable for {lease:g}s ({e}), stopping")
+                break
+            time.sleep(poll)
+            continue
+        if leased is None:
+            time.sleep(poll)
+            continue
+
+        shard_id, handles = leased
+        stop = threading.Event()
+        heartbeat = threading.Thread(target=_heartbeat, args=(queue, shard_id, name, lease, stop), daemon=True)
+        heartbeat.start()
+        try:
+            results = index_results(handles, engine.scrape_all(handles))
+            payload = [[platform, key, as_dict(result)] for (platform, key), result in results.items()]
+            report = {"transport": scraper.transport.report(), "metrics": REGISTRY.snapshot()}
+            stop.set()
+            heartbeat.join()
+            completed = queue.complete(shard_id, name, payload, report)
+        except Exception as e:
+            stop.set()
+            heartbeat.join()
+            stats["failed"] += 1
+            log(f"{name}: shard {shard_id} failed ({e})")
+            try:
+                queue.release(shard_id, name, f"{type(e).__name__}: {e}")
+            except (OSError, sqlite3.OperationalError):
+                # The lease runs out on its own and the shard is handed out again
+                pass
+            continue
+        if completed:
+            stats["shards"] += 1
+            stats["accounts"] += len(payload)
+            log(f"{name}: shard {shard_id} done, {len(payload)} accounts")
+        else:
+            stats["lost"] += 1
+            log(f"{name}: shard {shard_id} was re-leased before it finished; results dropped")
+    log(f"{name}: run closed after {stats['shards']} shards ({stats['accounts']} accounts)")
+    return stats
+
+
+def run_coordinator(roster_path, output_path, queue_path, shard_size=DEFAULT_SHARD_SIZE, serve=None,
+                    max_attempts=MAX_ATTEMPTS, use_history=True, content_review=True, brand_consistency=True,
+                    metrics_path=None, poll=POLL_SECONDS, log=print):
+    """Audit a roster with run_worker() processes, appending one JSON line per athlete.
+
+    The roster is deduplicated by canonical account as in run_batch() and
+    the accounts still to fetch are queued in `queue_path` as shards.
+    Workers lease shards, and results are collected as they finish and
+    written per athlete in the same format as run_batch(), so summarize,
+    brand and export work on the output unchanged. Analysis, history and
+    the output file stay with the coordinator; workers only fetch.
+
+    With `serve` (a (host, port) pair), the queue is also served over HTTP
+    for workers on other hosts. Shards that fail on every attempt are
+    logged and their athletes left out, so running again picks them up.
+    """
+    athletes = read_roster(roster_path)
+    done = completed_athletes(output_path)
+    pending = [a for a in athletes if a["athlete"] not in done]
+    log(f"{len(athletes)} athletes in roster, {len(done)} already audited, {len(pending)} to go")
+    if not pending:
+        return {"athletes": 0, "accounts": 0, "elapsed": 0.0, "accounts_per_minute": 0.0, "failed": []}
+
+    store = SnapshotStore() if use_history else None
+    scanner = default_scanner() if content_review else None
+    queue = ShardQueue(queue_path, max_attempts=max_attempts)
+    server = QueueServer(queue, serve).start() if serve else None
+    if server is not None:
+        log(f"Workers on other hosts can use {server.url}")
+    reported = set()
+    start = time.monotonic()
+    try:
+        with open(output_path, "a", encoding="utf-8") as out:
+            writer = RosterWriter(pending, out, store=store, scanner=scanner, brand_consistency=brand_consistency,
+                                  log=log)
+            # Athletes with nothing to fetch can be written straight away
+            writer.write_ready(list(writer.missing))
+            shards = plan_shards(writer, shard_size)
+            queue.open_run(shards)
+            log(f"{len(shards)} shards of up to {shard_size} accounts queued in {queue_path}")
+            while True:
+                queue.sweep()
+                for _, fetched in queue.collect():
+                    writer.add(fetched)
+                for shard_id, accounts, attempts, error in queue.failed():
+                    if shard_id not in reported:
+                        reported.add(shard_id)
+                        log(f"Shard {shard_id} ({accounts} accounts) failed after {attempts} attempts: {error}")
+                counts = queue.counts()
+                if not (counts.get(PENDING) or counts.get(LEASED) or counts.get(DONE)):
+                    break
+                time.sleep(poll)
+    finally:
+        queue.close_run()
+        if server is not None:
+            time.sleep(CLOSE_LINGER)
+            server.shutdown()
+            server.server_close()
+
+    workers = queue.workers()
+    for worker, info in workers.items():
+        log(f"{worker}: {info['shards']} shards, {info['accounts']} accounts")
+    workers_stats = {worker: (info["stats"]["transport"], info["stats"]["metrics"])
+                     for worker, info in workers.items() if info["stats"]}
+    summary = run_summary(writer, time.monotonic() - start, workers_stats, metrics_path, log)
+    summary["workers"] = len(workers)
+    summary["re_leased_shards"] = queue.re_leased()
+    summary["failed_shards"] = len(reported)
+    if reported:
+        log(f"{len(reported)} shards failed; run again to retry their athletes")
+    queue.close()
+    return summary
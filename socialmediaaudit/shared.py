@@ -0,0 +1,120 @@
+"""Process-wide scraper shared by every Streamlit session"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from socialmediaaudit.canonical import canonicalize
+
+
+class SingleFlight:
+    """Collapses concurrent calls for the same key into a single call.
+
+    The first caller for a key runs the function; callers that arrive while
+    it is still running wait and receive the same result.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = {}
+
+    def do(self, key, fn):
+        """Return (result, shared) where shared is True if another caller did the work"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = self.calls[key] = {"event": threading.Event(), "result": None, "error": None}
+
+        if not leader:
+            call["event"].wait()
+        else:
+            try:
+                call["result"] = fn()
+            except Exception as e:
+                call["error"] = e
+            finally:
+                with self.lock:
+                    del self.calls[key]
+                call["event"].set()
+
+        if call["error"] is not None:
+            raise call["error"]
+        return call["result"], not leader
+
+
+def handle_key(platform, handle):
+    """Key under which fetches of the same account are shared"""
+    account = canonicalize(platform, handle)
+    return account.platform, account.key
+
+
+class SharedScraper:
+    """Wraps a SocialMediaScraper for use by many sessions at once.
+
+    Concurrent requests for the same account share one network fetch, and
+    successful results are kept for `result_ttl` seconds so back-to-back
+    audits of the same athlete don't fetch again. Every caller gets its own
+    copy of the result, so sessions never see each other's mutations.
+
+    Kept results are in the order they were stored, so each store sweeps
+    the expired ones off the front; a long-lived instance only holds the
+    accounts fetched within the last `result_ttl` seconds.
+    """
+
+    def __init__(self, scraper, result_ttl=300):
+        self.scraper = scraper
+        self.result_ttl = result_ttl
+        self.flight = SingleFlight()
+        self.results = OrderedDict()
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "fetches": 0, "deduplicated": 0, "result_cache_hits": 0}
+
+    @property
+    def cache(self):
+        return self.scraper.cache
+
+    def _count(self, stat):
+        with self.lock:
+            self.stats[stat] += 1
+
+    def _cached_result(self, key):
+        with self.lock:
+            entry = self.results.get(key)
+            if entry is None:
+                return None
+            if time.monotonic() - entry[0] > self.result_ttl:
+                del self.results[key]
+                return None
+            return entry[1]
+
+    def _fetch(self, key, platform, handle):
+        self._count("fetches")
+        result = self.scraper.scrape(platform, handle)
+        if not result.is_error:
+            with self.lock:
+                now = time.monotonic()
+                self.results.pop(key, None)
+                self.results[key] = (now, result)
+                while self.results and now - next(iter(self.results.values()))[0] > self.result_ttl:
+                    self.results.popitem(last=False)
+        return result
+
+    def scrape(self, platform, handle):
+        """Scrape an account, sharing the fetch with concurrent and recent callers"""
+        self._count("requests")
+        key = handle_key(platform, handle)
+        result = self._cached_result(key)
+        if result is not None:
+            self._count("result_cache_hits")
+        else:
+            result, shared = self.flight.do(key, lambda: self._fetch(key, platform, handle))
+            if shared:
+                self._count("deduplicated")
+        return copy.deepcopy(result)
+
+    def dedupe_rate(self):
+        """Fraction of scrape requests answered without a network fetch of their own"""
+        with self.lock:
+            saved = self.stats["deduplicated"] + self.stats["result_cache_hits"]
+            return saved / self.stats["requests"] if self.stats["requests"] else 0.0
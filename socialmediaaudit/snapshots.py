@@ -0,0 +1,145 @@
+"""Historical per-account snapshots for incremental re-audits and change tracking"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from socialmediaaudit.records import as_dict, as_record
+
+DEFAULT_DATA_DIR = os.path.join(os.path.expanduser("~"), ".local", "share", "socialmediaaudit")
+
+# How long a snapshot is reused before the account is fetched again (seconds)
+FRESHNESS_WINDOWS = {
+    "instagram": 24 * 3600,
+    "youtube": 24 * 3600,
+    "twitter": 7 * 24 * 3600,
+    "tiktok": 7 * 24 * 3600,
+    "linkedin": 30 * 24 * 3600,
+}
+DEFAULT_FRESHNESS = 24 * 3600
+
+
+class SnapshotStore:
+    """SQLite store of scrape results keyed by canonical account and time.
+
+    Lookups by account and by athlete are served from composite indexes
+    ending in fetched_at, so "latest snapshot" and "previous snapshot"
+    queries stay cheap however much history accumulates.
+    """
+
+    def __init__(self, path=None, windows=None):
+        if path is None:
+            data_dir = os.environ.get("SOCIALMEDIAAUDIT_DATA_DIR", DEFAULT_DATA_DIR)
+            os.makedirs(data_dir, exist_ok=True)
+            path = os.path.join(data_dir, "snapshots.sqlite3")
+        self.path = path
+        self.windows = dict(FRESHNESS_WINDOWS, **(windows or {}))
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS snapshots (
+                id INTEGER PRIMARY KEY,
+                athlete TEXT,
+                platform TEXT NOT NULL,
+                account_key TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                audience INTEGER,
+                is_error INTEGER NOT NULL,
+                result TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS snapshots_account
+                ON snapshots (platform, account_key, fetched_at);
+            CREATE INDEX IF NOT EXISTS snapshots_athlete
+                ON snapshots (athlete, platform, fetched_at);
+        """)
+        self.conn.commit()
+
+    def save(self, snapshots, fetched_at=None):
+        """Store (athlete, platform, account_key, result) tuples taken at `fetched_at`"""
+        fetched_at = fetched_at or time.time()
+        rows = []
+        for athlete, platform, account_key, result in snapshots:
+            record = as_record(platform, result)
+            rows.append((athlete, platform, account_key, fetched_at, record.audience,
+                         int(record.is_error), json.dumps(as_dict(result))))
+        with self.lock:
+            self.conn.executemany(
+                "INSERT INTO snapshots (athlete, platform, account_key, fetched_at, audience, is_error, result) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.commit()
+
+    def latest(self, platform, account_key, before=None):
+        """Most recent successful snapshot as (fetched_at, audience, result), or None"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT fetched_at, audience, result FROM snapshots "
+                "WHERE platform = ? AND account_key = ? AND fetched_at < ? AND is_error = 0 "
+                "ORDER BY fetched_at DESC LIMIT 1",
+                (platform, account_key, before if before is not None else float("inf")),
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], row[1], json.loads(row[2])
+
+    def fresh_results(self, accounts, now=None):
+        """Reusable results for accounts whose latest snapshot is inside its freshness window.
+
+        Returns {(platform, account_key): (fetched_at, record)}.
+        """
+        now = now or time.time()
+        fresh = {}
+        for account in accounts:
+            snapshot = self.latest(account.platform, account.key)
+            if snapshot is None:
+                continue
+            fetched_at, _, result = snapshot
+            if now - fetched_at < self.windows.get(account.platform, DEFAULT_FRESHNESS):
+                fresh[(account.platform, account.key)] = (fetched_at, as_record(account.platform, result))
+        return fresh
+
+    def changes(self, accounts, results, taken_at):
+        """Audience change of each account since the snapshot before `taken_at`.
+
+        `taken_at` maps (platform, account_key) to when the current result was
+        fetched. Returns {(platform, account_key): {"change", "previous", "since"}}
+        for accounts with a comparable earlier snapshot.
+        """
+        changes = {}
+        for account in accounts:
+            key = (account.platform, account.key)
+            result = results.get(key)
+            if result is None:
+                continue
+            current = as_record(account.platform, result).audience
+            if current is None:
+                continue
+            previous = self.latest(account.platform, account.key, before=taken_at.get(key))
+            if previous is None or previous[1] is None:
+                continue
+            changes[key] = {"change": current - previous[1], "previous": previous[1], "since": previous[0]}
+        return changes
+
+    def account_history(self, platform, account_key, limit=10):
+        """Recent snapshots of one account as (fetched_at, audience, is_error), newest first"""
+        with self.lock:
+            return self.conn.execute(
+                "SELECT fetched_at, audience, is_error FROM snapshots WHERE platform = ? AND account_key = ? "
+                "ORDER BY fetched_at DESC LIMIT ?",
+                (platform, account_key, limit),
+            ).fetchall()
+
+    def history(self, athlete, platform=None, limit=50):
+        """Recent snapshots for an athlete, newest first"""
+        query = "SELECT platform, account_key, fetched_at, audience, is_error FROM snapshots WHERE athlete = ?"
+        params = [athlete]
+        if platform:
+            query += " AND platform = ?"
+            params.append(platform)
+        query += " ORDER BY fetched_at DESC LIMIT ?"
+        params.append(limit)
+        with self.lock:
+            return self.conn.execute(query, params).fetchall()
@@ -0,0 +1,185 @@
+"""HTTP transport: pooled keep-alive connections, retries with backoff and circuit breakers"""
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from socialmediaaudit.engine import PLATFORM_HOSTS
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode br responses)
+    ACCEPT_ENCODING = "gzip, deflate, br"
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+# Statuses worth another attempt after a pause
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Statuses that mean the platform is pushing back on us rather than the profile missing
+BLOCKING_STATUSES = {403, 429, 503, 999}
+
+
+class CircuitOpenError(requests.RequestException):
+    """Raised instead of sending a request to a platform that is blocking us"""
+
+
+def retry_after_seconds(response):
+    """Parse a Retry-After header (delta-seconds or HTTP date) into seconds, or None"""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """Stops requests to a platform after repeated blocking responses.
+
+    After `threshold` consecutive failures the circuit opens for `reset_after`
+    seconds. Once that passes, a single trial request is let through: success
+    closes the circuit, another failure opens it again.
+    """
+
+    def __init__(self, threshold=5, reset_after=300):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at >= self.reset_after:
+                # Half-open: let one trial through and hold the rest back
+                self.opened_at = time.monotonic()
+                return True
+            return False
+
+    def record(self, ok):
+        with self.lock:
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+            else:
+                self.failures += 1
+                if self.failures >= self.threshold:
+                    self.opened_at = time.monotonic()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+
+class Transport:
+    """Shared HTTP session for all platform scrapers.
+
+    One keep-alive pool per host, `pool_maxsize` connections each (size it to
+    the engine's worker count). Failed requests are retried up to
+    `max_retries` times with exponential backoff and full jitter, honoring
+    Retry-After on 429/503 when it is no longer than `max_backoff`. Each
+    platform has its own CircuitBreaker.
+
+    `proxy` (e.g. "http://10.0.0.2:3128") sends every request through that
+    proxy, so several processes on one host can each have their own egress
+    address; without it the usual HTTP(S)_PROXY environment variables apply.
+    """
+
+    def __init__(self, pool_maxsize=10, max_retries=3, backoff=0.5, max_backoff=30,
+                 breaker_threshold=5, breaker_reset=300, timeout=10, proxy=None):
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=len(PLATFORM_HOSTS), pool_maxsize=pool_maxsize, max_retries=0)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+        if proxy:
+            self.session.proxies.update({"http": proxy, "https": proxy})
+        self.adapter = adapter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.breaker_threshold = breaker_threshold
+        self.breaker_reset = breaker_reset
+        self.timeout = timeout
+        self.breakers = {}
+        self.lock = threading.Lock()
+        self.stats = {"requests": 0, "attempts": 0, "retries": 0, "circuit_rejections": 0}
+
+    def _count(self, stat, n=1):
+        with self.lock:
+            self.stats[stat] += n
+
+    def breaker_for(self, platform):
+        with self.lock:
+            if platform not in self.breakers:
+                self.breakers[platform] = CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+            return self.breakers[platform]
+
+    def _backoff(self, attempt, response=None):
+        """Seconds to wait before the next attempt, or None to give up"""
+        if response is not None and response.status_code in (429, 503):
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return retry_after if retry_after <= self.max_backoff else None
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+    def request(self, platform, method, url, **kwargs):
+        """Send a request with retries, failing fast if the platform's circuit is open"""
+        breaker = self.breaker_for(platform)
+        if not breaker.allow():
+            self._count("circuit_rejections")
+            raise CircuitOpenError(f"{platform} is blocking requests; paused for up to {self.breaker_reset}s")
+
+        kwargs.setdefault("timeout", self.timeout)
+        self._count("requests")
+        attempt = 0
+        while True:
+            self._count("attempts")
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record(False)
+                if attempt >= self.max_retries or not breaker.allow():
+                    raise
+                wait = self._backoff(attempt)
+            else:
+                breaker.record(response.status_code not in BLOCKING_STATUSES)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                wait = self._backoff(attempt, response)
+                if wait is None or not breaker.allow():
+                    return response
+                response.close()
+            attempt += 1
+            self._count("retries")
+            time.sleep(wait)
+
+    def connection_stats(self):
+        """Connections opened vs requests sent across the adapter's host pools"""
+        connections = requests_sent = 0
+        pools = self.adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is not None:
+                connections += pool.num_connections
+                requests_sent += pool.num_requests
+        reuse = 1 - connections / requests_sent if requests_sent else 0.0
+        return {"connections_opened": connections, "pooled_requests": requests_sent, "reuse_ratio": reuse}
+
+    def report(self):
+        """Retry, circuit and connection-reuse counters in one dict"""
+        with self.lock:
+            report = dict(self.stats)
+        report.update(self.connection_stats())
+        report["open_circuits"] = sorted(p for p, b in self.breakers.items() if b.is_open)
+        return report
@@ -0,0 +1,164 @@
+"""Streamlit resources, session state and handle entry for app.py"""
+import re
+import uuid
+
+import streamlit as st
+
+from socialmediaaudit.canonical import PLATFORMS, canonicalize
+
+# Handle boxes in display order: platform -> (label, emoji, placeholder, tab)
+HANDLE_INPUTS = {
+    "instagram": ("Instagram", "📸", "@username", 0),
+    "tiktok": ("TikTok", "📱", "@username", 0),
+    "twitter": ("Twitter/X", "🐦", "@username", 0),
+    "snapchat": ("Snapchat", "👻", "@username", 0),
+    "youtube": ("YouTube", "📺", "@channel or Channel Name", 1),
+    "linkedin": ("LinkedIn", "💼", "Profile URL or /in/username", 1),
+    "facebook": ("Facebook", "📘", "@username or profile name", 1),
+}
+HANDLE_TABS = ["📱 Main Platforms", "💼 Professional & Video"]
+
+# Names a pasted "platform: handle" line may start with
+PLATFORM_ALIASES = {platform: platform for platform in PLATFORMS}
+PLATFORM_ALIASES.update({"x": "twitter", "twitter/x": "twitter", "ig": "instagram", "yt": "youtube", "fb": "facebook"})
+
+PASTED_LINE = re.compile(r"^\s*([a-z/]+)\s*[:,]\s*(.+)$", re.IGNORECASE)
+
+
+# Process-wide resources. Each imports what it needs when first called, so
+# the first page of a session renders without loading requests, pandas or fpdf.
+
+@st.cache_resource
+def get_response_cache():
+    """Process-wide on-disk response cache shared by every audit"""
+    from socialmediaaudit.cache import ResponseCache
+    return ResponseCache()
+
+
+def get_shared_scraper():
+    """Process-wide scraper with a pooled session, shared by every user session"""
+    return get_job_queue().scraper
+
+
+@st.cache_resource
+def get_snapshot_store():
+    """Process-wide store of past per-account results"""
+    from socialmediaaudit.snapshots import SnapshotStore
+    return SnapshotStore()
+
+
+@st.cache_resource
+def get_job_queue():
+    """Process-wide background worker pool that runs every session's audits"""
+    from socialmediaaudit.jobs import JobQueue
+    cache = get_response_cache()
+
+    def build_scraper():
+        # Called by the first audit worker to fetch an account, outside any script run
+        from socialmediaaudit.scraper import SocialMediaScraper
+        from socialmediaaudit.shared import SharedScraper
+        from socialmediaaudit.transport import Transport
+        return SharedScraper(SocialMediaScraper(cache=cache, transport=Transport(pool_maxsize=32)))
+
+    return JobQueue(build_scraper, snapshots=get_snapshot_store())
+
+
+@st.cache_resource
+def get_render_cache():
+    """Process-wide on-disk cache of rendered report downloads"""
+    from socialmediaaudit.report import RenderCache
+    return RenderCache()
+
+
+def split_lines(text):
+    """Non-blank lines of a text box, stripped"""
+    return [line.strip() for line in (text or "").splitlines() if line.strip()]
+
+
+def sort_pasted(text):
+    """File pasted lines under their platforms, returning ({platform: [handles]}, [unrecognized lines]).
+
+    A profile URL goes to the platform it points at; any other line needs
+    a platform in front, as in "tiktok: @jdoe" or "instagram,jdoe".
+    """
+    handles = {}
+    unrecognized = []
+    for line in split_lines(text):
+        match = PASTED_LINE.match(line)
+        platform = PLATFORM_ALIASES.get(match.group(1).lower()) if match else None
+        if platform is not None:
+            handles.setdefault(platform, []).append(match.group(2).strip())
+            continue
+        account = canonicalize(None, line)
+        if account.platform is None:
+            unrecognized.append(line)
+        else:
+            handles.setdefault(account.platform, []).append(line)
+    return handles, unrecognized
+
+
+def set_handles(handles):
+    """Make `handles` ({platform: [handles]}) the session's handles and show them in the form"""
+    st.session_state.handles = {platform: list(handles.get(platform, [])) for platform in PLATFORMS}
+    for platform in PLATFORMS:
+        st.session_state[f"{platform}_text"] = "\n".join(st.session_state.handles[platform])
+
+
+def save_handles():
+    """Form callback: read every handle box plus the pasted list into the session's handles"""
+    handles = {platform: split_lines(st.session_state.get(f"{platform}_text")) for platform in PLATFORMS}
+    pasted, unrecognized = sort_pasted(st.session_state.get("pasted_handles"))
+    for platform, found in pasted.items():
+        handles[platform] += [handle for handle in found if handle not in handles[platform]]
+    set_handles(handles)
+    # Lines that couldn't be placed stay in the paste box to be fixed
+    st.session_state.pasted_handles = "\n".join(unrecognized)
+    st.session_state.unrecognized_handles = unrecognized
+
+
+def open_job(job_id):
+    """Show a stored audit of this session's owner and put its handles back into the form"""
+    job = get_job_queue().status(job_id)
+    if job is None or job["owner"] != st.session_state.owner:
+        # Someone else's audit, or one that no longer exists
+        st.session_state.job_id = None
+        st.query_params.pop("job", None)
+        return
+    st.session_state.job_id = job_id
+    st.query_params["job"] = job_id
+    set_handles(job["params"]["handles"])
+
+
+def init_session():
+    """Set up a new browser session: empty handles, an owner id and any audit named in the URL"""
+    if "handles" not in st.session_state:
+        set_handles({})
+    # Each session is one owner, for fair sharing of the worker pool and for listing its own
+    # audits. The id lives only in session state, and one left in an old URL is dropped: anyone
+    # holding a link with it in would otherwise become that owner and could cancel their audits.
+    if "owner" not in st.session_state:
+        st.session_state.owner = uuid.uuid4().hex
+        st.query_params.pop("owner", None)
+    # A job id in the URL lets a rerun pick its audit back up; it only opens for the owner's session
+    if "job_id" not in st.session_state:
+        st.session_state.job_id = None
+        if st.query_params.get("job"):
+            open_job(st.query_params["job"])
+
+
+def handle_form():
+    """Every platform's handles in one form, so typing costs no reruns and saving costs one"""
+    with st.form("handles_form"):
+        tabs = st.tabs(HANDLE_TABS)
+        for platform, (label, emoji, placeholder, tab) in HANDLE_INPUTS.items():
+            with tabs[tab]:
+                st.text_area(f"{emoji} {label}", key=f"{platform}_text", placeholder=f"{placeholder} (one per line)",
+                             height=80)
+        st.text_area("📋 Paste a list", key="pasted_handles",
+                     placeholder="https://www.instagram.com/jdoe/\ntiktok: @jdoe\nyoutube, @jdoehoops",
+                     help="Profile URLs go to the platform they point at; other lines need the platform first. "
+                          "They are sorted into the boxes above when you save.")
+        st.form_submit_button("💾 Save Handles", on_click=save_handles)
+    if st.session_state.get("unrecognized_handles"):
+        st.warning(f"Couldn't tell the platform of {len(st.session_state.unrecognized_handles)} pasted line(s); "
+                   "start them with a platform name, e.g. \"instagram: @jdoe\".")
@@ -0,0 +1,38 @@
+import os
+import sys
+
+import pytest
+
+BENCH_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks")
+
+
+@pytest.fixture(autouse=True)
+def data_dirs(tmp_path, monkeypatch):
+    """Keep caches, snapshots and renders out of the real data directories"""
+    monkeypatch.setenv("SOCIALMEDIAAUDIT_DATA_DIR", str(tmp_path / "data"))
+    monkeypatch.setenv("SOCIALMEDIAAUDIT_CACHE_DIR", str(tmp_path / "cache"))
+    os.makedirs(tmp_path / "data")
+    return tmp_path
+
+
+@pytest.fixture(scope="session")
+def standin():
+    """{platform: base_url} of the benchmarks' local stand-in platform servers"""
+    sys.path.insert(0, BENCH_DIR)
+    import standin_server
+    process, base_urls = standin_server.start_in_subprocess()
+    yield base_urls
+    process.terminate()
+    process.join()
+
+
+def write_roster(path, rows):
+    """Write a roster CSV from {"athlete", platform: "handle;handle"} dicts"""
+    import csv
+    from socialmediaaudit.canonical import PLATFORMS
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["athlete"] + PLATFORMS)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+    return str(path)
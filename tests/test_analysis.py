@@ -0,0 +1,68 @@
+import json
+import os
+
+import pytest
+
+from socialmediaaudit.analysis import analyze_scraped_data, analyze_table, results_table, roster_summary
+from socialmediaaudit.records import InstagramProfile, ScrapeError, Status, YouTubeChannel
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+
+
+def baseline_cases():
+    # Inputs and outputs of the original per-result analyze_scraped_data loop
+    with open(os.path.join(DATA_DIR, "analysis_baseline.jsonl"), encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+@pytest.mark.parametrize("case", baseline_cases())
+def test_dict_results_match_baseline(case):
+    assert json.dumps(analyze_scraped_data(case["input"])) == json.dumps(case["output"])
+
+
+def test_dict_counts_are_read_as_before():
+    analysis = analyze_scraped_data({"instagram": [
+        {"username": "plus", "followers": "+5", "is_private": False},
+        {"username": "int", "followers": 50000, "is_private": False},
+    ]})
+    assert analysis["platform_insights"] == ["Instagram @plus: Low follower count - consider growing audience"]
+
+
+def test_records_and_their_dicts_agree():
+    results = {
+        "instagram": [InstagramProfile(username="jdoe", followers=12345, is_private=False),
+                      InstagramProfile(username="quiet", followers=Status.PRIVATE)],
+        "youtube": [YouTubeChannel(channel_name="@jdoe", subscribers=800)],
+        "twitter": [ScrapeError(error="Profile not found: jdoe")],
+    }
+    as_dicts = {platform: [r.to_dict() for r in records] for platform, records in results.items()}
+    analysis = analyze_scraped_data(results)
+    assert analysis == analyze_scraped_data(as_dicts)
+    assert analysis["platform_insights"] == [
+        "Instagram @jdoe: High follower count (12,345) - good for recruitment visibility",
+        "YouTube @jdoe: Active video content creator",
+    ]
+    assert analysis["risk_factors"] == ["twitter: Profile not found: jdoe"]
+
+
+def test_analyze_table_matches_per_athlete_analysis():
+    roster = {
+        "a": {"instagram": [InstagramProfile(username="a", followers=20, is_private=False)]},
+        "b": {"youtube": [YouTubeChannel(channel_name="@b", subscribers=5)], "instagram": []},
+        "c": {},
+    }
+    analyses = analyze_table(results_table(roster), athletes=list(roster))
+    assert analyses == {athlete: analyze_scraped_data(scraped) for athlete, scraped in roster.items()}
+
+
+def test_roster_summary_ranks_audiences():
+    table = results_table({
+        "a": {"instagram": [InstagramProfile(username="a", followers=100)]},
+        "b": {"instagram": [InstagramProfile(username="b", followers=300)],
+              "twitter": [ScrapeError(error="boom")]},
+    })
+    summary = roster_summary(table)
+    assert summary.loc["b", "instagram_audience"] == 300
+    assert summary.loc["b", "instagram_percentile"] == 100.0
+    assert summary.loc["a", "instagram_percentile"] == 50.0
+    assert summary.loc["b", "success_rate"] == 50.0
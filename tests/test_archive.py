@@ -0,0 +1,90 @@
+import os
+import threading
+
+import pytest
+
+from socialmediaaudit.archive import MAGIC, ArchiveReader, ArchiveWriter
+from socialmediaaudit.scraper import SocialMediaScraper
+
+
+def record(path, count, prefix="r"):
+    writer = ArchiveWriter(path)
+    for i in range(count):
+        writer.append("instagram", "GET", f"https://www.instagram.com/{prefix}{i}/", 200, {"ETag": str(i)},
+                      f"body {i}".encode())
+    writer.close()
+
+
+def test_round_trip_and_latest_wins(tmp_path):
+    path = str(tmp_path / "a.smarc")
+    record(path, 3)
+    writer = ArchiveWriter(path)
+    writer.append("instagram", "GET", "https://www.instagram.com/r1", 404, {}, b"gone")
+    writer.append("instagram", "HEAD", "https://www.instagram.com/r1", 200, {}, b"")
+    writer.close()
+
+    reader = ArchiveReader(path)
+    assert len(reader) == 4
+    assert reader.lookup("https://www.instagram.com/r0/").content == b"body 0"
+    assert reader.lookup("https://www.instagram.com/r1/").status_code == 404
+    assert reader.lookup("https://www.instagram.com/r1/", "HEAD").status_code == 200
+    assert reader.lookup("https://www.instagram.com/nobody/") is None
+    reader.close()
+
+
+def test_torn_tail_is_cut_off_before_appending(tmp_path):
+    path = str(tmp_path / "a.smarc")
+    record(path, 2)
+    with open(path, "ab") as f:
+        f.write(b"\x10\x00\x00\x00\xff")
+    record(path, 1, prefix="after")
+    reader = ArchiveReader(path)
+    assert len(reader) == 3
+    assert reader.lookup("https://www.instagram.com/after0/").content == b"body 0"
+    reader.close()
+
+
+def test_concurrent_writers_write_one_header(tmp_path):
+    path = str(tmp_path / "a.smarc")
+    threads = [threading.Thread(target=record, args=(path, 5, f"t{n}-")) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with open(path, "rb") as f:
+        assert f.read().count(MAGIC) == 1
+    assert len(ArchiveReader(path)) == 40
+
+
+@pytest.mark.parametrize("content", [b"", MAGIC[:3]])
+def test_a_file_without_a_whole_header_is_an_empty_archive(tmp_path, content):
+    path = tmp_path / "crashed.smarc"
+    path.write_bytes(content)
+    reader = ArchiveReader(str(path))
+    assert len(reader) == 0
+    assert reader.lookup("https://www.instagram.com/jdoe/") is None
+    reader.close()
+
+
+def test_other_files_are_refused(tmp_path):
+    path = tmp_path / "not.smarc"
+    path.write_bytes(b"something else entirely")
+    with pytest.raises(ValueError):
+        ArchiveWriter(str(path))
+    with pytest.raises(ValueError):
+        ArchiveReader(str(path))
+    assert path.read_bytes() == b"something else entirely"
+
+
+def test_replay_reproduces_recorded_results(tmp_path, standin):
+    path = str(tmp_path / "a.smarc")
+    recorder = ArchiveWriter(path)
+    live = SocialMediaScraper(base_urls=standin, recorder=recorder)
+    handles = [("instagram", "replayjdoe"), ("youtube", "@replayjdoe"), ("tiktok", "missingjdoe")]
+    recorded = [live.scrape(platform, handle) for platform, handle in handles]
+    recorder.close()
+
+    replay = SocialMediaScraper(base_urls=standin, replay=ArchiveReader(path))
+    assert [replay.scrape(platform, handle) for platform, handle in handles] == recorded
+    assert replay.scrape("instagram", "neverrecorded").is_error
+    assert os.path.getsize(path) > len(MAGIC)
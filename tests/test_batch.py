@@ -0,0 +1,99 @@
+import io
+import json
+
+import pytest
+from conftest import write_roster
+
+from socialmediaaudit.batch import RosterWriter, completed_athletes, read_roster, run_summary
+from socialmediaaudit.cli import main
+from socialmediaaudit.records import InstagramProfile
+
+ROSTER = [
+    {"athlete": "ann", "instagram": "annjdoe", "youtube": "@annjdoe", "snapchat": "annsnap"},
+    {"athlete": "bob", "instagram": "https://www.instagram.com/AnnJDoe/", "tiktok": "missingbob"},
+    {"athlete": "cal", "twitter": "@caljdoe;caljdoe2"},
+]
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return {record["athlete"]: record for record in map(json.loads, f)}
+
+
+def base_url_args(standin):
+    return [arg for platform, url in standin.items() for arg in ("--base-url", f"{platform}={url}")]
+
+
+def test_read_roster(tmp_path):
+    path = tmp_path / "roster.csv"
+    path.write_text("ID,Athlete,Instagram,TikTok,Priority,Active_Until\n"
+                    "7,Ann Doe, @ann ; ann2 ,,high,2030-01-01\n"
+                    ",,nobody,,,\n", encoding="utf-8")
+    (athlete,) = read_roster(str(path))
+    assert athlete["athlete"] == "7" and athlete["name"] == "Ann Doe"
+    assert athlete["handles"]["instagram"] == ["@ann", "ann2"]
+    assert athlete["handles"]["tiktok"] == []
+    assert athlete["priority"] == 1 and athlete["active_until"] == "2030-01-01"
+
+
+def test_completed_athletes_cuts_off_a_partial_line(tmp_path):
+    path = tmp_path / "out.jsonl"
+    path.write_text('{"athlete": "ann"}\n{"athlete": "bob"}\n{"athl', encoding="utf-8")
+    assert completed_athletes(str(path)) == {"ann", "bob"}
+    assert path.read_text(encoding="utf-8").endswith('"bob"}\n')
+
+
+def test_unwritten_athletes_are_reported():
+    pending = [{"athlete": "ann", "name": "Ann", "handles": {"instagram": ["ann"]}},
+               {"athlete": "bob", "name": "Bob", "handles": {"instagram": ["bob"]}}]
+    out = io.StringIO()
+    writer = RosterWriter(pending, out, log=lambda message: None)
+    writer.add([(("instagram", "ann"), InstagramProfile(username="ann", followers=5))])
+    summary = run_summary(writer, 1.0, {}, None, log=lambda message: None)
+    assert summary["athletes"] == 1
+    assert summary["failed"] == ["bob"]
+    assert [json.loads(line)["athlete"] for line in out.getvalue().splitlines()] == ["ann"]
+
+
+def test_batch_cli(tmp_path, standin):
+    roster = write_roster(tmp_path / "roster.csv", ROSTER)
+    output = str(tmp_path / "out.jsonl")
+    main(["batch", roster, "-o", output, "-w", "2", "-d", "0", "--no-cache", "--no-history"] + base_url_args(standin))
+
+    lines = read_lines(output)
+    assert sorted(lines) == ["ann", "bob", "cal"]
+    # Snapchat isn't scraped, so only Instagram and YouTube count for Ann
+    assert lines["ann"]["accounts"] == 2
+    assert lines["cal"]["accounts"] == 2
+    assert lines["bob"]["results"]["instagram"] == lines["ann"]["results"]["instagram"]
+    assert "error" in lines["bob"]["results"]["tiktok"][0]
+    assert lines["bob"]["analysis"]["risk_factors"] == ["tiktok: Profile not found: missingbob"]
+
+    # A second run finds everyone done
+    main(["batch", roster, "-o", output, "-w", "2", "-d", "0", "--no-cache", "--no-history"] + base_url_args(standin))
+    assert len(read_lines(output)) == 3
+
+
+def test_record_and_replay(tmp_path, standin):
+    roster = write_roster(tmp_path / "roster.csv", ROSTER)
+    recorded, replayed = str(tmp_path / "recorded.jsonl"), str(tmp_path / "replayed.jsonl")
+    archive = str(tmp_path / "responses.smarc")
+    main(["batch", roster, "-o", recorded, "-w", "2", "-d", "0", "--no-history", "--record", archive]
+         + base_url_args(standin))
+    main(["replay", archive, recorded, "-o", replayed, "-w", "2"] + base_url_args(standin))
+
+    before, after = read_lines(recorded), read_lines(replayed)
+    assert sorted(after) == sorted(before)
+    for athlete, record in before.items():
+        assert after[athlete]["results"] == record["results"]
+        assert after[athlete]["analysis"] == record["analysis"]
+
+
+@pytest.mark.parametrize("args", [["batch", "roster.csv", "--base-url", "bogus"],
+                                  ["worker", "queue.sqlite3", "--base-url", "bogus"],
+                                  ["monitor", "roster.csv", "--budget", "instagram=lots"]])
+def test_malformed_options_are_usage_errors(args, capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(args)
+    assert exit_info.value.code == 2
+    assert "expected PLATFORM=" in capsys.readouterr().err
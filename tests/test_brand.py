@@ -0,0 +1,79 @@
+import random
+import string
+
+from socialmediaaudit.brand import (EMPTY, SimilarityIndex, apply_consistency, athlete_accounts, consistency,
+                                    containment, handle_trigrams, jaccard, lookalikes, roster_brand)
+
+
+def test_too_few_sets_to_pair_find_nothing():
+    assert SimilarityIndex().similar_pairs([], 0.5) == []
+    assert SimilarityIndex().similar_pairs([frozenset({" jd", "jdo", "doe", "oe "})], 0.5) == []
+    # Neither athlete has a bio, so only handles are compared
+    accounts = (athlete_accounts("ann", {"instagram": ["jdoe23"]}, {})
+                + athlete_accounts("bob", {"instagram": ["realjdoe23"]}, {}))
+    assert [(a.key, b.key, kind) for a, b, kind, _ in lookalikes(accounts)] == [("jdoe23", "realjdoe23", "handle")]
+
+
+def test_handles_are_compared_without_case_leetspeak_or_separators():
+    assert handle_trigrams("J.Doe_23") == handle_trigrams("jd0e23")
+    # All but the trigram that ends "jdoe23" are in "jdoe23hoops"
+    assert containment(handle_trigrams("jdoe23"), handle_trigrams("jdoe23hoops")) == 5 / 6
+    assert jaccard(frozenset(), frozenset({"abc"})) == 0.0
+
+
+def test_consistency_names_the_odd_account_out():
+    handles = {"instagram": ["jdoe23"], "twitter": ["jdoe23hoops"], "tiktok": ["xx_random_guy"],
+               "youtube": ["channel/UCaBcD"]}
+    accounts = athlete_accounts("ann", handles, {})
+    # A channel ID says nothing about the brand
+    assert [a.name for a in accounts if a.platform == "youtube"] == [None]
+    score, off_brand = consistency(accounts)
+    assert 0 < score < 100
+    assert [(account.key, best) for account, best in off_brand] == [("xx_random_guy", 0.0)]
+    assert consistency(athlete_accounts("ann", {"instagram": ["jdoe23"]}, {})) == (None, [])
+
+
+def test_failed_scrapes_get_no_recommendation():
+    handles = {"instagram": ["jdoe23"], "twitter": ["jdoe23hoops"], "tiktok": ["xx_random_guy"]}
+    analysis = apply_consistency({"recommendations": []}, handles, {})
+    assert analysis["recommendations"] == [
+        "Align TikTok @xx_random_guy with your other handles for a consistent brand (closest match 0%)"]
+    analysis = apply_consistency({"recommendations": []}, handles, {"tiktok": [{"error": "Profile not found"}]})
+    assert analysis["brand_consistency"] is not None and analysis["recommendations"] == []
+
+
+def test_similarity_index_finds_the_same_pairs_as_comparing_them_all():
+    rng = random.Random(3)
+    names = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(6, 14))) for _ in range(300)]
+    names += [name + "hoops" for name in names[:50]] + [name[:-1] + "x" for name in names[50:100]]
+    sets = [handle_trigrams(name) for name in names]
+    stats = {}
+    found = {(i, j) for i, j, _ in SimilarityIndex(stats=stats).similar_pairs(sets, 0.5, 0.8)}
+    exact = {(i, j) for i in range(len(sets)) for j in range(i + 1, len(sets))
+             if jaccard(sets[i], sets[j]) >= 0.5 or containment(sets[i], sets[j]) >= 0.8}
+    assert found == exact
+    # Far fewer pairs were looked at than the ~80,000 a full comparison takes
+    assert stats["candidates"] < 2000
+
+
+def test_signatures_of_equal_and_empty_sets():
+    index = SimilarityIndex()
+    sets = [frozenset(), handle_trigrams("jdoe23"), handle_trigrams("jdoe23")]
+    signatures = index.signatures(sets)
+    assert signatures.shape == (3, index.num_perm)
+    assert (signatures[0] == EMPTY).all() and (signatures[1] == signatures[2]).all()
+
+
+def test_roster_lookalikes_skip_shared_team_pages():
+    bio = "Point guard at Central High School, class of 2026, three-time all-state selection"
+    athletes = {
+        "ann": ({"instagram": ["jdoe23"], "twitter": ["centralhoops"]},
+                {"instagram": [{"username": "jdoe23", "bio": bio}]}),
+        "bob": ({"instagram": ["realjdoe23"], "twitter": ["centralhoops"]},
+                {"instagram": [{"username": "realjdoe23", "bio": bio + "!"}]}),
+    }
+    report = roster_brand(athletes, names={"ann": "Ann", "bob": "Bob"})
+    assert report["ann"]["lookalikes"] == [
+        "Instagram @jdoe23 handle resembles Bob's Instagram @realjdoe23 (83% similar)",
+        "Instagram @jdoe23 bio resembles Bob's Instagram @realjdoe23 (96% similar)"]
+    assert len(report["bob"]["lookalikes"]) == 2
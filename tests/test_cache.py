@@ -0,0 +1,47 @@
+from socialmediaaudit.cache import ResponseCache, cache_key, normalize_url
+from socialmediaaudit.scraper import SocialMediaScraper
+
+
+def test_keys():
+    assert normalize_url("HTTPS://WWW.Instagram.com/jdoe/#top") == "https://www.instagram.com/jdoe"
+    assert cache_key("https://x.com/a", "HEAD") == "HEAD https://x.com/a"
+    assert cache_key("https://x.com/a/", part="head") == "https://x.com/a #head"
+
+
+def test_store_lookup_and_validators(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), ttls={"instagram": 3600, "youtube": 0})
+    headers = {"ETag": '"v1"', "Last-Modified": "Sun, 18 Oct 2026 10:00:00 GMT"}
+    cache.store("instagram", "https://www.instagram.com/jdoe/", 200, headers, b"page")
+    cache.store("youtube", "https://www.youtube.com/@jdoe", 200, {}, b"channel")
+
+    entry, fresh = cache.lookup("instagram", "https://www.Instagram.com/jdoe")
+    assert fresh and entry["body"] == b"page"
+    assert cache.validators(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": headers["Last-Modified"]}
+    assert cache.lookup("youtube", "https://www.youtube.com/@jdoe")[1] is False
+    assert cache.lookup("instagram", "https://www.instagram.com/jdoe/", part="head") == (None, False)
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResponseCache(str(tmp_path / "c.sqlite3"), max_bytes=1)
+    cache.store("instagram", "https://a.example/1", 200, {}, b"one")
+    cache.store("instagram", "https://a.example/2", 200, {}, b"two")
+    assert cache.lookup("instagram", "https://a.example/1") == (None, False)
+    assert cache.stats["evictions"] >= 1
+
+
+def test_scraper_serves_repeat_fetches_from_cache(standin):
+    cache = ResponseCache()
+    scraper = SocialMediaScraper(cache=cache, base_urls=standin)
+    first = scraper.scrape("instagram", "cachejdoe")
+    assert scraper.scrape("instagram", "@CacheJDoe") == first
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+
+def test_cut_off_bodies_are_not_served_as_whole_pages(standin):
+    cache = ResponseCache()
+    scraper = SocialMediaScraper(cache=cache, base_urls=standin)
+    scraper.scrape("youtube", "@partjdoe")
+    url = standin["youtube"] + "/@partjdoe"
+    assert cache.lookup("youtube", url) == (None, False)
+    (key,) = [row[0] for row in cache.conn.execute("SELECT url FROM responses")]
+    assert key.startswith(f"{url} #head+")
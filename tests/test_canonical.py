@@ -0,0 +1,65 @@
+import pytest
+
+from socialmediaaudit.canonical import FetchPlan, canonicalize, index_results
+from socialmediaaudit.scraper import SocialMediaScraper
+
+
+@pytest.mark.parametrize("raw", ["jdoe", "@JDoe", "  jdoe ", "https://www.instagram.com/jdoe/", "instagram.com/JDoe"])
+def test_instagram_forms_share_one_account(raw):
+    account = canonicalize("instagram", raw)
+    assert (account.platform, account.key, account.url) == ("instagram", "jdoe", "https://www.instagram.com/jdoe/")
+
+
+def test_url_goes_to_the_platform_it_points_at():
+    account = canonicalize("instagram", "https://x.com/JDoe")
+    assert (account.platform, account.key) == ("twitter", "jdoe")
+
+
+@pytest.mark.parametrize("raw, key", [
+    ("@JDoeHoops", "@jdoehoops"),
+    ("https://www.youtube.com/@JDoeHoops", "@jdoehoops"),
+    ("channel/UCaBcD", "channel/UCaBcD"),
+    ("https://youtube.com/channel/UCaBcD", "channel/UCaBcD"),
+    ("c/JDoe", "c/jdoe"),
+    ("JDoe", "c/jdoe"),
+    ("user/JDoe", "user/jdoe"),
+])
+def test_youtube_forms(raw, key):
+    assert canonicalize("youtube", raw).key == key
+
+
+def test_youtube_handle_is_passed_on_as_typed():
+    account = canonicalize("youtube", " JDoe ")
+    assert (account.handle, account.url) == ("JDoe", "https://www.youtube.com/c/jdoe")
+    assert canonicalize("youtube", "user/JDoe").handle == "user/JDoe"
+
+
+def test_youtube_channel_name_is_the_typed_name(standin):
+    plan = FetchPlan()
+    plan.add_handles({"youtube": ["JDoe"]})
+    (handle,) = plan.handles_by_platform(["youtube"])["youtube"]
+    assert SocialMediaScraper(base_urls=standin).scrape("youtube", handle).channel_name == "JDoe"
+
+
+def test_linkedin_profile_path():
+    assert canonicalize("linkedin", "/in/JDoe").key == "jdoe"
+    assert canonicalize("linkedin", "https://www.linkedin.com/in/jdoe/").url == "https://www.linkedin.com/in/jdoe"
+
+
+def test_unscraped_platforms_have_no_url():
+    assert canonicalize("snapchat", "@JDoe") == ("snapchat", "jdoe", "jdoe", None)
+
+
+def test_fetch_plan_dedupes_across_owners():
+    plan = FetchPlan()
+    plan.add_handles({"instagram": ["@jdoe", "https://instagram.com/jdoe"], "tiktok": ["jdoe"]}, owner="a")
+    plan.add_handles({"instagram": ["JDOE"], "twitter": [" "]}, owner="b")
+    assert sorted(plan.accounts) == [("instagram", "jdoe"), ("tiktok", "jdoe")]
+    assert plan.handles_by_platform(["instagram"]) == {"instagram": ["jdoe"]}
+    assert [a.key for a in plan.owner_accounts("a")] == ["jdoe", "jdoe"]
+    assert plan.savings() == pytest.approx(0.5)
+
+    results = index_results({"instagram": ["jdoe"]}, {"instagram": ["result"]})
+    assert results == {("instagram", "jdoe"): "result"}
+    assert plan.fan_out(results, ["instagram"], owner="a") == {"instagram": ["result", "result"]}
+    assert plan.fan_out(results, ["instagram"], owner="b") == {"instagram": ["result"]}
@@ -0,0 +1,63 @@
+import threading
+import time
+
+from socialmediaaudit.engine import ScrapeEngine, TokenBucket
+from socialmediaaudit.metrics import AuditTrace
+from socialmediaaudit.records import InstagramProfile, ScrapeError
+
+
+class RecordingScraper:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def scrape(self, platform, handle):
+        with self.lock:
+            self.calls.append((time.monotonic(), platform, handle, threading.current_thread().name))
+        if handle == "boom":
+            raise RuntimeError("boom")
+        return InstagramProfile(username=handle)
+
+
+def test_token_bucket_spaces_acquires():
+    bucket = TokenBucket(rate=20)
+    start = time.monotonic()
+    for _ in range(4):
+        bucket.acquire()
+    # The first token is there to start with, the other three take 1/20 s each
+    assert 0.14 <= time.monotonic() - start < 0.5
+
+
+def test_hosts_are_rate_limited_apart_and_run_in_parallel():
+    scraper = RecordingScraper()
+    engine = ScrapeEngine(scraper, delay=0.2)
+    start = time.monotonic()
+    results = engine.scrape_all({"instagram": ["a", "b", "c"], "youtube": ["d", "e", "f"]})
+    elapsed = time.monotonic() - start
+    # Two 0.4 s queues side by side, not one 1.0 s queue
+    assert 0.35 <= elapsed < 0.8
+    assert [r.username for r in results["instagram"]] == ["a", "b", "c"]
+    assert [r.username for r in results["youtube"]] == ["d", "e", "f"]
+    times = [t for t, platform, _, _ in scraper.calls if platform == "instagram"]
+    assert all(later - earlier >= 0.18 for earlier, later in zip(times, times[1:]))
+    assert engine.bucket_for("instagram") is engine.bucket_for("instagram")
+
+
+def test_existence_probes_run_as_one_batch_per_host():
+    scraper = RecordingScraper()
+    ScrapeEngine(scraper, delay=0).scrape_all({"tiktok": ["a", "b", "c"]})
+    assert len({thread for _, _, _, thread in scraper.calls}) == 1
+
+
+def test_errors_become_results_and_no_request_platforms_answer_first():
+    scraper = RecordingScraper()
+    trace = AuditTrace()
+    seen = []
+    engine = ScrapeEngine(scraper, delay=0, trace=trace)
+    results = engine.scrape_all({"instagram": ["boom", "ok"], "linkedin": ["jdoe"]},
+                                on_result=lambda platform, handle, result: seen.append((platform, handle)))
+    assert results["instagram"][0] == ScrapeError(error="Error scraping instagram boom: boom")
+    assert results["instagram"][1].username == "ok"
+    assert seen[0] == ("linkedin", "jdoe")
+    assert len(seen) == 3
+    assert [s["error"] for s in trace.spans if s["span"] == "scrape" and "error" in s] == ["RuntimeError"]
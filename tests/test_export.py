@@ -0,0 +1,48 @@
+import json
+import os
+import zipfile
+
+from socialmediaaudit.analysis import analyze_scraped_data
+from socialmediaaudit.export import SUMMARY_FILENAME, export_roster, pdf_filename
+from socialmediaaudit.records import InstagramProfile, ScrapeError, as_dict
+
+
+def write_results(path, names):
+    with open(path, "w", encoding="utf-8") as f:
+        for i, name in enumerate(names):
+            results = {"instagram": [as_dict(InstagramProfile(username=f"jdoe{i}", followers=100 * (i + 1)))],
+                       "tiktok": [as_dict(ScrapeError(error=f"Profile not found: jdoe{i}"))]}
+            record = {"athlete": f"a{i}", "name": name, "handles": {"instagram": [f"jdoe{i}"], "tiktok": [f"jdoe{i}"]},
+                      "results": results, "analysis": analyze_scraped_data(results),
+                      "audited_at": "2026-10-18 12:00:00"}
+            f.write(json.dumps(record) + "\n")
+    return str(path)
+
+
+def test_pdf_filenames_are_safe_and_unique():
+    used = set()
+    assert pdf_filename("Ann O'Neil", used) == "Ann_O_Neil.pdf"
+    assert pdf_filename("Ann O'Neil", used) == "Ann_O_Neil_2.pdf"
+    assert pdf_filename("../..", used) == "athlete.pdf"
+
+
+def test_export_writes_every_report_and_reuses_unchanged_ones(tmp_path):
+    results = write_results(tmp_path / "results.jsonl", ["Ann Doe", "Bob Roe", "Ann Doe"])
+    output = str(tmp_path / "reports.zip")
+    progress = []
+    stats = export_roster(results, output, workers=1, max_pending=1, progress=lambda *p: progress.append(p),
+                          log=lambda message: None)
+    assert stats["athletes"] == 3 and stats["cached"] == 0 and stats["failed"] == 0
+    assert progress == [(1, 3), (2, 3), (3, 3)]
+    assert not os.path.exists(output + ".part")
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ["Ann_Doe.pdf", "Ann_Doe_2.pdf", "Bob_Roe.pdf", SUMMARY_FILENAME]
+        assert all(info.compress_type == zipfile.ZIP_STORED for info in archive.infolist())
+        assert all(archive.read(name).startswith(b"%PDF") for name in archive.namelist())
+        first = {name: archive.read(name) for name in archive.namelist()}
+
+    # Nothing changed, so the second export renders nothing in a worker
+    stats = export_roster(results, output, workers=1, log=lambda message: None)
+    assert stats["cached"] == 3
+    with zipfile.ZipFile(output) as archive:
+        assert {name: archive.read(name) for name in archive.namelist()} == first
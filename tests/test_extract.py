@@ -0,0 +1,55 @@
+from socialmediaaudit.extract import BlobScanner, HeadExtractor, NullSink, Sinks, count_from_text, text_of
+
+FIELDS = {"followers": r'"edge_followed_by"\s*:\s*\{\s*"count"\s*:\s*', "bio": r'"biography"\s*:\s*'}
+MARKER = "window._sharedData = "
+
+
+def feed_in_chunks(sink, page, size=7):
+    fed = 0
+    for i in range(0, len(page), size):
+        if sink.done:
+            break
+        sink.feed(page[i:i + size])
+        fed = i + size
+    return fed
+
+
+def test_head_extractor_stops_at_head_end():
+    page = (b'<html><head><meta name="description" content="1,234 Followers">'
+            b'<script type="application/ld+json">{"a": 1}</script></head><body><meta name="late" content="x">')
+    head = HeadExtractor()
+    feed_in_chunks(head, page)
+    assert head.done
+    assert head.meta == {"description": "1,234 Followers"}
+    assert head.ld_json == ['{"a": 1}']
+
+
+def test_blob_scanner_finds_values_split_across_chunks():
+    page = ('<html><head></head><body>' + "x" * 100 + '<script>' + MARKER
+            + '{"entry": {"biography": "Point guard \\u00e9", "edge_followed_by": {"count": 4321}}};</script>').encode()
+    scanner = BlobScanner(MARKER, FIELDS)
+    feed_in_chunks(scanner, page, size=5)
+    assert scanner.done
+    assert scanner.values == {"followers": 4321, "bio": "Point guard é"}
+
+
+def test_blob_scanner_gives_up_without_its_marker():
+    head, scanner = HeadExtractor(), BlobScanner(MARKER, FIELDS, marker_cap=1000)
+    sinks = Sinks(head, scanner)
+    page = b"<html><head></head><body>" + b"y" * 100000
+    fed = feed_in_chunks(sinks, page, size=100)
+    assert sinks.done
+    assert fed <= 1100
+    assert scanner.values == {}
+
+
+def test_sinks_name_their_cache_part():
+    assert Sinks(HeadExtractor(), BlobScanner(MARKER, FIELDS, marker_cap=10)).cache_part == \
+        "head+window._sharedData = 10"
+    assert NullSink.cache_part == "status"
+
+
+def test_youtube_text_counts():
+    assert count_from_text(text_of({"simpleText": "1.2M subscribers"})) == 1200000
+    assert count_from_text(text_of({"runs": [{"text": "12,345"}, {"text": " videos"}]})) == 12345
+    assert count_from_text("No videos") is None
@@ -0,0 +1,98 @@
+import time
+
+from socialmediaaudit.jobs import CANCELLED, DONE, QUEUED, JobQueue
+from socialmediaaudit.records import InstagramProfile
+
+
+class FakeScraper:
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.calls = []
+
+    def scrape(self, platform, handle):
+        self.calls.append((platform, handle))
+        if handle in self.fail:
+            raise RuntimeError("boom")
+        return InstagramProfile(username=handle, followers=100)
+
+
+def wait_for(jobs, job_id, status, timeout=10):
+    deadline = time.monotonic() + timeout
+    while jobs.status(job_id)["status"] != status:
+        assert time.monotonic() < deadline, jobs.status(job_id)
+        time.sleep(0.02)
+
+
+def submit(jobs, owner, handles, delay=0):
+    return jobs.submit(owner, {"instagram": handles}, handles[0], len(handles), 1, delay=delay)
+
+
+def test_the_owner_with_fewest_accounts_in_flight_goes_next(tmp_path):
+    jobs = JobQueue(FakeScraper(), str(tmp_path / "jobs.sqlite3"), workers=0)
+    big = submit(jobs, "big", ["a1", "a2", "a3"])
+    small = submit(jobs, "small", ["b1"])
+    (job, _, _, _, handle), _ = jobs._next(time.monotonic())
+    assert (job.job_id, handle) == (big, "a1")
+    job.running += 1
+    # "big" is older, but already has an account in flight
+    (job, _, _, _, handle), _ = jobs._next(time.monotonic())
+    assert (job.job_id, handle) == (small, "b1")
+    jobs.close()
+
+
+def test_requests_to_a_host_are_spaced_across_jobs(tmp_path):
+    jobs = JobQueue(FakeScraper(), str(tmp_path / "jobs.sqlite3"), workers=0)
+    submit(jobs, "a", ["a1"], delay=5)
+    submit(jobs, "b", ["b1"], delay=5)
+    jobs.host_ready_at["www.instagram.com"] = time.monotonic() + 5
+    task, wait = jobs._next(time.monotonic())
+    assert task is None and 4 < wait <= 5
+    jobs.close()
+
+
+def test_jobs_run_to_a_stored_audit(tmp_path):
+    scraper = FakeScraper(fail=["bad"])
+    jobs = JobQueue(scraper, str(tmp_path / "jobs.sqlite3"), workers=2)
+    job_id = submit(jobs, "me", ["jdoe", "@JDoe", "bad"])
+    wait_for(jobs, job_id, DONE)
+    assert sorted(scraper.calls) == [("instagram", "bad"), ("instagram", "jdoe")]
+    assert jobs.status(job_id)["fetched"] == jobs.status(job_id)["total"] == 2
+    audit = jobs.audit(job_id)
+    assert [r["username"] for r in audit["scraped_results"]["instagram"] if "username" in r] == ["jdoe", "jdoe"]
+    assert audit["scraped_results"]["instagram"][2]["error"] == "Error scraping instagram bad: boom"
+    assert "jdoe" in audit["report"] and audit["pdf_bytes"]
+    assert jobs.recent(owner="me") == [(job_id, "jdoe", DONE, jobs.status(job_id)["created_at"])]
+    assert jobs.recent(owner="someone else") == []
+    jobs.close()
+
+
+def test_cancelled_jobs_survive_a_restart_and_resume(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    jobs = JobQueue(FakeScraper(), path, workers=0)
+    job_id = submit(jobs, "me", ["a1", "a2"])
+    assert jobs.cancel(job_id) and not jobs.cancel(job_id)
+    assert jobs._next(time.monotonic()) == (None, None)
+    jobs.close()
+
+    scraper = FakeScraper()
+    jobs = JobQueue(scraper, path, workers=1)
+    assert jobs.status(job_id)["status"] == CANCELLED
+    assert scraper.calls == []
+    assert jobs.resume(job_id) and not jobs.resume(job_id)
+    wait_for(jobs, job_id, DONE)
+    assert sorted(scraper.calls) == [("instagram", "a1"), ("instagram", "a2")]
+    jobs.close()
+
+
+def test_unfinished_jobs_are_picked_up_after_a_restart(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    jobs = JobQueue(FakeScraper(), path, workers=0)
+    job_id = submit(jobs, "me", ["a1"])
+    jobs.close()
+    jobs = JobQueue(None, path, workers=0)
+    assert jobs.status(job_id)["status"] == QUEUED
+    jobs.close()
+
+    jobs = JobQueue(FakeScraper(), path, workers=1)
+    wait_for(jobs, job_id, DONE)
+    jobs.close()
@@ -0,0 +1,31 @@
+import pytest
+
+from socialmediaaudit.lexicon import RiskScanner, default_scanner, normalize
+
+
+def test_normalize_undoes_obfuscation():
+    assert normalize("F.U.C.K  th1$ sh!!!t") == "fuck this shit"
+    assert normalize("we\u200bed") == "weed"
+
+
+@pytest.mark.parametrize("text, matches", [
+    ("Class of 2026 | point guard", []),
+    ("Sports b3tting and parlays", [("gambling", "sports betting"), ("gambling", "parlays")]),
+    ("Molly Smith, class of 2026", []),
+    ("Kush Patel | Bong Joon-ho fan | high school senior", []),
+    ("poppin molly all weekend", [("substances", "molly")]),
+    ("weed and kush", [("substances", "weed"), ("substances", "kush")]),
+    ("Dick Van Dyke fan", []),
+])
+def test_default_scanner(text, matches):
+    assert default_scanner().scan(text) == matches
+
+
+def test_scan_many_keeps_texts_apart():
+    scanner = RiskScanner({"gambling": ["casino"]}, {"gambling": {"terms": ["bet"], "cues": ["odds"]}})
+    assert scanner.scan_many(["casino night", "bet", "best odds, bet", ""]) == [
+        [("gambling", "casino")], [], [("gambling", "bet")], []]
+
+
+def test_custom_lexicons_have_no_context_terms():
+    assert RiskScanner({"names": ["molly"]}).scan("Molly") == [("names", "molly")]
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from socialmediaaudit import metrics
+from socialmediaaudit.metrics import NULL_SPAN, AuditTrace, Histogram, Registry, span
+
+
+def test_histogram_buckets():
+    histogram = Histogram((1, 5))
+    for value in (0.5, 1, 3, 10):
+        histogram.observe(value)
+    assert histogram.counts == [2, 1, 1]
+    assert (histogram.count, histogram.sum) == (4, 14.5)
+
+
+def test_snapshots_merge_across_processes():
+    worker = Registry()
+    worker.observe("span_seconds", 0.2, span="scrape", platform="instagram")
+    worker.inc("responses_total", status=200)
+    merged = Registry()
+    merged.inc("responses_total", status=200)
+    merged.merge(json.loads(json.dumps(worker.snapshot())))
+    merged.merge(worker.snapshot())
+    snapshot = merged.snapshot()
+    assert snapshot["counters"] == [{"name": "responses_total", "labels": {"status": 200}, "value": 3}]
+    (histogram,) = snapshot["histograms"]
+    assert histogram["count"] == 2 and histogram["sum"] == pytest.approx(0.4)
+
+
+def test_prometheus_text():
+    registry = Registry()
+    registry.inc("responses_total", status=404)
+    registry.observe("response_bytes", 2000, buckets=(1024, 4096), platform="youtube")
+    assert registry.to_prometheus().splitlines() == [
+        "# TYPE socialmediaaudit_responses_total counter",
+        'socialmediaaudit_responses_total{status="404"} 1',
+        "# TYPE socialmediaaudit_response_bytes histogram",
+        'socialmediaaudit_response_bytes_bucket{le="1024",platform="youtube"} 0',
+        'socialmediaaudit_response_bytes_bucket{le="4096",platform="youtube"} 1',
+        'socialmediaaudit_response_bytes_bucket{le="+Inf",platform="youtube"} 1',
+        'socialmediaaudit_response_bytes_sum{platform="youtube"} 2000.0',
+        'socialmediaaudit_response_bytes_count{platform="youtube"} 1',
+    ]
+
+
+def test_child_spans_inherit_trace_and_labels():
+    trace = AuditTrace()
+    with span("scrape", trace=trace, platform="instagram"):
+        with span("fetch") as timing:
+            timing.set(bytes=512, status=200)
+        with pytest.raises(ValueError):
+            with span("parse"):
+                raise ValueError
+    fetch, parse, scrape = trace.spans
+    assert (fetch["span"], fetch["platform"], fetch["bytes"], fetch["status"]) == ("fetch", "instagram", 512, 200)
+    assert parse["error"] == "ValueError"
+    assert scrape["seconds"] >= fetch["seconds"] + parse["seconds"]
+    assert {s["span"]: s["count"] for s in trace.summary()} == {"fetch": 1, "parse": 1, "scrape": 1}
+
+
+def test_disabled_metrics_cost_a_shared_no_op(monkeypatch):
+    monkeypatch.setattr(metrics, "ENABLED", False)
+    trace = AuditTrace()
+    with span("scrape", trace=trace) as timing:
+        assert timing is NULL_SPAN
+        timing.set(bytes=1)
+    assert trace.spans == []
@@ -0,0 +1,66 @@
+from datetime import date, timedelta
+
+from socialmediaaudit.monitor import (ACTIVE_WINDOW_BOOST, Monitor, PlatformPacer, change_rate, counts_as_error,
+                                      importance)
+from socialmediaaudit.records import InstagramProfile, ScrapeError
+from socialmediaaudit.snapshots import SnapshotStore
+
+
+class FakeScraper:
+    def __init__(self, results):
+        self.results = results
+        self.calls = []
+
+    def scrape(self, platform, handle):
+        self.calls.append((platform, handle))
+        result = self.results[handle]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_importance_is_judged_on_the_day():
+    today = date.today()
+    claims = [(2, (today + timedelta(days=1)).isoformat()), (1, "")]
+    assert importance(claims, today.isoformat()) == 2 * ACTIVE_WINDOW_BOOST
+    assert importance(claims, (today + timedelta(days=2)).isoformat()) == 2
+
+
+def test_missing_profiles_do_not_count_towards_backoff():
+    assert not counts_as_error(ScrapeError(error="Profile not found: x", status=404))
+    assert counts_as_error(ScrapeError(error="Profile not found: x", status=429))
+    assert counts_as_error(ScrapeError(error="timed out"))
+    assert not counts_as_error(InstagramProfile(username="x"))
+
+
+def test_pacer_backs_off_and_recovers():
+    pacer = PlatformPacer(3600, jitter=0)
+    for _ in range(10):
+        pacer.record(True, 0)
+    assert pacer.backoff > 1
+    for _ in range(20):
+        pacer.record(False, 0)
+    assert pacer.backoff == 1
+
+
+def test_change_rate():
+    day = 86400
+    assert change_rate([(2 * day, 120), (day, 100), (0, None)]) == 0.2
+    assert change_rate([]) == 0.0
+
+
+def test_step_survives_errors_and_keeps_the_account(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    scraper = FakeScraper({"ok": InstagramProfile(username="ok", followers=10), "bad": RuntimeError("boom"),
+                           "missing": ScrapeError(error="Profile not found: missing", status=404)})
+    monitor = Monitor(scraper, store, budgets={"instagram": 3600}, jitter=0, log=lambda m: None)
+    athletes = [{"athlete": "a", "handles": {"instagram": ["ok", "bad", "missing"]}}]
+    assert monitor.load(athletes) == {"instagram": 3}
+    for _ in range(3):
+        monitor.pacers["instagram"].next_at = 0
+        monitor.step("instagram")
+    assert sorted(handle for _, handle in scraper.calls) == ["bad", "missing", "ok"]
+    assert monitor.stats == {"fetches": 3, "errors": 2}
+    assert len(monitor.queues["instagram"]) == 3
+    # The 404 is no error for backoff purposes; the exception is
+    assert list(monitor.pacers["instagram"].outcomes).count(True) == 1
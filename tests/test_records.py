@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from socialmediaaudit.records import (GenericProfile, InstagramProfile, ScrapeError, Status, YouTubeChannel,
+                                      as_dict, as_record, parse_count)
+
+
+@pytest.mark.parametrize("value, count", [
+    (1234, 1234),
+    ("1,234", 1234),
+    (" 56 ", 56),
+    ("1²", None),
+    ("٣", 3),
+    ("Private/Unable to access", None),
+    ("", None),
+    (True, None),
+    (None, None),
+])
+def test_parse_count(value, count):
+    assert parse_count(value) == count
+
+
+def test_dict_round_trip():
+    profile = InstagramProfile(username="jdoe", followers=12345, bio="Guard", is_private=False)
+    data = profile.to_dict()
+    assert data["followers"] == "12,345"
+    assert data["following"] == Status.PRIVATE.value
+    assert as_record("instagram", data) == profile
+    assert profile.audience == 12345
+    assert profile.text == "Guard"
+
+
+def test_placeholders_become_status():
+    channel = as_record("youtube", {"channel_name": "@x", "subscribers": "Unable to access"})
+    assert channel == YouTubeChannel(channel_name="@x")
+    assert channel.subscribers is Status.UNAVAILABLE
+    assert channel.audience is None
+
+
+def test_errors_keep_their_status_out_of_reports():
+    error = ScrapeError(error="Profile not found: jdoe", status=404)
+    assert error.is_error and error.status == 404
+    assert error.to_dict() == {"error": "Profile not found: jdoe"}
+    assert as_record("instagram", error.to_dict()) == ScrapeError(error="Profile not found: jdoe")
+
+
+def test_unknown_platforms_get_a_generic_record():
+    record = as_record("snapchat", {"username": "jdoe", "followers": "N/A"})
+    assert isinstance(record, GenericProfile)
+    assert record.username == "jdoe"
+    assert record.followers is Status.NOT_LISTED
+    assert as_dict(record) == {"username": "jdoe", "followers": "N/A"}
+    assert pickle.loads(pickle.dumps(record)) == record
+    with pytest.raises(AttributeError):
+        record.bio
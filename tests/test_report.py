@@ -0,0 +1,78 @@
+import json
+import os
+import shutil
+
+import pytest
+
+from socialmediaaudit.analysis import analyze_scraped_data
+from socialmediaaudit.records import InstagramProfile, ScrapeError
+from socialmediaaudit.report import (RenderCache, ReportDocument, build_document, build_report, find_unicode_font,
+                                     render_json, render_settings, render_text)
+
+RESULTS = {"instagram": [InstagramProfile(username="jdoe", followers=1234, bio="Guard"),
+                         ScrapeError(error="Profile not found: gone")]}
+
+
+def document(athlete="J Doe"):
+    analysis = analyze_scraped_data(RESULTS)
+    return build_document(RESULTS, analysis, athlete, 2, 1, changes=["Instagram jdoe: +34 followers"],
+                          generated="2026-10-18 12:00:00")
+
+
+def test_text_and_json_renderings():
+    doc = document()
+    text = render_text(doc)
+    assert text.startswith("LIVE SOCIAL MEDIA AUDIT REPORT\nGenerated: 2026-10-18 12:00:00\n\n=== EXECUTIVE SUMMARY")
+    assert "  • Followers: 1,234" in text and "  ❌ Error: Profile not found: gone" in text
+    assert "• Instagram jdoe: +34 followers" in text
+    assert build_report(RESULTS, analyze_scraped_data(RESULTS), "J Doe", 2, 1,
+                        ["Instagram jdoe: +34 followers"]).split("\n")[2:] == text.split("\n")[2:]
+    assert json.loads(render_json(doc)) == json.loads(json.dumps(doc.to_dict()))
+
+
+def test_documents_round_trip_and_hash_their_content():
+    doc = document()
+    copy = ReportDocument.from_dict(json.loads(render_json(doc)))
+    assert render_text(copy) == render_text(doc)
+    assert copy.content_hash() == doc.content_hash()
+    assert document("Someone Else").content_hash() != doc.content_hash()
+
+
+@pytest.fixture
+def font(tmp_path, monkeypatch):
+    original = find_unicode_font()
+    if original is None:
+        pytest.skip("no Unicode TrueType font installed")
+    path = str(tmp_path / "Font.ttf")
+    shutil.copy(original, path)
+    monkeypatch.setenv("SOCIALMEDIAAUDIT_PDF_FONT", path)
+    return path
+
+
+def test_render_cache_reuses_output_until_the_fonts_change(tmp_path, font):
+    cache = RenderCache(str(tmp_path / "renders"))
+    doc = document()
+    pdf = cache.render(doc, "pdf")
+    assert pdf.startswith(b"%PDF")
+    assert cache.render(ReportDocument.from_dict(doc.to_dict()), "pdf") == pdf
+    assert cache.stats == {"hits": 1, "misses": 1}
+    assert cache.get(doc, "txt") is None
+
+    stat = os.stat(font)
+    os.utime(font, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert font in render_settings("pdf") and render_settings("txt") == ""
+    assert cache.get(doc, "pdf") is None
+    cache.render(doc, "pdf")
+    assert cache.stats["misses"] == 2
+
+
+def test_render_cache_evicts_the_least_recently_used(tmp_path):
+    cache = RenderCache(str(tmp_path / "renders"), max_files=2)
+    docs = [document(f"Athlete {i}") for i in range(3)]
+    cache.render(docs[0], "txt")
+    cache.render(docs[1], "txt")
+    os.utime(cache._target(docs[0], "txt"), (0, 0))
+    cache.render(docs[2], "txt")
+    assert cache.get(docs[0], "txt") is None
+    assert cache.get(docs[1], "txt") == render_text(docs[1]).encode()
+    assert len(os.listdir(cache.path)) == 2
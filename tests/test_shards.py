@@ -0,0 +1,129 @@
+import json
+import threading
+import time
+
+import pytest
+from conftest import write_roster
+
+from socialmediaaudit.batch import run_batch
+from socialmediaaudit.shards import (CLOSED, DONE, FAILED, OPEN, QueueServer, ShardQueue, open_queue,
+                                     run_coordinator, run_worker)
+
+SHARDS = [{"instagram": ["a", "b"]}, {"youtube": ["@c"]}]
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ShardQueue(str(tmp_path / "queue.sqlite3"), max_attempts=2)
+    yield queue
+    queue.close()
+
+
+def roster_rows(count):
+    return [{"athlete": f"p{i}", "instagram": f"shard{i}", "youtube": f"@shard{i}",
+             "tiktok": f"missing{i}" if i % 4 == 0 else f"shard{i}", "twitter": f"shard{i % 3}"}
+            for i in range(count)]
+
+
+def test_nothing_is_leased_outside_a_run(queue):
+    assert queue.lease("w") is None
+    queue.open_run(SHARDS)
+    queue.close_run()
+    assert queue.run_state() == CLOSED
+    assert queue.lease("w") is None
+
+
+def test_each_shard_goes_to_one_worker(queue):
+    queue.open_run(SHARDS)
+    first, second = queue.lease("w1"), queue.lease("w2")
+    assert first == (1, {"instagram": ["a", "b"]}) and second[0] == 2
+    assert queue.lease("w3") is None
+    assert queue.renew(1, "w1") and not queue.renew(1, "w2")
+    assert not queue.complete(1, "w2", [])
+    assert queue.complete(1, "w1", [["instagram", "a", {"username": "a"}]], {"transport": {}, "metrics": {}})
+    assert queue.counts() == {DONE: 1, "leased": 1}
+    ((shard_id, results),) = queue.collect()
+    assert shard_id == 1 and results[0][0] == ("instagram", "a")
+    assert queue.collect() == []
+    assert queue.workers()["w1"]["accounts"] == 1
+
+
+def test_failed_and_abandoned_shards_come_back_until_out_of_attempts(queue):
+    queue.open_run(SHARDS)
+    queue.lease("w1")
+    queue.release(1, "w1", "boom")
+    assert queue.lease("w2", seconds=-1)[0] == 1
+    # w2's lease has already run out, so the shard is swept once it has used up its attempts
+    assert queue.sweep() == 1
+    assert queue.failed() == [(1, 2, 2, "lease expired on every attempt")]
+    assert queue.counts()[FAILED] == 1
+    assert queue.re_leased() == 1
+
+
+def test_runs_are_numbered(queue):
+    assert queue.current_run() == (None, None)
+    queue.open_run(SHARDS)
+    assert queue.current_run() == (1, OPEN)
+    queue.close_run()
+    queue.open_run([])
+    assert queue.current_run() == (2, OPEN)
+
+
+def test_worker_waits_out_a_previous_closed_run(tmp_path, queue, standin):
+    queue.open_run([])
+    queue.close_run()
+    stats = {}
+    worker = threading.Thread(target=lambda: stats.update(
+        run_worker(queue.path, "w", delay=0, base_urls=standin, use_cache=False, poll=0.05, log=lambda m: None)))
+    worker.start()
+    time.sleep(0.5)
+    assert worker.is_alive()
+
+    roster = write_roster(tmp_path / "roster.csv", roster_rows(6))
+    summary = run_coordinator(roster, str(tmp_path / "out.jsonl"), queue.path, shard_size=4, use_history=False,
+                              poll=0.05, log=lambda m: None)
+    worker.join(30)
+    assert not worker.is_alive()
+    assert summary["athletes"] == 6 and summary["failed"] == []
+    # Six athletes with one account each on three platforms, plus three Twitter accounts between them
+    assert stats["accounts"] == 21 and stats["shards"] == 6
+
+
+def test_sharded_run_matches_run_batch(tmp_path, standin):
+    roster = write_roster(tmp_path / "roster.csv", roster_rows(12))
+    batch_out, shard_out = str(tmp_path / "batch.jsonl"), str(tmp_path / "shards.jsonl")
+    run_batch(roster, batch_out, workers=2, delay=0, use_cache=False, base_urls=standin, use_history=False,
+              log=lambda m: None)
+
+    queue_path = str(tmp_path / "queue.sqlite3")
+    workers = [threading.Thread(target=run_worker, args=(queue_path, f"w{i}"),
+                                kwargs={"delay": 0, "base_urls": standin, "use_cache": False, "poll": 0.05,
+                                        "log": lambda m: None})
+               for i in range(2)]
+    for worker in workers:
+        worker.start()
+    run_coordinator(roster, shard_out, queue_path, shard_size=5, use_history=False, poll=0.05,
+                    log=lambda m: None)
+    for worker in workers:
+        worker.join(30)
+
+    def lines(path):
+        with open(path, encoding="utf-8") as f:
+            return {r["athlete"]: (r["results"], r["analysis"], r["accounts"]) for r in map(json.loads, f)}
+
+    assert lines(shard_out) == lines(batch_out)
+
+
+def test_remote_workers_go_through_the_queue_server(queue):
+    queue.open_run(SHARDS)
+    server = QueueServer(queue, ("127.0.0.1", 0)).start()
+    try:
+        remote = open_queue(server.url)
+        shard_id, handles = remote.lease("remote")
+        assert handles == {"instagram": ["a", "b"]}
+        assert remote.renew(shard_id, "remote")
+        assert remote.complete(shard_id, "remote", [["instagram", "a", {"username": "a"}]])
+        assert remote.current_run() == (1, OPEN)
+    finally:
+        server.shutdown()
+    assert queue.counts()[DONE] == 1
@@ -0,0 +1,97 @@
+import threading
+import time
+
+from socialmediaaudit.records import InstagramProfile, ScrapeError
+from socialmediaaudit.shared import SharedScraper, SingleFlight
+
+
+class SlowScraper:
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.calls = []
+
+    def scrape(self, platform, handle):
+        self.calls.append((platform, handle))
+        time.sleep(self.delay)
+        if handle.startswith("missing"):
+            return ScrapeError(error=f"Profile not found: {handle}")
+        return InstagramProfile(username=handle.lstrip("@").lower(), followers=10)
+
+
+def test_single_flight_shares_one_call_and_its_error():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait()
+        raise ValueError("boom")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do("k", work)
+        except ValueError as e:
+            errors.append(e)
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    followers = [threading.Thread(target=call) for _ in range(3)]
+    for thread in followers:
+        thread.start()
+    time.sleep(0.1)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join()
+    assert len(calls) == 1 and len(errors) == 4
+    assert flight.calls == {}
+
+
+def test_concurrent_requests_for_one_account_fetch_once():
+    scraper = SlowScraper()
+    shared = SharedScraper(scraper)
+    results = []
+    threads = [threading.Thread(target=lambda h=h: results.append(shared.scrape("instagram", h)))
+               for h in ["jdoe", "@JDoe", "https://www.instagram.com/jdoe/"]]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert scraper.calls == [("instagram", "jdoe")]
+    assert results == [InstagramProfile(username="jdoe", followers=10)] * 3
+    assert shared.stats["deduplicated"] == 2
+    assert shared.dedupe_rate() == 2 / 3
+
+
+def test_recent_results_are_reused_as_copies():
+    scraper = SlowScraper(delay=0)
+    shared = SharedScraper(scraper)
+    first = shared.scrape("instagram", "jdoe")
+    first.followers = 999
+    assert shared.scrape("instagram", "jdoe").followers == 10
+    assert shared.stats["result_cache_hits"] == 1 and len(scraper.calls) == 1
+
+
+def test_errors_and_expired_results_are_fetched_again():
+    scraper = SlowScraper(delay=0)
+    shared = SharedScraper(scraper, result_ttl=0)
+    shared.scrape("instagram", "missingjdoe")
+    shared.scrape("instagram", "missingjdoe")
+    shared.scrape("instagram", "jdoe")
+    time.sleep(0.01)
+    shared.scrape("instagram", "jdoe")
+    assert len(scraper.calls) == 4 and shared.stats["result_cache_hits"] == 0
+
+
+def test_expired_results_are_swept_when_others_are_stored():
+    shared = SharedScraper(SlowScraper(delay=0), result_ttl=0.05)
+    for i in range(5):
+        shared.scrape("instagram", f"old{i}")
+    time.sleep(0.1)
+    shared.scrape("instagram", "old0")
+    shared.scrape("instagram", "new")
+    assert list(shared.results) == [("instagram", "old0"), ("instagram", "new")]
@@ -0,0 +1,87 @@
+import time
+
+from socialmediaaudit.canonical import canonicalize
+from socialmediaaudit.jobs import DONE, JobQueue
+from socialmediaaudit.records import InstagramProfile, ScrapeError, YouTubeChannel
+from socialmediaaudit.snapshots import SnapshotStore
+
+DAY = 86400
+NOW = 1_800_000_000
+
+
+class FakeScraper:
+    def __init__(self):
+        self.calls = []
+
+    def scrape(self, platform, handle):
+        self.calls.append((platform, handle))
+        if platform == "youtube":
+            return YouTubeChannel(channel_name=handle, subscribers=5)
+        return InstagramProfile(username=handle, followers=110)
+
+
+def store_with_history(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    store.save([("ann", "instagram", "jdoe", InstagramProfile(username="jdoe", followers=100)),
+                ("ann", "youtube", "@jdoe", YouTubeChannel(channel_name="@jdoe", subscribers=50))],
+               fetched_at=NOW - 3 * DAY)
+    store.save([("ann", "instagram", "jdoe", InstagramProfile(username="jdoe", followers=120).to_dict())],
+               fetched_at=NOW - 2 * DAY)
+    store.save([("ann", "instagram", "jdoe", ScrapeError(error="timed out"))], fetched_at=NOW - DAY)
+    return store
+
+
+def test_latest_skips_errors(tmp_path):
+    store = store_with_history(tmp_path)
+    fetched_at, audience, result = store.latest("instagram", "jdoe")
+    assert (fetched_at, audience, result["followers"]) == (NOW - 2 * DAY, 120, "120")
+    assert store.latest("instagram", "jdoe", before=NOW - 2 * DAY)[1] == 100
+    assert store.latest("instagram", "nobody") is None
+
+
+def test_fresh_results_follow_each_platforms_window(tmp_path):
+    store = store_with_history(tmp_path)
+    accounts = [canonicalize("instagram", "jdoe"), canonicalize("youtube", "@jdoe")]
+    assert store.fresh_results(accounts, now=NOW) == {}
+    # Instagram snapshots are reused for a day, so only the newer one is fresh a day and a half later
+    fresh = store.fresh_results(accounts, now=NOW - 2 * DAY + DAY / 2)
+    assert fresh == {("instagram", "jdoe"): (NOW - 2 * DAY, InstagramProfile(username="jdoe", followers=120))}
+    store.windows["youtube"] = 7 * DAY
+    assert ("youtube", "@jdoe") in store.fresh_results(accounts, now=NOW)
+
+
+def test_changes_since_the_previous_snapshot(tmp_path):
+    store = store_with_history(tmp_path)
+    accounts = [canonicalize("instagram", "jdoe"), canonicalize("youtube", "@jdoe"), canonicalize("tiktok", "jdoe")]
+    results = {("instagram", "jdoe"): {"username": "jdoe", "followers": "150"},
+               ("youtube", "@jdoe"): {"channel_name": "@jdoe", "subscribers": "Unable to access"},
+               ("tiktok", "jdoe"): {"username": "jdoe"}}
+    changes = store.changes(accounts, results, {("instagram", "jdoe"): NOW})
+    assert changes == {("instagram", "jdoe"): {"change": 30, "previous": 120, "since": NOW - 2 * DAY}}
+
+
+def test_history(tmp_path):
+    store = store_with_history(tmp_path)
+    assert store.account_history("instagram", "jdoe", limit=2) == [(NOW - DAY, None, 1), (NOW - 2 * DAY, 120, 0)]
+    assert sorted(row[0] for row in store.history("ann")) == ["instagram", "instagram", "instagram", "youtube"]
+    assert len(store.history("ann", platform="youtube")) == 1
+
+
+def test_audits_only_fetch_stale_accounts(tmp_path):
+    store = SnapshotStore(str(tmp_path / "snapshots.sqlite3"))
+    store.save([("ann", "instagram", "jdoe", InstagramProfile(username="jdoe", followers=100))])
+
+    scraper = FakeScraper()
+    jobs = JobQueue(scraper, str(tmp_path / "jobs.sqlite3"), workers=1, snapshots=store)
+    handles = {"instagram": ["@JDoe"], "youtube": ["@jdoe"]}
+    job_id = jobs.submit("me", handles, "ann", 2, 2, delay=0)
+    while jobs.status(job_id)["status"] != DONE:
+        time.sleep(0.02)
+    assert scraper.calls == [("youtube", "@jdoe")]
+    assert jobs.audit(job_id)["scraped_results"]["instagram"][0]["followers"] == "100"
+    scraper.calls.clear()
+    job_id = jobs.submit("me", handles, "ann", 2, 2, delay=0, refresh=True)
+    while jobs.status(job_id)["status"] != DONE:
+        time.sleep(0.02)
+    assert sorted(scraper.calls) == [("instagram", "jdoe"), ("youtube", "@jdoe")]
+    jobs.close()
@@ -0,0 +1,82 @@
+import socket
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+
+from socialmediaaudit.transport import CircuitBreaker, CircuitOpenError, Transport, retry_after_seconds
+
+
+class FakeResponse:
+    def __init__(self, headers):
+        self.headers = headers
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds(FakeResponse({"Retry-After": "7"})) == 7
+    assert retry_after_seconds(FakeResponse({"Retry-After": "-3"})) == 0
+    assert 25 < retry_after_seconds(FakeResponse({"Retry-After": formatdate(time.time() + 30, usegmt=True)})) <= 30
+    assert retry_after_seconds(FakeResponse({"Retry-After": "soon"})) is None
+    assert retry_after_seconds(FakeResponse({})) is None
+
+
+def test_circuit_breaker_opens_and_lets_one_trial_through():
+    breaker = CircuitBreaker(threshold=2, reset_after=0.05)
+    breaker.record(False)
+    assert breaker.allow() and not breaker.is_open
+    breaker.record(False)
+    assert breaker.is_open and not breaker.allow()
+    time.sleep(0.06)
+    assert breaker.allow() and not breaker.allow()
+    breaker.record(True)
+    assert not breaker.is_open and breaker.allow()
+
+
+def test_retry_after_is_honored(standin):
+    transport = Transport()
+    start = time.monotonic()
+    response = transport.request("instagram", "GET", standin["instagram"] + "/throttledretry/")
+    assert response.status_code == 200
+    assert time.monotonic() - start >= 1
+    assert transport.report()["retries"] == 1
+
+
+def test_a_retry_after_past_max_backoff_is_not_waited_for(standin):
+    transport = Transport(max_backoff=0.5)
+    start = time.monotonic()
+    response = transport.request("instagram", "GET", standin["instagram"] + "/throttledgiveup/")
+    assert response.status_code == 429
+    assert time.monotonic() - start < 0.5
+    assert transport.report()["retries"] == 0
+
+
+def test_blocking_responses_open_the_platforms_circuit(standin):
+    transport = Transport(max_retries=0, breaker_threshold=2)
+    for name in ("throttledcircuit1", "throttledcircuit2"):
+        assert transport.request("youtube", "GET", f"{standin['youtube']}/@{name}").status_code == 429
+    with pytest.raises(CircuitOpenError):
+        transport.request("youtube", "GET", f"{standin['youtube']}/@circuitjdoe")
+    # Other platforms keep going
+    assert transport.request("instagram", "GET", standin["instagram"] + "/circuitjdoe/").status_code == 200
+    report = transport.report()
+    assert report["open_circuits"] == ["youtube"] and report["circuit_rejections"] == 1
+
+
+def test_connections_are_reused(standin):
+    transport = Transport()
+    for i in range(5):
+        transport.request("instagram", "GET", f"{standin['instagram']}/reuse{i}/").close()
+    stats = transport.connection_stats()
+    assert stats["connections_opened"] == 1 and stats["pooled_requests"] == 5
+    assert stats["reuse_ratio"] == 0.8
+
+
+def test_connection_errors_are_retried_then_raised():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    transport = Transport(max_retries=2, backoff=0.01)
+    with pytest.raises(requests.ConnectionError):
+        transport.request("instagram", "GET", f"http://127.0.0.1:{port}/jdoe/")
+    assert transport.report()["attempts"] == 3
@@ -0,0 +1,22 @@
+import os
+
+from streamlit.testing.v1 import AppTest
+
+from socialmediaaudit.jobs import JobQueue
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+
+def test_a_shared_link_does_not_make_its_reader_the_owner():
+    jobs = JobQueue(None, workers=0)
+    job_id = jobs.submit("victim", {}, "Victim", 0, 0)
+    jobs.close()
+
+    app = AppTest.from_file(APP, default_timeout=60)
+    app.query_params["owner"] = "victim"
+    app.query_params["job"] = job_id
+    app.run()
+    assert not app.exception
+    assert app.session_state["owner"] != "victim"
+    assert app.session_state["job_id"] is None
+    assert "owner" not in app.query_params and "job" not in app.query_params